@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Archivage des offres expirées (séparation chaud / froid)
+- Les offres Expired depuis plus de RETENTION_DAYS jours quittent les tables jobs des scrapers
+- Elles sont déplacées, avec leur historique (job_versions), dans jobs_archive.db
+  où les descriptions sont compressées (zlib)
+- Une offre republiée puis de nouveau expirée est archivée à nouveau (generation
+  suivante, versions numérotées à la suite) : les copies précédentes sont conservées
+- Les pages libérées sont rendues au système par PRAGMA incremental_vacuum
+
+Les tables jobs, et donc les exports (JSON complet, jobs.db...), restent proportionnelles
+aux offres récentes. open_history() donne une vue jobs_history regroupant offres
+courantes et archivées pour les requêtes historiques.
+
+Usage:
+    python archive_expired.py [jours_de_retention]
+"""
+
+import sqlite3
+import sys
+import zlib
+from pathlib import Path
+from typing import Dict
+
+from job_store import migrate_schema
+from publish import SOURCES
+from unified_store import UNIFIED_DB
+
+PYTHON_DIR = Path(__file__).parent
+ARCHIVE_DB = PYTHON_DIR / "jobs_archive.db"
+
+# Offres expirées conservées dans les tables chaudes pendant ce nombre de jours
+RETENTION_DAYS = 90
+
+# Colonnes texte volumineuses, compressées dans l'archive
+COMPRESSED_COLUMNS = ['job_description', 'company_description']
+
+ARCHIVED_COLUMNS = [
+    'job_url', 'job_id', 'job_title', 'contract_type', 'publication_date', 'location',
+    'job_family', 'duration', 'management_position', 'status',
+    'education_level', 'experience_level', 'training_specialization',
+    'technical_skills', 'behavioral_skills', 'tools', 'languages',
+    'job_description', 'company_name', 'company_description',
+    'first_seen', 'last_updated', 'scrape_attempts', 'is_valid', 'content_hash', 'last_seen',
+]
+
+# Une ligne par archivage : une offre republiée puis de nouveau expirée est archivée
+# une seconde fois (generation 2) sans écraser la première copie
+ARCHIVED_JOBS_SCHEMA = f"""
+    CREATE TABLE IF NOT EXISTS archived_jobs (
+        source TEXT NOT NULL,
+        generation INTEGER NOT NULL DEFAULT 1,
+        {', '.join(f'{c} BLOB' if c in COMPRESSED_COLUMNS else f'{c}' for c in ARCHIVED_COLUMNS)},
+        archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (source, job_url, generation)
+    );
+"""
+
+# Numérotation continue par offre : les versions d'un nouvel archivage suivent les précédentes
+ARCHIVED_VERSIONS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS archived_versions (
+        source TEXT NOT NULL,
+        job_url TEXT NOT NULL,
+        version INTEGER NOT NULL,
+        recorded_at TIMESTAMP,
+        changed_fields TEXT NOT NULL,
+        patch BLOB NOT NULL,
+        PRIMARY KEY (source, job_url, version)
+    );
+"""
+
+ARCHIVE_SCHEMA = ARCHIVED_JOBS_SCHEMA + ARCHIVED_VERSIONS_SCHEMA
+
+
+# Requêtes exécutées telles quelles (plans vérifiés par tests/test_query_plans.py)
+SELECT_TO_ARCHIVE_SQL = """
+    INSERT INTO temp.to_archive
+    SELECT job_url FROM jobs WHERE status = 'Expired' AND last_updated < datetime('now', ?)
+"""
+
+COPY_JOBS_SQL = f"""
+    INSERT INTO archive.archived_jobs (source, generation, {', '.join(ARCHIVED_COLUMNS)})
+    SELECT ?1,
+           COALESCE((SELECT MAX(a.generation) FROM archive.archived_jobs a
+                     WHERE a.source = ?1 AND a.job_url = jobs.job_url), 0) + 1,
+           {', '.join(f'zcompress({c})' if c in COMPRESSED_COLUMNS else c for c in ARCHIVED_COLUMNS)}
+    FROM jobs
+    WHERE job_url IN (SELECT job_url FROM temp.to_archive)
+"""
+
+# job_versions repart de 1 pour une offre republiée : décalage par les versions déjà archivées
+COPY_VERSIONS_SQL = """
+    INSERT INTO archive.archived_versions
+        (source, job_url, version, recorded_at, changed_fields, patch)
+    SELECT ?1, v.job_url,
+           v.version + COALESCE((SELECT MAX(a.version) FROM archive.archived_versions a
+                                 WHERE a.source = ?1 AND a.job_url = v.job_url), 0),
+           v.recorded_at, v.changed_fields, v.patch
+    FROM job_versions v
+    WHERE v.job_url IN (SELECT job_url FROM temp.to_archive)
+"""
+
+DELETE_VERSIONS_SQL = "DELETE FROM job_versions WHERE job_url IN (SELECT job_url FROM temp.to_archive)"
+
+DELETE_JOBS_SQL = "DELETE FROM jobs WHERE job_url IN (SELECT job_url FROM temp.to_archive)"
+
+# Base unique (attachée comme unified) : retrait des seules offres archivées par ce run pour
+# cette source ; une offre archivée autrefois puis revenue Live y reste
+DELETE_UNIFIED_SQL = """
+    DELETE FROM unified.jobs
+    WHERE source = ? AND job_url IN (SELECT job_url FROM temp.to_archive)
+"""
+
+
+def zcompress(text):
+    if text is None:
+        return None
+    return zlib.compress(text.encode('utf-8'), 9)
+
+
+def zdecompress(data):
+    if data is None or isinstance(data, str):
+        return data
+    return zlib.decompress(data).decode('utf-8')
+
+
+def _in_archive(schema: str) -> str:
+    return schema.replace("CREATE TABLE IF NOT EXISTS ", "CREATE TABLE IF NOT EXISTS archive.")
+
+
+def init_archive(conn: sqlite3.Connection):
+    """
+    Tables de l'archive attachée (schéma archive) ; les archives créées avant
+    la colonne generation sont reconstruites (copies existantes : generation 1)
+    """
+    conn.executescript(_in_archive(ARCHIVE_SCHEMA))
+    columns = {row[1] for row in conn.execute("PRAGMA archive.table_info(archived_jobs)")}
+    if 'generation' not in columns:
+        copied = ', '.join(['source', *ARCHIVED_COLUMNS, 'archived_at'])
+        conn.executescript(f"""
+            BEGIN;
+            ALTER TABLE archive.archived_jobs RENAME TO archived_jobs_v1;
+            {_in_archive(ARCHIVED_JOBS_SCHEMA)}
+            INSERT INTO archive.archived_jobs ({copied}) SELECT {copied} FROM archive.archived_jobs_v1;
+            DROP TABLE archive.archived_jobs_v1;
+            COMMIT;
+        """)
+
+
+def enable_incremental_vacuum(conn: sqlite3.Connection):
+    """Passe la base en auto_vacuum incrémental (VACUUM complet une seule fois si nécessaire)"""
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+
+
+def archive_source(source: str, db_path: Path, archive_path: Path = ARCHIVE_DB,
+                   retention_days: int = RETENTION_DAYS, unified_path: Path = UNIFIED_DB) -> Dict:
+    """
+    Déplace les offres expirées anciennes d'une base de scraper vers l'archive
+    (et les retire de la base unique si elle existe, dans la même transaction)
+
+    Returns:
+        Dict avec archived (offres déplacées), versions et freed (octets rendus)
+    """
+    conn = sqlite3.connect(db_path)
+    conn.create_function("zcompress", 1, zcompress, deterministic=True)
+    try:
+        migrate_schema(conn)
+        conn.commit()
+        enable_incremental_vacuum(conn)
+        size_before = db_path.stat().st_size
+
+        conn.execute("ATTACH DATABASE ? AS archive", (str(archive_path),))
+        init_archive(conn)
+        with_unified = unified_path is not None and unified_path.exists()
+        if with_unified:
+            conn.execute("ATTACH DATABASE ? AS unified", (str(unified_path),))
+
+        params = (f"-{int(retention_days)} days",)
+
+        # Copie puis suppression dans une seule transaction
+        with conn:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS to_archive (job_url TEXT PRIMARY KEY)")
+            conn.execute("DELETE FROM temp.to_archive")
+            archived = conn.execute(SELECT_TO_ARCHIVE_SQL, params).rowcount
+            conn.execute(COPY_JOBS_SQL, (source,))
+            versions = conn.execute(COPY_VERSIONS_SQL, (source,)).rowcount
+            conn.execute(DELETE_VERSIONS_SQL)
+            conn.execute(DELETE_JOBS_SQL)
+            if with_unified:
+                conn.execute(DELETE_UNIFIED_SQL, (source,))
+
+        if with_unified:
+            conn.execute("DETACH DATABASE unified")
+        conn.execute("DETACH DATABASE archive")
+        # incremental_vacuum libère une page par pas : executescript va jusqu'au bout
+        conn.executescript("PRAGMA incremental_vacuum;")
+    finally:
+        conn.close()
+
+    return {
+        'archived': archived,
+        'versions': versions,
+        'freed': max(size_before - db_path.stat().st_size, 0),
+    }
+
+
+def archive_expired(retention_days: int = RETENTION_DAYS, sources=SOURCES,
+                    archive_path: Path = ARCHIVE_DB, unified_path: Path = UNIFIED_DB) -> int:
+    """Archive les offres expirées anciennes de toutes les sources (et les retire de la base unique)"""
+    total = 0
+    for name, db_path in sources:
+        if not db_path.exists():
+            print(f"⚠️ Base de données manquante : {db_path}")
+            continue
+        stats = archive_source(name, db_path, archive_path, retention_days, unified_path)
+        total += stats['archived']
+        print(f"   ✅ {name} : {stats['archived']} offres archivées ({stats['versions']} versions), "
+              f"{stats['freed'] / 1024:.1f} Ko libérés")
+
+    return total
+
+
+def open_history(db_path: Path, source: str, archive_path: Path = ARCHIVE_DB) -> sqlite3.Connection:
+    """
+    Connexion à une base de scraper avec une vue temporaire jobs_history :
+    offres courantes + offres archivées de cette source (descriptions décompressées)
+    """
+    conn = sqlite3.connect(db_path)
+    conn.create_function("zdecompress", 1, zdecompress, deterministic=True)
+    columns = ', '.join(ARCHIVED_COLUMNS)
+    archived = ', '.join(f'zdecompress({c}) AS {c}' if c in COMPRESSED_COLUMNS else c for c in ARCHIVED_COLUMNS)
+    if archive_path.exists():
+        conn.execute("ATTACH DATABASE ? AS archive", (str(archive_path),))
+        conn.execute(f"""
+            CREATE TEMP VIEW jobs_history AS
+            SELECT {columns}, 0 AS archived FROM main.jobs
+            UNION ALL
+            SELECT {archived}, 1 AS archived FROM archive.archived_jobs WHERE source = '{source.replace("'", "''")}'
+        """)
+    else:
+        conn.execute(f"CREATE TEMP VIEW jobs_history AS SELECT {columns}, 0 AS archived FROM main.jobs")
+    return conn
+
+
+if __name__ == "__main__":
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else RETENTION_DAYS
+    print(f"🗄️ Archivage des offres expirées depuis plus de {days} jours vers {ARCHIVE_DB.name}...")
+    total = archive_expired(days)
+    print(f"✅ {total} offres archivées")
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Couche SQLite du serveur d'authentification (users.db)
+- Pool de connexions réutilisées d'une requête à l'autre (plus d'ouverture par requête)
+- Mode WAL : les connexions (lectures) ne sont plus bloquées par les écritures
+- Requêtes préparées : le cache de sqlite3 (cached_statements) réutilise les requêtes
+  compilées tant que le texte SQL est identique, d'où les constantes ci-dessous
+- Écritures en BEGIN IMMEDIATE, rejouées avec backoff si la base est occupée
+"""
+
+import queue
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+
+POOL_SIZE = 8
+ACQUIRE_TIMEOUT = 10      # secondes d'attente d'une connexion libre
+BUSY_TIMEOUT_MS = 2000    # attente du verrou côté SQLite avant SQLITE_BUSY
+STATEMENT_CACHE = 64
+WRITE_RETRIES = 5
+
+# Requêtes des endpoints (texte constant pour le cache des requêtes préparées)
+SQL_USER_EXISTS = "SELECT id FROM users WHERE email = ?"
+SQL_INSERT_USER = """
+    INSERT INTO users (email, password_hash, verification_token, verification_token_expires)
+    VALUES (?, ?, ?, ?)
+"""
+SQL_LOGIN_USER = """
+    SELECT id, email, password_hash, email_verified
+    FROM users WHERE email = ?
+"""
+SQL_UPDATE_LAST_LOGIN = "UPDATE users SET last_login = ? WHERE id = ?"
+SQL_USER_BY_TOKEN = """
+    SELECT id, email, verification_token_expires
+    FROM users WHERE verification_token = ?
+"""
+SQL_MARK_VERIFIED = """
+    UPDATE users
+    SET email_verified = 1, verification_token = NULL, verification_token_expires = NULL
+    WHERE id = ?
+"""
+SQL_GET_PROFILE = """
+    SELECT civility, first_name, last_name, phone, address, postal_code, city, country, updated_at
+    FROM profiles WHERE user_id = ?
+"""
+SQL_UPSERT_PROFILE = """
+    INSERT INTO profiles (user_id, civility, first_name, last_name, phone, address, postal_code, city, country)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (user_id) DO UPDATE SET
+        civility = excluded.civility, first_name = excluded.first_name,
+        last_name = excluded.last_name, phone = excluded.phone,
+        address = excluded.address, postal_code = excluded.postal_code,
+        city = excluded.city, country = excluded.country,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+
+def open_connection(db_path: Path) -> sqlite3.Connection:
+    """Ouvre une connexion configurée (WAL, busy_timeout, cache de requêtes)"""
+    conn = sqlite3.connect(
+        db_path,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        cached_statements=STATEMENT_CACHE,
+        check_same_thread=False,  # une connexion n'est utilisée que par une requête à la fois
+    )
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+
+class ConnectionPool:
+    """Pool borné de connexions SQLite, créées à la demande et réutilisées"""
+
+    def __init__(self, db_path: Path, size: int = POOL_SIZE):
+        self.db_path = db_path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+        if create:
+            try:
+                return open_connection(self.db_path)
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        try:
+            return self._idle.get(timeout=ACQUIRE_TIMEOUT)
+        except queue.Empty:
+            raise sqlite3.OperationalError("aucune connexion disponible dans le pool")
+
+    def release(self, conn: sqlite3.Connection):
+        # Une transaction laissée ouverte (exception) ne doit pas passer à la requête suivante
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self):
+        """Ferme les connexions libres (arrêt du serveur, tests)"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+
+def is_busy(error: Exception) -> bool:
+    message = str(error).lower()
+    return isinstance(error, sqlite3.OperationalError) and ('locked' in message or 'busy' in message)
+
+
+def retry_on_busy(f):
+    """
+    Décorateur pour une écriture f(conn, ...) : transaction BEGIN IMMEDIATE,
+    commit en fin de fonction, rejouée avec backoff exponentiel si la base est occupée
+    """
+    @wraps(f)
+    def wrapper(conn, *args, **kwargs):
+        delay = 0.01
+        for attempt in range(WRITE_RETRIES):
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                result = f(conn, *args, **kwargs)
+                conn.commit()
+                return result
+            except sqlite3.OperationalError as e:
+                if conn.in_transaction:
+                    conn.rollback()
+                if not is_busy(e) or attempt == WRITE_RETRIES - 1:
+                    raise
+                time.sleep(delay * (1 + random.random()))
+                delay *= 2
+            except Exception:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+    return wrapper
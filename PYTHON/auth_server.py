@@ -4,20 +4,26 @@ Serveur Flask pour l'authentification
 Gère l'inscription, la connexion et la vérification d'email
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g, Response
 from flask_cors import CORS
 import sqlite3
 import hashlib
 import secrets
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta
 from pathlib import Path
 import os
 from functools import wraps
 import jwt
 
+from auth_db import (
+    ConnectionPool, retry_on_busy,
+    SQL_USER_EXISTS, SQL_INSERT_USER, SQL_LOGIN_USER, SQL_UPDATE_LAST_LOGIN,
+    SQL_USER_BY_TOKEN, SQL_MARK_VERIFIED, SQL_GET_PROFILE, SQL_UPSERT_PROFILE,
+)
+from email_outbox import OutboxWorker, SmtpSession, enqueue_email, init_outbox
+from validation_jobs import ValidationJobQueue, QueueFull, public_view
+from phase_timer import PhaseStats
+
 app = Flask(__name__)
 # Configuration CORS pour permettre les requêtes depuis GitHub Pages
 CORS(app, resources={
@@ -44,11 +50,42 @@ SMTP_PORT = int(os.environ.get('SMTP_PORT', '587'))
 SMTP_USER = os.environ.get('SMTP_USER', '')  # Votre email
 SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD', '')  # Votre mot de passe ou app password
 EMAIL_FROM = os.environ.get('EMAIL_FROM', SMTP_USER)
+SMTP_STARTTLS = os.environ.get('SMTP_STARTTLS', '1') != '0'  # 0 pour un serveur SMTP local de test
 BASE_URL = os.environ.get('BASE_URL', 'http://localhost:5000')
 
+# Tests de connexion bancaire : navigateurs simultanés et tests en attente
+VALIDATION_WORKERS = int(os.environ.get('VALIDATION_WORKERS', '2'))
+VALIDATION_QUEUE_SIZE = int(os.environ.get('VALIDATION_QUEUE_SIZE', '20'))
+
+# Durée de validité du token d'un flux SSE (passé dans l'URL, donc court et limité à un test)
+SSE_TOKEN_MINUTES = 5
+
+# Connexions SQLite réutilisées entre les requêtes (WAL, requêtes préparées)
+db_pool = ConnectionPool(DB_PATH)
+
+# Envoi des emails en arrière-plan (démarré par start_outbox_worker)
+outbox_worker = None
+
+def get_db():
+    """Connexion du pool attribuée à la requête en cours"""
+    if 'db' not in g:
+        g.db = db_pool.acquire()
+    return g.db
+
+@app.teardown_appcontext
+def release_db(exception=None):
+    """Rend la connexion au pool à la fin de la requête"""
+    conn = g.pop('db', None)
+    if conn is not None:
+        db_pool.release(conn)
+
 def init_db():
     """Initialise la base de données des utilisateurs"""
-    conn = sqlite3.connect(DB_PATH)
+    with db_pool.connection() as conn:
+        _create_schema(conn)
+        init_outbox(conn)
+
+def _create_schema(conn):
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -117,7 +154,6 @@ def init_db():
         pass
     
     conn.commit()
-    conn.close()
 
 def hash_password(password):
     """Hash un mot de passe avec SHA-256"""
@@ -127,22 +163,14 @@ def generate_verification_token():
     """Génère un token de vérification"""
     return secrets.token_urlsafe(32)
 
-def send_verification_email(email, token):
-    """Envoie un email de vérification"""
-    if not SMTP_USER or not SMTP_PASSWORD:
-        print(f"⚠️ SMTP non configuré. Token de vérification pour {email}: {token}")
-        print(f"   URL de vérification: {BASE_URL}/api/verify?token={token}")
-        return False
+def smtp_configured():
+    return bool(SMTP_USER and SMTP_PASSWORD)
+
+def build_verification_email(token):
+    """Sujet, texte et HTML de l'email de vérification"""
+    verification_url = f"{BASE_URL}/api/verify?token={token}"
     
-    try:
-        verification_url = f"{BASE_URL}/api/verify?token={token}"
-        
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = 'Vérification de votre email - Taleos'
-        msg['From'] = EMAIL_FROM
-        msg['To'] = email
-        
-        text = f"""
+    text = f"""
 Bonjour,
 
 Merci de vous être inscrit sur Taleos !
@@ -156,9 +184,9 @@ Si vous n'avez pas créé de compte sur Taleos, vous pouvez ignorer cet email.
 
 Cordialement,
 L'équipe Taleos
-        """
-        
-        html = f"""
+    """
+    
+    html = f"""
 <!DOCTYPE html>
 <html>
 <head>
@@ -208,23 +236,31 @@ L'équipe Taleos
     </div>
 </body>
 </html>
-        """
-        
-        part1 = MIMEText(text, 'plain')
-        part2 = MIMEText(html, 'html')
-        
-        msg.attach(part1)
-        msg.attach(part2)
-        
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SMTP_USER, SMTP_PASSWORD)
-            server.send_message(msg)
-        
-        return True
-    except Exception as e:
-        print(f"❌ Erreur lors de l'envoi de l'email: {e}")
-        return False
+    """
+    
+    return 'Vérification de votre email - Taleos', text, html
+
+def queue_verification_email(conn, email, token):
+    """
+    Ajoute l'email de vérification à la boîte d'envoi (transaction en cours)
+
+    Sans SMTP configuré, aucun worker n'enverrait le message : rien n'est mis en file
+    (le lien est affiché dans les logs) et la fonction retourne None
+    """
+    if not smtp_configured():
+        print(f"⚠️ SMTP non configuré. Token de vérification pour {email}: {token}")
+        print(f"   URL de vérification: {BASE_URL}/api/verify?token={token}")
+        return None
+    subject, text, html = build_verification_email(token)
+    return enqueue_email(conn, email, subject, text, html)
+
+def start_outbox_worker():
+    """Démarre le thread d'envoi des emails (session SMTP réutilisée)"""
+    global outbox_worker
+    session = SmtpSession(SMTP_SERVER, SMTP_PORT, SMTP_USER, SMTP_PASSWORD, starttls=SMTP_STARTTLS)
+    outbox_worker = OutboxWorker(DB_PATH, session, EMAIL_FROM)
+    outbox_worker.start()
+    return outbox_worker
 
 def generate_jwt_token(user_id, email):
     """Génère un token JWT pour l'authentification"""
@@ -235,6 +271,26 @@ def generate_jwt_token(user_id, email):
     }
     return jwt.encode(payload, SECRET_KEY, algorithm='HS256')
 
+@retry_on_busy
+def create_user(conn, email, password_hash, verification_token, token_expires):
+    """Insère un utilisateur et son email de vérification (même transaction) ; retourne son id"""
+    cursor = conn.execute(SQL_INSERT_USER, (email, password_hash, verification_token, token_expires))
+    queue_verification_email(conn, email, verification_token)
+    return cursor.lastrowid
+
+@retry_on_busy
+def update_last_login(conn, user_id):
+    conn.execute(SQL_UPDATE_LAST_LOGIN, (datetime.utcnow(), user_id))
+
+@retry_on_busy
+def mark_email_verified(conn, user_id):
+    conn.execute(SQL_MARK_VERIFIED, (user_id,))
+
+@retry_on_busy
+def upsert_profile(conn, user_id, civility, first_name, last_name, phone, address, postal_code, city, country):
+    conn.execute(SQL_UPSERT_PROFILE, (user_id, civility, first_name, last_name, phone,
+                                      address, postal_code, city, country))
+
 @app.route('/api/signup', methods=['POST'])
 def signup():
     """Endpoint d'inscription"""
@@ -258,13 +314,10 @@ def signup():
         if not any(c.isdigit() for c in password):
             return jsonify({'error': 'Le mot de passe doit contenir au moins un chiffre'}), 400
         
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
+        conn = get_db()
         
         # Vérifier si l'email existe déjà
-        cursor.execute("SELECT id FROM users WHERE email = ?", (email,))
-        if cursor.fetchone():
-            conn.close()
+        if conn.execute(SQL_USER_EXISTS, (email,)).fetchone():
             return jsonify({'error': 'Cet email est déjà utilisé'}), 400
         
         # Créer l'utilisateur
@@ -272,17 +325,22 @@ def signup():
         verification_token = generate_verification_token()
         token_expires = datetime.utcnow() + timedelta(hours=24)
         
-        cursor.execute("""
-            INSERT INTO users (email, password_hash, verification_token, verification_token_expires)
-            VALUES (?, ?, ?, ?)
-        """, (email, password_hash, verification_token, token_expires))
+        try:
+            user_id = create_user(conn, email, password_hash, verification_token, token_expires)
+        except sqlite3.IntegrityError:
+            # Inscription concurrente avec le même email
+            return jsonify({'error': 'Cet email est déjà utilisé'}), 400
         
-        conn.commit()
-        user_id = cursor.lastrowid
-        conn.close()
+        # L'email de vérification part en arrière-plan
+        if outbox_worker is not None:
+            outbox_worker.notify()
         
-        # Envoyer l'email de vérification
-        send_verification_email(email, verification_token)
+        if not smtp_configured():
+            return jsonify({
+                'message': "Inscription réussie. L'envoi d'emails n'est pas configuré : "
+                           "contactez l'administrateur pour vérifier votre adresse.",
+                'user_id': user_id
+            }), 201
         
         return jsonify({
             'message': 'Inscription réussie. Un email de vérification a été envoyé.',
@@ -304,36 +362,24 @@ def login():
         if not email or not password:
             return jsonify({'error': 'Email et mot de passe requis'}), 400
         
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT id, email, password_hash, email_verified
-            FROM users WHERE email = ?
-        """, (email,))
-        
-        user = cursor.fetchone()
+        conn = get_db()
+        user = conn.execute(SQL_LOGIN_USER, (email,)).fetchone()
         
         if not user:
-            conn.close()
             return jsonify({'error': 'Email ou mot de passe incorrect'}), 401
         
         user_id, user_email, password_hash, email_verified = user
         
         # Vérifier le mot de passe
         if hash_password(password) != password_hash:
-            conn.close()
             return jsonify({'error': 'Email ou mot de passe incorrect'}), 401
         
         # Vérifier si l'email est vérifié
         if not email_verified:
-            conn.close()
             return jsonify({'error': 'Veuillez vérifier votre email avant de vous connecter. Consultez votre boîte mail.'}), 403
         
         # Mettre à jour la dernière connexion
-        cursor.execute("UPDATE users SET last_login = ? WHERE id = ?", (datetime.utcnow(), user_id))
-        conn.commit()
-        conn.close()
+        update_last_login(conn, user_id)
         
         # Générer le token JWT
         token = generate_jwt_token(user_id, user_email)
@@ -357,36 +403,20 @@ def verify_email():
         if not token:
             return jsonify({'error': 'Token manquant'}), 400
         
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT id, email, verification_token_expires
-            FROM users WHERE verification_token = ?
-        """, (token,))
-        
-        user = cursor.fetchone()
+        conn = get_db()
+        user = conn.execute(SQL_USER_BY_TOKEN, (token,)).fetchone()
         
         if not user:
-            conn.close()
             return jsonify({'error': 'Token invalide'}), 400
         
         user_id, email, token_expires = user
         
         # Vérifier si le token n'a pas expiré
         if datetime.fromisoformat(token_expires) < datetime.utcnow():
-            conn.close()
             return jsonify({'error': 'Le token de vérification a expiré. Veuillez demander un nouveau lien.'}), 400
         
         # Marquer l'email comme vérifié
-        cursor.execute("""
-            UPDATE users 
-            SET email_verified = 1, verification_token = NULL, verification_token_expires = NULL
-            WHERE id = ?
-        """, (user_id,))
-        
-        conn.commit()
-        conn.close()
+        mark_email_verified(conn, user_id)
         
         return jsonify({
             'message': 'Email vérifié avec succès ! Vous pouvez maintenant vous connecter.'
@@ -396,8 +426,27 @@ def verify_email():
         print(f"❌ Erreur lors de la vérification: {e}")
         return jsonify({'error': 'Une erreur est survenue lors de la vérification'}), 500
 
+def decode_token(token, scope=None):
+    """
+    Décode un token JWT ; retourne son contenu, ou la réponse d'erreur 401
+
+    scope : None pour le token de session (en-tête Authorization), 'sse' pour le
+    token court d'un flux d'événements ; un token n'est accepté que pour son usage
+    """
+    if not token:
+        return None, (jsonify({'error': 'Token manquant'}), 401)
+    try:
+        data = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
+    except jwt.ExpiredSignatureError:
+        return None, (jsonify({'error': 'Token expiré'}), 401)
+    except jwt.InvalidTokenError:
+        return None, (jsonify({'error': 'Token invalide'}), 401)
+    if data.get('scope') != scope:
+        return None, (jsonify({'error': 'Token invalide'}), 401)
+    return data, None
+
 def verify_token(f):
-    """Décorateur pour vérifier le token JWT"""
+    """Décorateur pour vérifier le token JWT (en-tête Authorization uniquement)"""
     @wraps(f)
     def decorated(*args, **kwargs):
         token = None
@@ -410,20 +459,39 @@ def verify_token(f):
             except IndexError:
                 return jsonify({'error': 'Token invalide'}), 401
         
-        if not token:
-            return jsonify({'error': 'Token manquant'}), 401
+        data, error = decode_token(token)
+        if error:
+            return error
         
-        try:
-            # Décoder le token
-            data = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
-            current_user_id = data['user_id']
-            current_user_email = data['email']
-        except jwt.ExpiredSignatureError:
-            return jsonify({'error': 'Token expiré'}), 401
-        except jwt.InvalidTokenError:
+        return f(data['user_id'], data['email'], *args, **kwargs)
+    
+    return decorated
+
+def generate_sse_token(user_id, email, job_id):
+    """
+    Token court (SSE_TOKEN_MINUTES) limité au flux d'événements d'un test :
+    EventSource ne peut pas envoyer d'en-tête Authorization, seul ce token passe
+    dans l'URL (?access_token=), jamais le token de session
+    """
+    payload = {
+        'user_id': user_id,
+        'email': email,
+        'job_id': job_id,
+        'scope': 'sse',
+        'exp': datetime.utcnow() + timedelta(minutes=SSE_TOKEN_MINUTES)
+    }
+    return jwt.encode(payload, SECRET_KEY, algorithm='HS256')
+
+def verify_sse_token(f):
+    """Décorateur du flux SSE : token ?access_token= émis pour ce test (generate_sse_token)"""
+    @wraps(f)
+    def decorated(job_id, *args, **kwargs):
+        data, error = decode_token(request.args.get('access_token'), scope='sse')
+        if error:
+            return error
+        if data.get('job_id') != job_id:
             return jsonify({'error': 'Token invalide'}), 401
-        
-        return f(current_user_id, current_user_email, *args, **kwargs)
+        return f(data['user_id'], data['email'], job_id, *args, **kwargs)
     
     return decorated
 
@@ -432,17 +500,9 @@ def verify_token(f):
 def get_profile(user_id, user_email):
     """Récupère le profil de l'utilisateur"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT civility, first_name, last_name, phone, address, postal_code, city, country, updated_at
-            FROM profiles WHERE user_id = ?
-        """, (user_id,))
-        
-        profile = cursor.fetchone()
-        conn.close()
+        cursor = get_db().cursor()
+        cursor.row_factory = sqlite3.Row
+        profile = cursor.execute(SQL_GET_PROFILE, (user_id,)).fetchone()
         
         if profile:
             return jsonify({
@@ -484,31 +544,9 @@ def save_profile(user_id, user_email):
         if civility and civility not in ['Madame', 'Monsieur', 'Ne souhaite pas se prononcer']:
             return jsonify({'error': 'Civilité invalide'}), 400
         
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        # Vérifier si le profil existe déjà
-        cursor.execute("SELECT user_id FROM profiles WHERE user_id = ?", (user_id,))
-        exists = cursor.fetchone()
-        
-        if exists:
-            # Mettre à jour
-            cursor.execute("""
-                UPDATE profiles 
-                SET civility = ?, first_name = ?, last_name = ?, phone = ?, 
-                    address = ?, postal_code = ?, city = ?, country = ?, 
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE user_id = ?
-            """, (civility, first_name, last_name, phone, address, postal_code, city, country, user_id))
-        else:
-            # Créer
-            cursor.execute("""
-                INSERT INTO profiles (user_id, civility, first_name, last_name, phone, address, postal_code, city, country)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (user_id, civility, first_name, last_name, phone, address, postal_code, city, country))
-        
-        conn.commit()
-        conn.close()
+        # Créer ou mettre à jour en une requête
+        upsert_profile(get_db(), user_id, civility, first_name, last_name, phone,
+                       address, postal_code, city, country)
         
         return jsonify({
             'message': 'Profil enregistré avec succès',
@@ -528,10 +566,41 @@ def save_profile(user_id, user_email):
         print(f"❌ Erreur lors de la sauvegarde du profil: {e}")
         return jsonify({'error': 'Une erreur est survenue lors de l\'enregistrement'}), 500
 
+def run_bank_connection_test(bank_id, email, password):
+    """Exécuté par le pool de validation (hors du thread de la requête HTTP)"""
+    from test_bank_connection import test_connection_sync
+    result = test_connection_sync(bank_id, email, password, timeout=30)
+    phases = (result.get('details') or {}).get('phases')
+    if phases:
+        phase_stats.record(phases)
+    return result
+
+# Durées par étape des derniers tests (browser_start, page_load... voir phase_timer)
+phase_stats = PhaseStats()
+
+validation_queue = ValidationJobQueue(run_bank_connection_test, max_workers=VALIDATION_WORKERS,
+                                      max_queue=VALIDATION_QUEUE_SIZE)
+
+def events_url(user_id, email, job_id):
+    """URL du flux SSE d'un test, avec son token court"""
+    return f"/api/test-bank-connection/{job_id}/events?access_token={generate_sse_token(user_id, email, job_id)}"
+
+def find_validation_job(job_id, user_id):
+    """Test de connexion de l'utilisateur (None si inconnu, expiré ou d'un autre compte)"""
+    job = validation_queue.get(job_id)
+    if job is None or job['owner'] != user_id:
+        return None
+    return job
+
 @app.route('/api/test-bank-connection', methods=['POST'])
 @verify_token
 def test_bank_connection(user_id, user_email):
-    """Endpoint pour tester une connexion bancaire"""
+    """
+    Endpoint pour tester une connexion bancaire
+    Met le test en file et répond 202 avec un job_id ; le résultat se lit sur
+    /api/test-bank-connection/<job_id> (ou /events en SSE). ?wait=1 attend le
+    résultat comme avant (clients synchrones).
+    """
     try:
         data = request.get_json()
         bank_id = data.get('bank_id', '').strip()
@@ -542,21 +611,37 @@ def test_bank_connection(user_id, user_email):
         if not bank_id or not email or not password:
             return jsonify({'error': 'bank_id, email et password requis'}), 400
         
-        # Importer le module de test de connexion
+        # Vérifier que le module de test de connexion est disponible
         try:
-            from test_bank_connection import test_connection_sync
+            from test_bank_connection import test_connection_sync  # noqa: F401 (Playwright disponible)
         except ImportError as e:
             return jsonify({
                 'success': False,
-                'message': 'Module de test de connexion non disponible. Vérifiez que Selenium est installé.',
+                'message': 'Module de test de connexion non disponible. Vérifiez que Playwright est installé (pip install playwright && playwright install chromium).',
                 'error': 'MODULE_NOT_FOUND',
                 'details': str(e)
             }), 500
         
-        # Tester la connexion
-        result = test_connection_sync(bank_id, email, password, timeout=30)
+        try:
+            job_id = validation_queue.submit(owner=user_id, bank_id=bank_id, email=email, password=password)
+        except QueueFull:
+            return jsonify({
+                'success': False,
+                'message': 'Trop de tests de connexion en cours, réessayez dans quelques instants.',
+                'error': 'QUEUE_FULL'
+            }), 503, {'Retry-After': '30'}
         
-        return jsonify(result), 200
+        if request.args.get('wait'):
+            job = validation_queue.wait_result(job_id, timeout=120)
+            if job and job['result'] is not None:
+                return jsonify(job['result']), 200
+        
+        return jsonify({
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': f"/api/test-bank-connection/{job_id}",
+            'events_url': events_url(user_id, user_email, job_id)
+        }), 202
         
     except Exception as e:
         print(f"❌ Erreur lors du test de connexion: {e}")
@@ -566,6 +651,32 @@ def test_bank_connection(user_id, user_email):
             'error': str(e)
         }), 500
 
+@app.route('/api/test-bank-connection/<job_id>', methods=['GET'])
+@verify_token
+def test_bank_connection_status(user_id, user_email, job_id):
+    """État d'un test de connexion (queued, running, done, error) et résultat ; events_url renouvelée"""
+    job = find_validation_job(job_id, user_id)
+    if job is None:
+        return jsonify({'error': 'Test inconnu ou expiré'}), 404
+    return jsonify({**public_view(job), 'events_url': events_url(user_id, user_email, job_id)}), 200
+
+@app.route('/api/test-bank-connection/<job_id>/events', methods=['GET'])
+@verify_sse_token
+def test_bank_connection_events(user_id, user_email, job_id):
+    """Flux Server-Sent Events d'un test de connexion, jusqu'au résultat"""
+    if find_validation_job(job_id, user_id) is None:
+        return jsonify({'error': 'Test inconnu ou expiré'}), 404
+    return Response(validation_queue.sse_events(job_id), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """File de validation (profondeur, temps d'attente et d'exécution) et percentiles par étape"""
+    return jsonify({
+        'validation_queue': validation_queue.metrics(),
+        'phases': phase_stats.summary(),
+    }), 200
+
 @app.route('/api/health', methods=['GET'])
 def health():
     """Endpoint de santé pour vérifier que le serveur fonctionne"""
@@ -578,8 +689,9 @@ if __name__ == '__main__':
     print("=" * 80)
     print(f"📁 Base de données: {DB_PATH}")
     print(f"🌐 URL: {BASE_URL}")
-    if SMTP_USER:
-        print(f"📧 Email configuré: {SMTP_USER}")
+    if smtp_configured():
+        start_outbox_worker()
+        print(f"📧 Email configuré: {SMTP_USER} (envoi en arrière-plan)")
     else:
         print("⚠️  SMTP non configuré - les emails ne seront pas envoyés")
         print("   Configurez SMTP_USER et SMTP_PASSWORD pour activer l'envoi d'emails")
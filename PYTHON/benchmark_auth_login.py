@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark : débit de /api/login sous une rafale de connexions concurrentes
+- avant : une connexion sqlite3 ouverte et fermée par requête (journal rollback)
+- après : pool de connexions auth_db (WAL, requêtes préparées, retry si occupée)
+
+Les deux variantes passent par le client de test Flask, sur deux bases temporaires
+identiques ; la variante « avant » reproduit l'ancien endpoint.
+
+Usage:
+    python benchmark_auth_login.py [nb_requetes] [nb_threads]
+"""
+
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from flask import jsonify, request
+
+import auth_server
+from auth_db import ConnectionPool
+
+NB_USERS = 200
+PASSWORD = 'Benchmark123'
+
+
+def legacy_login():
+    """Ancien /api/login : nouvelle connexion à chaque requête"""
+    data = request.get_json()
+    email = data.get('email', '').strip().lower()
+    password = data.get('password', '')
+
+    conn = sqlite3.connect(LEGACY_DB)
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT id, email, password_hash, email_verified
+        FROM users WHERE email = ?
+    """, (email,))
+    user = cursor.fetchone()
+    if not user or auth_server.hash_password(password) != user[2]:
+        conn.close()
+        return jsonify({'error': 'Email ou mot de passe incorrect'}), 401
+    cursor.execute("UPDATE users SET last_login = ? WHERE id = ?", (datetime.utcnow(), user[0]))
+    conn.commit()
+    conn.close()
+    return jsonify({'message': 'Connexion réussie', 'token': auth_server.generate_jwt_token(user[0], user[1])}), 200
+
+
+def create_users(db_path: Path):
+    """Crée la base (schéma de auth_server) avec NB_USERS comptes vérifiés"""
+    conn = sqlite3.connect(db_path)
+    auth_server._create_schema(conn)
+    conn.executemany(
+        "INSERT INTO users (email, password_hash, email_verified) VALUES (?, ?, 1)",
+        [(f"user{i}@example.com", auth_server.hash_password(PASSWORD)) for i in range(NB_USERS)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def run_burst(url: str, nb_requests: int, nb_threads: int):
+    """Envoie nb_requests connexions réparties sur nb_threads ; retourne (durée, erreurs, latences)"""
+    errors = []
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(offset):
+        client = auth_server.app.test_client()
+        for i in range(offset, nb_requests, nb_threads):
+            start = time.perf_counter()
+            response = client.post(url, json={'email': f"user{i % NB_USERS}@example.com", 'password': PASSWORD})
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                if response.status_code != 200:
+                    errors.append(response.status_code)
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in range(nb_threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, errors, sorted(latencies)
+
+
+def report(label, duration, errors, latencies):
+    p50 = latencies[len(latencies) // 2] * 1000
+    p95 = latencies[int(len(latencies) * 0.95)] * 1000
+    print(f"{label:<32} {len(latencies) / duration:>10.0f} {p50:>10.2f} {p95:>10.2f} {len(errors):>8}")
+    return len(latencies) / duration
+
+
+def main():
+    global LEGACY_DB
+    nb_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    nb_threads = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+
+    tmp = Path(tempfile.mkdtemp())
+    LEGACY_DB = tmp / "users_legacy.db"
+    pooled_db = tmp / "users_pool.db"
+    create_users(LEGACY_DB)
+    create_users(pooled_db)
+
+    # Endpoint réel branché sur la base temporaire
+    auth_server.db_pool = ConnectionPool(pooled_db)
+    auth_server.app.add_url_rule('/api/login-legacy', 'login_legacy', legacy_login, methods=['POST'])
+
+    print("=" * 80)
+    print(f"📊 BENCHMARK LOGIN ({nb_requests} requêtes, {nb_threads} threads, {NB_USERS} comptes)")
+    print("=" * 80)
+    print(f"{'Variante':<32} {'req/s':>10} {'p50 (ms)':>10} {'p95 (ms)':>10} {'Erreurs':>8}")
+
+    before = report("avant (connexion par requête)", *run_burst('/api/login-legacy', nb_requests, nb_threads))
+    after = report("après (pool WAL)", *run_burst('/api/login', nb_requests, nb_threads))
+
+    auth_server.db_pool.close_all()
+    print("=" * 80)
+    print(f"Gain de débit : {after / before:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
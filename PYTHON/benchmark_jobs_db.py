@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark : recherche FTS5 sur jobs.db vs scan complet en Python
+Le scan complet reproduit l'approche actuelle : charger toutes les offres
+des bases sources puis filtrer chaque offre avec des tests de sous-chaînes.
+
+Usage:
+    python benchmark_jobs_db.py [nb_iterations]
+"""
+
+import sqlite3
+import sys
+import time
+import unicodedata
+
+from jobs_db import JOBS_DB, SOURCES, JobSearch, build_jobs_db
+
+QUERIES = [
+    ("analyste", {}),
+    ("credit risque", {'status': 'Live'}),
+    ("python", {'status': 'Live', 'contract_type': 'CDI'}),
+    ("audit", {'company_name': 'Deloitte'}),
+    (None, {'status': 'Live'}),
+]
+
+
+def fold(text):
+    decomposed = unicodedata.normalize('NFKD', (text or '').lower())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def load_all_jobs():
+    """Charge toutes les offres valides des bases sources (comme les exports actuels)"""
+    jobs = []
+    for _, db_path in SOURCES:
+        if not db_path.exists():
+            continue
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        jobs.extend(dict(row) for row in conn.execute("SELECT * FROM jobs WHERE is_valid = 1"))
+        conn.close()
+    return jobs
+
+
+def full_scan(jobs, query, filters, limit=20):
+    """Recherche naïve : tous les mots doivent apparaître dans titre, description ou compétences"""
+    terms = fold(query).split() if query else []
+    matches = []
+    for job in jobs:
+        if any(job.get(k) != v for k, v in filters.items()):
+            continue
+        text = fold(' '.join(filter(None, (
+            job.get('job_title'), job.get('job_description'),
+            job.get('technical_skills'), job.get('behavioral_skills'), job.get('tools'),
+        ))))
+        if all(t in text for t in terms):
+            matches.append(job)
+    matches.sort(key=lambda x: x.get('last_updated', '') or '', reverse=True)
+    return matches[:limit]
+
+
+def timed(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        result = fn()
+    return (time.perf_counter() - start) / iterations * 1000, result
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    if not JOBS_DB.exists():
+        print(f"🔄 {JOBS_DB.name} absent, construction...")
+        if not build_jobs_db():
+            print("❌ Aucune offre dans les bases sources : rien à mesurer")
+            sys.exit(1)
+
+    load_ms, jobs = timed(load_all_jobs, 1)
+    search = JobSearch()
+
+    print("=" * 80)
+    print(f"📊 BENCHMARK RECHERCHE ({len(jobs)} offres, {iterations} itérations)")
+    print("=" * 80)
+    print(f"Chargement des bases sources en mémoire (scan Python) : {load_ms:.1f} ms\n")
+    print(f"{'Requête':<40} {'FTS5 (ms)':>10} {'Scan (ms)':>10} {'Gain':>8}")
+
+    for query, filters in QUERIES:
+        fts_ms, page = timed(lambda: search.search(query, filters=filters, limit=20), iterations)
+        scan_ms, _ = timed(lambda: full_scan(jobs, query, filters), iterations)
+        label = f"{query or '*'} {filters or ''}"[:40]
+        print(f"{label:<40} {fts_ms:>10.2f} {scan_ms:>10.2f} {scan_ms / fts_ms if fts_ms else 0:>7.1f}x"
+              f"   ({len(page['results'])} résultats)")
+
+    search.close()
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
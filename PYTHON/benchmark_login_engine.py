@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark : chargement de la page de connexion avec et sans blocage des requêtes
+- sans blocage : page complète (images, polices, médias, analytics, publicité)
+- avec blocage : BLOCK_RESOURCES et BLOCKED_DOMAINS de login_engine.py
+
+Chaque variante déroule nb_validations tests complets sur le vrai site avec une
+adresse inexistante (benchmark-<aléatoire>@example.com : aucun compte réel touché),
+un contexte à la fois, et relève par test la durée de page_load, la durée totale,
+les requêtes abouties, les octets reçus et les requêtes bloquées.
+
+Usage:
+    python benchmark_login_engine.py [nb_validations] [bank_id]
+"""
+
+import sys
+import uuid
+
+from login_engine import LoginEngine
+from phase_timer import percentiles
+
+
+def run_variant(blocking: bool, nb_validations: int, bank_id: str) -> dict:
+    engine = LoginEngine(pool_size=1, blocking=blocking, measure_transfer=True)
+    engine.start()
+    samples = {'page_load': [], 'total': [], 'requests': [], 'kilobytes': [], 'blocked': []}
+    try:
+        # Un test à blanc : lancement du navigateur et caches DNS hors mesure
+        engine.validate_sync(bank_id, f"benchmark-{uuid.uuid4().hex[:8]}@example.com", 'Benchmark123')
+        for _ in range(nb_validations):
+            result = engine.validate_sync(bank_id, f"benchmark-{uuid.uuid4().hex[:8]}@example.com", 'Benchmark123')
+            details = result.get('details', {})
+            phases = details.get('phases', {})
+            transfer = details.get('transfer')
+            if 'page_load' not in phases or transfer is None:
+                print(f"   ⚠️ Test ignoré: {result.get('message')}")
+                continue
+            samples['page_load'].append(phases['page_load'])
+            samples['total'].append(phases['total'])
+            samples['requests'].append(transfer['requests'])
+            samples['kilobytes'].append(transfer['bytes'] / 1024)
+            samples['blocked'].append(transfer['blocked'])
+    finally:
+        engine.close()
+    return {name: percentiles(values) for name, values in samples.items()}
+
+
+def main():
+    nb_validations = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    bank_id = sys.argv[2] if len(sys.argv) > 2 else 'credit_agricole'
+
+    results = {}
+    for label, blocking in (('sans blocage', False), ('avec blocage', True)):
+        print(f"⏱️  {nb_validations} tests {label}...")
+        results[label] = run_variant(blocking, nb_validations, bank_id)
+
+    print(f"\n{'':<18}{'sans blocage':>22}{'avec blocage':>22}")
+    for name, unit in (('page_load', 's'), ('total', 's'), ('requests', ''), ('kilobytes', 'Ko'), ('blocked', '')):
+        for stat in ('p50', 'p95'):
+            row = []
+            for label in ('sans blocage', 'avec blocage'):
+                value = results[label][name].get(stat)
+                row.append(f"{value:.2f} {unit}".strip() if value is not None else '-')
+            print(f"{name + ' ' + stat:<18}{row[0]:>22}{row[1]:>22}")
+
+    before = results['sans blocage']['kilobytes'].get('p50')
+    after = results['avec blocage']['kilobytes'].get('p50')
+    if before and after is not None:
+        print(f"\n✅ Octets reçus par test (médiane) : -{(1 - after / before) * 100:.0f} %")
+
+
+if __name__ == "__main__":
+    main()
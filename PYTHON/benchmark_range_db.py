@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Simulation des lectures HTTP Range sur la base exportée par range_db.py
+Chaque requête est exécutée sur une connexion neuve (cache vide, comme un navigateur
+qui arrive sur la page). Les octets lus sur le fichier sont mesurés via /proc/self/io
+(rchar) : c'est ce qu'un client sql.js-httpvfs téléchargerait, arrondi aux pages.
+
+Usage:
+    python benchmark_range_db.py [chemin_base]
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+from range_db import OUTPUT_RANGE_DB, PAGE_SIZE
+
+# Requêtes typiques du site (liste, filtres, comptages de facettes, recherche, détail)
+TYPICAL_QUERIES = [
+    ("Première page (50 offres récentes)",
+     "SELECT id, job_title, company_name, location, contract_type, last_updated FROM jobs ORDER BY id LIMIT 50", ()),
+    ("Filtre contrat = CDI",
+     "SELECT id, job_title, company_name, location FROM jobs WHERE contract_type = ? ORDER BY id LIMIT 50", ('CDI',)),
+    ("Filtre entreprise + contrat",
+     "SELECT id, job_title, location FROM jobs WHERE company_name = ? AND contract_type = ? ORDER BY id LIMIT 50",
+     ('Deloitte', 'Stage')),
+    ("Comptage facette contrat",
+     "SELECT contract_type, COUNT(*) FROM jobs GROUP BY contract_type", ()),
+    ("Comptage facette localisation",
+     "SELECT location, COUNT(*) FROM jobs GROUP BY location", ()),
+    ("Recherche plein texte 'analyste'",
+     "SELECT j.id, j.job_title FROM jobs_fts JOIN jobs j ON j.id = jobs_fts.rowid "
+     "WHERE jobs_fts MATCH ? ORDER BY rank LIMIT 20", ('analyste',)),
+    ("Fiche détail d'une offre",
+     "SELECT * FROM jobs j JOIN job_details d ON d.id = j.id WHERE j.id = ?", (42,)),
+]
+
+
+def read_bytes() -> int:
+    """Octets lus par le processus (compteur noyau Linux)"""
+    with open('/proc/self/io') as f:
+        for line in f:
+            if line.startswith('rchar:'):
+                return int(line.split()[1])
+    raise RuntimeError("rchar absent de /proc/self/io")
+
+
+def measure(db_path: Path, sql: str, params) -> tuple:
+    """Exécute une requête sur une connexion neuve et retourne (octets lus, nb lignes)"""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro&immutable=1", uri=True)
+    # Pas de mmap : toutes les lectures passent par read() et sont comptées
+    conn.execute("PRAGMA mmap_size = 0")
+    before = read_bytes()
+    rows = conn.execute(sql, params).fetchall()
+    after = read_bytes()
+    conn.close()
+    return after - before, len(rows)
+
+
+def main():
+    db_path = Path(sys.argv[1]) if len(sys.argv) > 1 else OUTPUT_RANGE_DB
+    if not db_path.exists():
+        print(f"❌ Base introuvable : {db_path} (lancez d'abord range_db.py)")
+        sys.exit(1)
+    if not Path('/proc/self/io').exists():
+        print("❌ /proc/self/io indisponible : la simulation nécessite Linux")
+        sys.exit(1)
+
+    file_size = db_path.stat().st_size
+    live_json = db_path.parent / "scraped_jobs_live.json"
+
+    print("=" * 80)
+    print(f"📊 SIMULATION DE LECTURES HTTP RANGE ({db_path.name}, {file_size / 1024:.1f} Ko)")
+    print("=" * 80)
+    print(f"{'Requête':<40} {'Lignes':>7} {'Octets':>10} {'Pages':>7} {'% fichier':>10}")
+
+    for label, sql, params in TYPICAL_QUERIES:
+        fetched, nb_rows = measure(db_path, sql, params)
+        pages = -(-fetched // PAGE_SIZE)
+        print(f"{label:<40} {nb_rows:>7} {fetched:>10} {pages:>7} {fetched / file_size * 100:>9.1f}%")
+
+    if live_json.exists():
+        print(f"\nÀ comparer avec {live_json.name} : {live_json.stat().st_size / 1024:.1f} Ko téléchargés en entier")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
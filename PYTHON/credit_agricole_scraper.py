@@ -29,12 +29,18 @@ from urllib3.util.retry import Retry
 try:
     from city_normalizer import normalize_city
     from country_normalizer import normalize_country
+    from job_store import (content_hash, migrate_schema, touch_if_unchanged, record_version, count_by_status,
+                           expire_urls, reconcile_urls, format_write_stats, INSERTED, UPDATED, UNCHANGED,
+                           UPSERT_JOB_SQL, EXPORT_VALID_SQL, LIVE_URLS_SQL, VALID_URLS_SQL)
 except ImportError:
     # Fallback pour exécution directe
     import sys
     sys.path.append(str(Path(__file__).parent))
     from city_normalizer import normalize_city
     from country_normalizer import normalize_country
+    from job_store import (content_hash, migrate_schema, touch_if_unchanged, record_version, count_by_status,
+                           expire_urls, reconcile_urls, format_write_stats, INSERTED, UPDATED, UNCHANGED,
+                           UPSERT_JOB_SQL, EXPORT_VALID_SQL, LIVE_URLS_SQL, VALID_URLS_SQL)
 
 # ============================================================================
 # CONFIGURATION
@@ -117,46 +123,20 @@ class JobDatabase:
     def init_db(self):
         """Initialise la structure de la base de données"""
         with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS jobs (
-                    job_url TEXT PRIMARY KEY,
-                    job_id TEXT,
-                    job_title TEXT,
-                    contract_type TEXT,
-                    publication_date TEXT,
-                    location TEXT,
-                    job_family TEXT,
-                    duration TEXT,
-                    management_position TEXT,
-                    status TEXT DEFAULT 'Live',
-                    education_level TEXT,
-                    experience_level TEXT,
-                    training_specialization TEXT,
-                    technical_skills TEXT,
-                    behavioral_skills TEXT,
-                    tools TEXT,
-                    languages TEXT,
-                    job_description TEXT,
-                    company_name TEXT,
-                    company_description TEXT,
-                    first_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    scrape_attempts INTEGER DEFAULT 0,
-                    is_valid INTEGER DEFAULT 1
-                )
-            """)
+            # Schéma versionné (table, colonnes de suivi, historique, index) : voir job_store.py
+            migrate_schema(conn)
             conn.commit()
 
     def get_existing_urls(self) -> Set[str]:
         """Récupère tous les URLs existants"""
         with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("SELECT job_url FROM jobs WHERE is_valid = 1")
+            cursor = conn.execute(VALID_URLS_SQL)
             return {row[0] for row in cursor.fetchall()}
 
     def get_live_urls(self) -> Set[str]:
         """Récupère les URLs avec status='Live'"""
         with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("SELECT job_url FROM jobs WHERE status = 'Live' AND is_valid = 1")
+            cursor = conn.execute(LIVE_URLS_SQL)
             return {row[0] for row in cursor.fetchall()}
 
     def mark_as_expired(self, urls: Set[str]):
@@ -165,16 +145,25 @@ class JobDatabase:
             return
 
         with sqlite3.connect(self.db_path) as conn:
-            placeholders = ','.join('?' * len(urls))
-            conn.execute(f"""
-                UPDATE jobs 
-                SET status = 'Expired', last_updated = CURRENT_TIMESTAMP
-                WHERE job_url IN ({placeholders})
-            """, tuple(urls))
+            expire_urls(conn, urls)
             conn.commit()
 
-    def insert_or_update_job(self, job: Dict):
-        """Insert ou update un job"""
+    def reconcile(self, current_urls: Set[str]):
+        """
+        Compare les URLs listées sur le site avec la base et expire les offres disparues
+
+        Returns:
+            (nouvelles URLs à scraper, nombre d'offres expirées)
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            return reconcile_urls(conn, current_urls)
+
+    def insert_or_update_job(self, job: Dict) -> str:
+        """Insert ou update un job
+
+        Returns:
+            INSERTED, UPDATED ou UNCHANGED (contenu identique : seul last_seen est mis à jour)
+        """
         with sqlite3.connect(self.db_path) as conn:
             # Vérifier si le job a du contenu valide
             is_valid = 1 if (job.get('job_id') or job.get('job_title') or job.get('job_description')) else 0
@@ -185,38 +174,14 @@ class JobDatabase:
                 if isinstance(job_data.get(key), list):
                     job_data[key] = json.dumps(job_data[key], ensure_ascii=False)
 
-            conn.execute("""
-                INSERT INTO jobs (
-                    job_url, job_id, job_title, contract_type, publication_date,
-                    location, job_family, duration, management_position, status,
-                    education_level, experience_level, training_specialization,
-                    technical_skills, behavioral_skills, tools, languages,
-                    job_description, company_name, company_description,
-                    scrape_attempts, is_valid, last_updated
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, ?, CURRENT_TIMESTAMP)
-                ON CONFLICT(job_url) DO UPDATE SET
-                    job_id = excluded.job_id,
-                    job_title = excluded.job_title,
-                    contract_type = excluded.contract_type,
-                    publication_date = excluded.publication_date,
-                    location = excluded.location,
-                    job_family = excluded.job_family,
-                    duration = excluded.duration,
-                    management_position = excluded.management_position,
-                    education_level = excluded.education_level,
-                    experience_level = excluded.experience_level,
-                    training_specialization = excluded.training_specialization,
-                    technical_skills = excluded.technical_skills,
-                    behavioral_skills = excluded.behavioral_skills,
-                    tools = excluded.tools,
-                    languages = excluded.languages,
-                    job_description = excluded.job_description,
-                    company_name = excluded.company_name,
-                    company_description = excluded.company_description,
-                    scrape_attempts = scrape_attempts + 1,
-                    is_valid = excluded.is_valid,
-                    last_updated = CURRENT_TIMESTAMP
-            """, (
+            # Empreinte des champs écrits par l'UPSERT (statut compris) : pas de réécriture si rien n'a changé
+            new_hash = content_hash({**job_data, 'status': job_data.get('status', 'Live'), 'is_valid': is_valid})
+            unchanged, previous = touch_if_unchanged(conn, job_data.get('job_url'), new_hash)
+            if unchanged:
+                conn.commit()
+                return UNCHANGED
+
+            conn.execute(UPSERT_JOB_SQL, (
                 job_data.get('job_url'), job_data.get('job_id'), job_data.get('job_title'),
                 job_data.get('contract_type'), job_data.get('publication_date'),
                 job_data.get('location'), job_data.get('job_family'), job_data.get('duration'),
@@ -225,26 +190,17 @@ class JobDatabase:
                 job_data.get('training_specialization'), job_data.get('technical_skills'),
                 job_data.get('behavioral_skills'), job_data.get('tools'),
                 job_data.get('languages'), job_data.get('job_description'),
-                job_data.get('company_name'), job_data.get('company_description'), is_valid
+                job_data.get('company_name'), job_data.get('company_description'), is_valid, new_hash
             ))
+            # Historique : anciennes valeurs des champs modifiés
+            record_version(conn, job.get('job_url'), previous)
             conn.commit()
+            return UPDATED if previous else INSERTED
 
     def export_to_csv(self, csv_path: Path):
         """Export les données valides vers CSV"""
         with sqlite3.connect(self.db_path) as conn:
-            query = """
-                SELECT 
-                    job_id, job_title, contract_type, publication_date, location,
-                    job_family, duration, management_position, status,
-                    education_level, experience_level, training_specialization,
-                    technical_skills, behavioral_skills, tools, languages,
-                    job_description, company_name, company_description, job_url,
-                    first_seen, last_updated
-                FROM jobs 
-                WHERE is_valid = 1
-                ORDER BY last_updated DESC
-            """
-            df = pd.read_sql_query(query, conn)
+            df = pd.read_sql_query(EXPORT_VALID_SQL, conn)
 
             # Convertir JSON strings en listes lisibles
             for col in ['technical_skills', 'behavioral_skills']:
@@ -691,20 +647,16 @@ class CreditAgricoleJobPipeline:
         all_current_links = self.link_scraper.scrape_all_links()
 
         # Étape 2: Identifier les nouveaux et les expirés
+        # Étapes 2 et 3 en une transaction : nouvelles offres (anti-jointure) et expirées (NOT IN)
         self.logger.info("\n🔍 ÉTAPE 2: Analyse des changements")
-        existing_live_urls = self.db.get_live_urls()
-
-        new_urls = all_current_links - existing_live_urls
-        expired_urls = existing_live_urls - all_current_links
+        new_urls, expired_count = self.db.reconcile(all_current_links)
 
         self.logger.info(f"✅ Nouvelles offres: {len(new_urls)}")
-        self.logger.info(f"❌ Offres expirées: {len(expired_urls)}")
+        self.logger.info(f"❌ Offres expirées: {expired_count}")
 
-        # Étape 3: Marquer les expirées
-        if expired_urls:
+        if expired_count:
             self.logger.info("\n⏳ ÉTAPE 3: Marquage des offres expirées")
-            self.db.mark_as_expired(expired_urls)
-            self.logger.info(f"✓ {len(expired_urls)} offres marquées comme expirées")
+            self.logger.info(f"✓ {expired_count} offres marquées comme expirées")
 
         # Étape 4: Scraper les nouveaux détails
         if new_urls:
@@ -729,6 +681,7 @@ class CreditAgricoleJobPipeline:
         """Scrape les jobs en parallèle"""
         successful = 0
         failed = 0
+        write_stats = {INSERTED: 0, UPDATED: 0, UNCHANGED: 0}
 
         with ThreadPoolExecutor(max_workers=self.config.max_workers) as executor:
             futures = {executor.submit(self.detail_scraper.scrape_job, url): url for url in urls}
@@ -738,7 +691,7 @@ class CreditAgricoleJobPipeline:
                     try:
                         job_data = future.result()
                         if job_data:
-                            self.db.insert_or_update_job(job_data)
+                            write_stats[self.db.insert_or_update_job(job_data)] += 1
                             successful += 1
                         else:
                             failed += 1
@@ -749,19 +702,12 @@ class CreditAgricoleJobPipeline:
                     pbar.update(1)
 
         self.logger.info(f"✓ Succès: {successful} | Échecs: {failed}")
+        self.logger.info(f"  └─ {format_write_stats(write_stats)}")
 
     def print_final_stats(self):
         """Affiche les statistiques finales"""
         with sqlite3.connect(self.config.db_path) as conn:
-            cursor = conn.execute("""
-                SELECT 
-                    COUNT(*) as total,
-                    SUM(CASE WHEN status = 'Live' THEN 1 ELSE 0 END) as live,
-                    SUM(CASE WHEN status = 'Expired' THEN 1 ELSE 0 END) as expired,
-                    SUM(CASE WHEN is_valid = 0 THEN 1 ELSE 0 END) as invalid
-                FROM jobs
-            """)
-            stats = cursor.fetchone()
+            stats = count_by_status(conn)
 
             self.logger.info("\n" + "=" * 60)
             self.logger.info("📊 STATISTIQUES FINALES")
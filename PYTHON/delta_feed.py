@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Flux de deltas des offres Live entre deux exports
+- latest.json : pointeur vers le snapshot courant et la chaîne de deltas qui le suit
+- snapshot-NNNNNN.json : liste complète des offres Live à une version donnée
+- delta-NNNNNN.json : offres ajoutées / modifiées / expirées depuis la version précédente
+
+Un consommateur à la version N lit latest.json et applique les deltas de version > N.
+Si N est antérieur au snapshot courant (deltas compactés), il recharge le snapshot.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+# Nombre de deltas conservés avant compaction dans un nouveau snapshot
+COMPACT_EVERY = 10
+
+LATEST_NAME = "latest.json"
+FINGERPRINTS_NAME = "fingerprints.json"
+
+# Champs ignorés pour détecter une modification (changent à chaque passage du scraper)
+VOLATILE_FIELDS = ('last_updated',)
+
+
+def fingerprint(job: Dict) -> str:
+    """Empreinte du contenu d'une offre, hors champs volatils"""
+    content = {k: v for k, v in job.items() if k not in VOLATILE_FIELDS}
+    payload = json.dumps(content, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _dump(path: Path, data):
+    path.write_text(json.dumps(data, ensure_ascii=False, separators=(',', ':')), encoding='utf-8')
+
+
+def _load(path: Path, default):
+    if not path.exists():
+        return default
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def publish_delta(live_jobs: List[Dict], feed_dir: Path, compact_every: int = COMPACT_EVERY) -> Dict:
+    """
+    Compare les offres Live à l'export précédent et publie une nouvelle version si besoin
+
+    Args:
+        live_jobs: Offres Live de l'export courant
+        feed_dir: Dossier du flux (ex: HTML/feed)
+        compact_every: Nombre de deltas avant de repartir d'un snapshot complet
+
+    Returns:
+        Dict avec version, added, updated, expired et snapshot (True si un snapshot a été écrit)
+    """
+    feed_dir = Path(feed_dir)
+    feed_dir.mkdir(parents=True, exist_ok=True)
+
+    latest = _load(feed_dir / LATEST_NAME, None)
+    previous = _load(feed_dir / FINGERPRINTS_NAME, {})
+
+    current = {job['job_url']: fingerprint(job) for job in live_jobs if job.get('job_url')}
+    jobs_by_url = {job['job_url']: job for job in live_jobs if job.get('job_url')}
+
+    added = [url for url in current if url not in previous]
+    updated = [url for url in current if url in previous and previous[url] != current[url]]
+    expired = [url for url in previous if url not in current]
+
+    result = {
+        'version': latest['version'] if latest else 0,
+        'added': len(added),
+        'updated': len(updated),
+        'expired': len(expired),
+        'snapshot': False,
+    }
+
+    if latest and not (added or updated or expired):
+        return result
+
+    version = (latest['version'] if latest else 0) + 1
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    result['version'] = version
+
+    if latest is None or len(latest['deltas']) >= compact_every:
+        # Compaction : nouveau snapshot complet, les anciens fichiers sont supprimés
+        snapshot_file = f"snapshot-{version:06d}.json"
+        _dump(feed_dir / snapshot_file, live_jobs)
+        for old in list(feed_dir.glob("delta-*.json")) + list(feed_dir.glob("snapshot-*.json")):
+            if old.name != snapshot_file:
+                old.unlink()
+        latest = {
+            'version': version,
+            'generated_at': now,
+            'snapshot': {'version': version, 'file': snapshot_file, 'count': len(live_jobs)},
+            'deltas': [],
+        }
+        result['snapshot'] = True
+    else:
+        delta_file = f"delta-{version:06d}.json"
+        _dump(feed_dir / delta_file, {
+            'from': version - 1,
+            'to': version,
+            'generated_at': now,
+            'added': [jobs_by_url[url] for url in added],
+            'updated': [jobs_by_url[url] for url in updated],
+            'expired': expired,
+        })
+        latest['deltas'].append({
+            'from': version - 1,
+            'to': version,
+            'file': delta_file,
+            'added': len(added),
+            'updated': len(updated),
+            'expired': len(expired),
+        })
+
+    latest['version'] = version
+    latest['generated_at'] = now
+    _dump(feed_dir / FINGERPRINTS_NAME, current)
+    (feed_dir / LATEST_NAME).write_text(json.dumps(latest, ensure_ascii=False, indent=2), encoding='utf-8')
+
+    return result
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Boîte d'envoi persistante des emails (table email_outbox de users.db)
+- enqueue_email() insère le message dans la transaction de l'appelant :
+  l'inscription est validée avec son email, sans attendre le serveur SMTP
+- OutboxWorker (thread d'arrière-plan) envoie par lots sur une session SMTP
+  réutilisée, rejoue les échecs temporaires avec backoff exponentiel et
+  enregistre le statut de chaque envoi (pending, sending, sent, failed)
+
+Un message « sending » est réservé pour LEASE_SECONDS : si le processus s'arrête
+pendant l'envoi, il redevient éligible à l'expiration du bail.
+
+Usage:
+    python email_outbox.py status    # nombre de messages par statut
+    python email_outbox.py flush     # envoie les messages en attente puis s'arrête
+"""
+
+import os
+import smtplib
+import sys
+import threading
+import time
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from auth_db import open_connection, retry_on_busy
+
+BATCH_SIZE = 20
+POLL_INTERVAL = 5          # secondes entre deux relevés de la boîte d'envoi
+LEASE_SECONDS = 120        # réservation d'un message en cours d'envoi
+MAX_ATTEMPTS = 6
+RETRY_BASE_SECONDS = 30    # 30 s, 1 min, 2 min, 4 min... plafonné à RETRY_MAX_SECONDS
+RETRY_MAX_SECONDS = 3600
+SMTP_IDLE_SECONDS = 60     # session SMTP fermée après cette durée sans envoi
+
+OUTBOX_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS email_outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        recipient TEXT NOT NULL,
+        subject TEXT NOT NULL,
+        body_text TEXT NOT NULL,
+        body_html TEXT,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_error TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        sent_at TIMESTAMP
+    );
+    -- Messages à envoyer (pending / sending) par échéance ; sent et failed hors index
+    CREATE INDEX IF NOT EXISTS idx_outbox_due ON email_outbox(next_attempt_at)
+        WHERE status IN ('pending', 'sending');
+"""
+
+
+def init_outbox(conn):
+    """Crée la table email_outbox si nécessaire"""
+    conn.executescript(OUTBOX_SCHEMA)
+
+
+def enqueue_email(conn, recipient: str, subject: str, body_text: str, body_html: Optional[str] = None) -> int:
+    """Ajoute un message à la boîte d'envoi (sans commit : transaction de l'appelant)"""
+    cursor = conn.execute(
+        "INSERT INTO email_outbox (recipient, subject, body_text, body_html) VALUES (?, ?, ?, ?)",
+        (recipient, subject, body_text, body_html),
+    )
+    return cursor.lastrowid
+
+
+def retry_delay(attempts: int) -> int:
+    return min(RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), RETRY_MAX_SECONDS)
+
+
+@retry_on_busy
+def claim_batch(conn, limit: int = BATCH_SIZE) -> List[tuple]:
+    """Réserve les messages arrivés à échéance (bail de LEASE_SECONDS)"""
+    rows = conn.execute("""
+        SELECT id, recipient, subject, body_text, body_html, attempts
+        FROM email_outbox
+        WHERE status IN ('pending', 'sending') AND next_attempt_at <= datetime('now')
+        ORDER BY next_attempt_at
+        LIMIT ?
+    """, (limit,)).fetchall()
+    conn.executemany(
+        "UPDATE email_outbox SET status = 'sending', next_attempt_at = datetime('now', ?) WHERE id = ?",
+        [(f"+{LEASE_SECONDS} seconds", row[0]) for row in rows],
+    )
+    return rows
+
+
+@retry_on_busy
+def mark_sent(conn, message_id: int):
+    conn.execute("""
+        UPDATE email_outbox
+        SET status = 'sent', attempts = attempts + 1, sent_at = CURRENT_TIMESTAMP, last_error = NULL
+        WHERE id = ?
+    """, (message_id,))
+
+
+@retry_on_busy
+def mark_failed(conn, message_id: int, attempts: int, error: str, permanent: bool = False):
+    """Échec d'envoi : nouvelle tentative différée, ou abandon (failed)"""
+    attempts += 1
+    if permanent or attempts >= MAX_ATTEMPTS:
+        conn.execute(
+            "UPDATE email_outbox SET status = 'failed', attempts = ?, last_error = ? WHERE id = ?",
+            (attempts, error, message_id),
+        )
+    else:
+        conn.execute("""
+            UPDATE email_outbox
+            SET status = 'pending', attempts = ?, last_error = ?, next_attempt_at = datetime('now', ?)
+            WHERE id = ?
+        """, (attempts, error, f"+{retry_delay(attempts)} seconds", message_id))
+
+
+def count_by_status(conn) -> Dict[str, int]:
+    return dict(conn.execute("SELECT status, COUNT(*) FROM email_outbox GROUP BY status").fetchall())
+
+
+def build_message(sender: str, recipient: str, subject: str, body_text: str, body_html: Optional[str]):
+    msg = MIMEMultipart('alternative')
+    msg['Subject'] = subject
+    msg['From'] = sender
+    msg['To'] = recipient
+    msg.attach(MIMEText(body_text, 'plain'))
+    if body_html:
+        msg.attach(MIMEText(body_html, 'html'))
+    return msg
+
+
+class SmtpSession:
+    """Connexion SMTP ouverte à la demande et réutilisée pour les envois suivants"""
+
+    def __init__(self, server: str, port: int, user: str = '', password: str = '',
+                 starttls: bool = True, timeout: int = 30):
+        self.server = server
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self._smtp = None
+        self.last_used = 0.0
+
+    def _connect(self):
+        smtp = smtplib.SMTP(self.server, self.port, timeout=self.timeout)
+        if self.starttls:
+            smtp.starttls()
+        if self.user and self.password:
+            smtp.login(self.user, self.password)
+        self._smtp = smtp
+
+    def send(self, msg):
+        if self._smtp is None:
+            self._connect()
+        try:
+            self._smtp.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # Session fermée par le serveur entre deux lots : une reconnexion
+            self._smtp = None
+            self._connect()
+            self._smtp.send_message(msg)
+        self.last_used = time.monotonic()
+
+    def reset(self):
+        """Abandonne la session après une erreur (état SMTP incertain)"""
+        if self._smtp is not None:
+            try:
+                self._smtp.close()
+            except Exception:
+                pass
+        self._smtp = None
+
+    def close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+        self._smtp = None
+
+    def close_if_idle(self, idle_seconds: int = SMTP_IDLE_SECONDS):
+        if self._smtp is not None and time.monotonic() - self.last_used > idle_seconds:
+            self.close()
+
+
+def is_permanent(error: Exception) -> bool:
+    """Erreurs 5xx (adresse refusée...) : inutile de réessayer"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+class OutboxWorker(threading.Thread):
+    """Thread d'envoi des messages de la boîte d'envoi"""
+
+    def __init__(self, db_path: Path, session: SmtpSession, sender: str,
+                 batch_size: int = BATCH_SIZE, poll_interval: float = POLL_INTERVAL):
+        super().__init__(name="email-outbox", daemon=True)
+        self.db_path = db_path
+        self.session = session
+        self.sender = sender
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+
+    def notify(self):
+        """Réveille le worker (nouveau message validé)"""
+        self._wakeup.set()
+
+    def stop(self, timeout: float = 10):
+        self._stopping.set()
+        self._wakeup.set()
+        self.join(timeout)
+
+    def process_batch(self, conn) -> int:
+        """Envoie un lot ; retourne le nombre de messages traités"""
+        batch = claim_batch(conn, self.batch_size)
+        for message_id, recipient, subject, body_text, body_html, attempts in batch:
+            try:
+                self.session.send(build_message(self.sender, recipient, subject, body_text, body_html))
+            except Exception as e:
+                # Refus du serveur : smtplib a déjà fait RSET, la session reste utilisable
+                if not isinstance(e, (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused)):
+                    self.session.reset()
+                mark_failed(conn, message_id, attempts, f"{type(e).__name__}: {e}", is_permanent(e))
+                print(f"⚠️ Envoi de l'email #{message_id} à {recipient} échoué (tentative {attempts + 1}): {e}")
+            else:
+                mark_sent(conn, message_id)
+        return len(batch)
+
+    def drain(self, conn) -> int:
+        """Envoie les messages arrivés à échéance, lot par lot"""
+        total = 0
+        while not self._stopping.is_set():
+            processed = self.process_batch(conn)
+            total += processed
+            if processed < self.batch_size:
+                break
+        return total
+
+    def run(self):
+        conn = open_connection(self.db_path)
+        try:
+            init_outbox(conn)
+            while not self._stopping.is_set():
+                try:
+                    self.drain(conn)
+                except Exception as e:
+                    print(f"❌ Erreur du worker d'envoi d'emails: {e}")
+                self.session.close_if_idle()
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+        finally:
+            self.session.close()
+            conn.close()
+
+
+def session_from_env() -> SmtpSession:
+    """Session SMTP configurée par les mêmes variables d'environnement que auth_server"""
+    return SmtpSession(
+        os.environ.get('SMTP_SERVER', 'smtp.gmail.com'),
+        int(os.environ.get('SMTP_PORT', '587')),
+        os.environ.get('SMTP_USER', ''),
+        os.environ.get('SMTP_PASSWORD', ''),
+        starttls=os.environ.get('SMTP_STARTTLS', '1') != '0',
+    )
+
+
+if __name__ == "__main__":
+    from auth_server import DB_PATH, EMAIL_FROM
+
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    conn = open_connection(DB_PATH)
+    init_outbox(conn)
+    if command == 'status':
+        print("📧 Boîte d'envoi:")
+        for status, count in sorted(count_by_status(conn).items()):
+            print(f"   - {status}: {count}")
+    elif command == 'flush':
+        worker = OutboxWorker(DB_PATH, session_from_env(), EMAIL_FROM)
+        sent = worker.drain(conn)
+        worker.session.close()
+        print(f"✅ {sent} messages traités")
+    else:
+        print(__doc__)
+        sys.exit(1)
+    conn.close()
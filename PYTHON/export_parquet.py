@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Export colonnaire (Parquet) des offres fusionnées pour l'analyse
+- Colonnes catégorielles encodées en dictionnaire (entreprise, contrat, famille, lieu, statut)
+- first_seen / last_updated en vrais timestamps
+- Un row group par entreprise : une analyse filtrée sur une entreprise ne lit que ses pages
+
+Nécessite pyarrow (pip install -r requirements_jobs.txt). Lecture conseillée :
+    pd.read_parquet("HTML/scraped_jobs.parquet", columns=["company_name", "contract_type", "first_seen"])
+"""
+
+from datetime import datetime
+from itertools import groupby
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Colonnes catégorielles (peu de valeurs distinctes) encodées en dictionnaire
+DICTIONARY_COLUMNS = ['company_name', 'contract_type', 'job_family', 'location', 'status']
+
+TIMESTAMP_COLUMNS = ['first_seen', 'last_updated']
+
+TIMESTAMP_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d')
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    """Convertit un TIMESTAMP SQLite (texte) en datetime, None si vide ou illisible"""
+    if not value:
+        return None
+    for fmt in TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(str(value), fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def build_schema(columns: List[str]):
+    """Schéma Arrow : dictionnaire pour les catégories, timestamp pour les dates, texte sinon"""
+    fields = []
+    for column in columns:
+        if column in DICTIONARY_COLUMNS:
+            fields.append(pa.field(column, pa.dictionary(pa.int32(), pa.string())))
+        elif column in TIMESTAMP_COLUMNS:
+            fields.append(pa.field(column, pa.timestamp('s')))
+        else:
+            fields.append(pa.field(column, pa.string()))
+    return pa.schema(fields)
+
+
+def write_parquet(jobs: List[Dict], columns: List[str], output_path: Path) -> Optional[Dict]:
+    """
+    Écrit les offres au format Parquet, un row group par entreprise
+
+    Args:
+        jobs: Offres (dicts) déjà nettoyées
+        columns: Ordre des colonnes (identique au CSV)
+        output_path: Fichier de sortie (ex: HTML/scraped_jobs.parquet)
+
+    Returns:
+        Statistiques (lignes, row groups, taille) ou None si pyarrow est absent
+    """
+    if pa is None:
+        print("⚠️ pyarrow non installé : export Parquet ignoré (pip install -r requirements_jobs.txt)")
+        return None
+
+    schema = build_schema(columns)
+    by_company = sorted(jobs, key=lambda x: x.get('company_name') or '')
+
+    output_path = Path(output_path)
+    tmp_path = output_path.with_suffix('.parquet.tmp')
+    row_groups = 0
+    with pq.ParquetWriter(tmp_path, schema, compression='zstd') as writer:
+        for _, group in groupby(by_company, key=lambda x: x.get('company_name') or ''):
+            group = list(group)
+            data = {}
+            for column in columns:
+                values = [job.get(column) for job in group]
+                if column in TIMESTAMP_COLUMNS:
+                    values = [parse_timestamp(v) for v in values]
+                elif column not in DICTIONARY_COLUMNS:
+                    values = [None if v is None else str(v) for v in values]
+                data[column] = values
+            table = pa.Table.from_pydict(
+                {c: pa.array(data[c], type=schema.field(c).type) for c in columns}, schema=schema
+            )
+            writer.write_table(table, row_group_size=len(group))
+            row_groups += 1
+
+    tmp_path.replace(output_path)
+    return {
+        'rows': len(jobs),
+        'row_groups': row_groups,
+        'bytes': output_path.stat().st_size,
+    }
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Index de facettes précalculé pour les filtres du site (offres.html / filtres.html)
+Pour chaque facette (pays, région, contrat, expérience...), associe chaque valeur
+au bitmap des ordinaux d'offres (position dans scraped_jobs_live.json) et à son total.
+Le navigateur répond à une combinaison de filtres par simple intersection de bitmaps.
+"""
+
+import base64
+import json
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+# Correspondance ville → région (identique à cityToRegion dans offres.html)
+CITY_TO_REGION = {
+    # Île-de-France
+    "paris": "Île-de-France", "montrouge": "Île-de-France", "villejuif": "Île-de-France",
+    "massy": "Île-de-France", "guyancourt": "Île-de-France", "la défense": "Île-de-France",
+    "la defense": "Île-de-France", "puteaux": "Île-de-France", "courbevoie": "Île-de-France",
+    "nanterre": "Île-de-France", "boulogne-billancourt": "Île-de-France",
+    "issy-les-moulineaux": "Île-de-France", "levallois-perret": "Île-de-France",
+    "neuilly-sur-seine": "Île-de-France", "saint-denis": "Île-de-France",
+    "saint-quentin-en-yvelines": "Île-de-France", "saint quentin en yvelines": "Île-de-France",
+    "région parisienne": "Île-de-France", "cergy": "Île-de-France", "evry": "Île-de-France",
+    "versailles": "Île-de-France", "st denis": "Île-de-France", "issy": "Île-de-France",
+
+    # Auvergne-Rhône-Alpes
+    "lyon": "Auvergne-Rhône-Alpes", "grenoble": "Auvergne-Rhône-Alpes", "valence": "Auvergne-Rhône-Alpes",
+    "saint-etienne": "Auvergne-Rhône-Alpes", "saint-étienne": "Auvergne-Rhône-Alpes",
+
+    # Occitanie
+    "toulouse": "Occitanie", "montpellier": "Occitanie",
+
+    # Provence-Alpes-Côte d'Azur
+    "marseille": "Provence-Alpes-Côte d'Azur", "nice": "Provence-Alpes-Côte d'Azur", "aix-en-provence": "Provence-Alpes-Côte d'Azur",
+
+    # Pays de la Loire
+    "nantes": "Pays de la Loire", "angers": "Pays de la Loire",
+
+    # Hauts-de-France
+    "lille": "Hauts-de-France", "roubaix": "Hauts-de-France", "reims": "Hauts-de-France", "amiens": "Hauts-de-France",
+
+    # Grand Est
+    "strasbourg": "Grand Est", "nancy": "Grand Est", "metz": "Grand Est",
+
+    # Nouvelle-Aquitaine
+    "bordeaux": "Nouvelle-Aquitaine", "limoges": "Nouvelle-Aquitaine", "poitiers": "Nouvelle-Aquitaine",
+
+    # Bretagne
+    "rennes": "Bretagne", "brest": "Bretagne",
+
+    # Centre-Val de Loire
+    "orléans": "Centre-Val de Loire", "orleans": "Centre-Val de Loire", "tours": "Centre-Val de Loire",
+
+    # Normandie
+    "rouen": "Normandie", "caen": "Normandie",
+
+    # Bourgogne-Franche-Comté
+    "dijon": "Bourgogne-Franche-Comté",
+
+    # International
+    "londres": "Londres", "london": "Londres", "new york": "New York", "hong-kong": "Hong-Kong",
+    "singapour": "Singapour", "singapore": "Singapour", "tokyo": "Tokyo", "francfort": "Francfort",
+    "frankfurt": "Francfort", "munich": "Munich", "milan": "Milan", "milano": "Milan",
+    "luxembourg": "Luxembourg", "bruxelles": "Bruxelles", "brussels": "Bruxelles",
+    "genève": "Genève", "geneve": "Genève", "zurich": "Zurich", "zürich": "Zurich",
+    "montréal": "Montréal", "montreal": "Montréal", "casablanca": "Casablanca", "dublin": "Dublin",
+    "madrid": "Madrid", "barcelone": "Barcelone", "barcelona": "Barcelone", "amsterdam": "Amsterdam"
+}
+
+
+def get_city_region(city: str, country: str) -> str:
+    """Région d'affichage d'une ville (même règle que getCityRegion dans offres.html)"""
+    if not city:
+        return "Autres régions françaises" if country == "France" else country
+    normalized_city = city.lower()
+    if normalized_city in CITY_TO_REGION:
+        return CITY_TO_REGION[normalized_city]
+    if country == "France":
+        return "Autres régions françaises"
+    return city  # Pour l'international pas mappé, on garde la ville (ex: "A Coruña")
+
+
+def location_facets(location: str):
+    """Retourne (pays, régions) d'une localisation 'Ville - Pays' comme le fait le front-end"""
+    if not location or ' - ' not in location:
+        return [], []
+
+    parts = location.split(' - ')
+    city_part = parts[0] or ''
+    country = parts[1].strip() if len(parts) > 1 else ''
+    if not country:
+        return [], []
+
+    cities = []
+    for raw in re.split(r'[/,]', city_part):
+        clean = raw.strip()
+        if not clean:
+            continue
+        clean = re.sub(r'\(.*?\)', '', clean).strip()
+        clean = re.sub(r'\d{5,6}', '', clean).strip()
+        # Adresse (ex: Robinson Road) : on essaye de garder le dernier mot s'il est connu
+        if ' ' in clean and clean.lower() not in CITY_TO_REGION:
+            last_word = clean.split(' ')[-1].lower()
+            if last_word in CITY_TO_REGION:
+                clean = CITY_TO_REGION[last_word]
+        if clean:
+            cities.append(clean)
+
+    if not cities:
+        regions = [get_city_region('', country)]
+    else:
+        regions = [get_city_region(city, country) for city in cities]
+
+    return [country], list(dict.fromkeys(r for r in regions if r))
+
+
+def normalize_contract_type(contract: str) -> str:
+    """Harmonisation des types de contrat (alternance / apprentissage)"""
+    if contract and contract.lower() in ('alternance', 'alternance / apprentissage', 'apprentissage'):
+        return 'Alternance'
+    return contract
+
+
+def normalize_company_name(company: str) -> str:
+    """Supprime l'acronyme entre parenthèses en fin de nom (ex: 'CAL&F')"""
+    if not company:
+        return company
+    return re.sub(r'\s*\([A-Z&]+\)\s*$', '', company).strip()
+
+
+def group_education_level(edu: str) -> str:
+    """Regroupement des niveaux d'études en 3 catégories (Bac, Bac +3, Bac +5)"""
+    if not edu:
+        return edu
+    edu_lower = re.sub(r'\s+', ' ', edu.lower())
+    if any(k in edu_lower for k in ('bac + 5', 'bac +5', 'bac+5', 'bac + 4', 'bac +4', 'bac+4',
+                                    'master', 'ingénieur', 'grande école', 'doctorat', 'm2', 'm1')):
+        return 'Bac +5'
+    if any(k in edu_lower for k in ('bac + 3', 'bac +3', 'bac+3', 'bac + 2', 'bac +2', 'bac+2',
+                                    'licence', 'bachelor', 'bts', 'dut', 'l3')):
+        return 'Bac +3'
+    if any(k in edu_lower for k in ('bac', 'lycée', 'certificat fédéral')):
+        return 'Bac'
+    return edu
+
+
+def job_facet_values(job: Dict) -> Dict[str, List[str]]:
+    """Valeurs de chaque facette pour une offre"""
+    countries, regions = location_facets(job.get('location'))
+    values = {
+        'country': countries,
+        'region': regions,
+        'contract_type': [normalize_contract_type(job.get('contract_type'))],
+        'experience_level': [job.get('experience_level')],
+        'job_family': [job.get('job_family')],
+        'company_name': [normalize_company_name(job.get('company_name'))],
+        'education_level': [group_education_level(job.get('education_level'))],
+    }
+    return {facet: [v for v in vals if v] for facet, vals in values.items()}
+
+
+def encode_bitmap(ordinals: List[int], total: int) -> str:
+    """Bitmap base64 : le bit i (octet i // 8, masque 1 << (i % 8)) vaut 1 si l'offre i a la valeur"""
+    bitmap = bytearray((total + 7) // 8)
+    for i in ordinals:
+        bitmap[i >> 3] |= 1 << (i & 7)
+    return base64.b64encode(bytes(bitmap)).decode('ascii')
+
+
+def build_facet_index(jobs: List[Dict]) -> Dict:
+    """
+    Construit l'index inversé des facettes
+
+    Args:
+        jobs: Offres dans l'ordre publié (l'ordinal d'une offre est sa position dans la liste)
+
+    Returns:
+        Dict sérialisable en JSON : facette → valeur → {count, bits}
+    """
+    postings: Dict[str, Dict[str, List[int]]] = {}
+    for ordinal, job in enumerate(jobs):
+        for facet, values in job_facet_values(job).items():
+            facet_postings = postings.setdefault(facet, {})
+            for value in values:
+                facet_postings.setdefault(value, []).append(ordinal)
+
+    total = len(jobs)
+    facets = {}
+    for facet, values in postings.items():
+        facets[facet] = {
+            value: {'count': len(ordinals), 'bits': encode_bitmap(ordinals, total)}
+            for value, ordinals in sorted(values.items(), key=lambda x: len(x[1]), reverse=True)
+        }
+
+    return {
+        'version': 1,
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'total': total,
+        'encoding': 'bitmap-base64-lsb0',
+        'facets': facets,
+    }
+
+
+def write_facet_index(jobs: List[Dict], output_path: Path) -> Dict:
+    """Construit et écrit l'index de facettes au format JSON compact"""
+    index = build_facet_index(jobs)
+    payload = json.dumps(index, ensure_ascii=False, separators=(',', ':'))
+    Path(output_path).write_text(payload, encoding='utf-8')
+
+    nb_values = sum(len(v) for v in index['facets'].values())
+    print(f"✅ Index de facettes : {len(index['facets'])} facettes, {nb_values} valeurs "
+          f"({len(payload) / 1024:.1f} Ko) dans {Path(output_path).name}")
+    return index
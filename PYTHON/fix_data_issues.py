@@ -242,6 +242,12 @@ def main():
     fix_database(CA_DB, "Crédit Agricole")
     fix_database(SG_DB, "Société Générale")
     fix_database(DELOITTE_DB, "Deloitte")
+
+    # Base unique multi-sources (si utilisée) : propager les corrections
+    from unified_store import UNIFIED_DB, import_sources
+    if UNIFIED_DB.exists():
+        print(f"\n📁 Mise à jour de {UNIFIED_DB.name}...")
+        import_sources(UNIFIED_DB)
     
     print("\n" + "=" * 80)
     print("✅ CORRECTIONS TERMINÉES")
@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+Outils partagés par les classes JobDatabase des scrapers (Crédit Agricole, Société Générale, Deloitte)
+- Empreinte (content_hash) du contenu extrait d'une offre
+- Schéma versionné (PRAGMA user_version) : table jobs, colonnes de suivi, historique, index
+- Historique des versions (table job_versions) et reconstruction d'une offre à une date
+- Rapprochement ensembliste des URLs listées avec la base (table temporaire, sans IN géant)
+
+Une offre re-scrapée dont l'empreinte n'a pas changé n'est pas réécrite :
+seul last_seen est mis à jour, last_updated ne bouge pas. L'empreinte porte sur
+les champs écrits par l'UPSERT des scrapers, statut compris ; tout changement de
+statut hors UPSERT (expiration) efface content_hash, pour qu'une offre expirée
+puis republiée soit réécrite et repasse en Live.
+
+Historique : la table jobs porte toujours la version courante. Chaque modification
+ajoute dans job_versions un patch inverse ne contenant que les anciennes valeurs des
+champs modifiés (compressé avec zlib s'il dépasse COMPRESS_THRESHOLD octets).
+Pour revoir une offre à une date donnée, on part de la ligne courante et on applique
+les patchs postérieurs à cette date, du plus récent au plus ancien.
+
+Usage:
+    python job_store.py history <base.db> <job_url>
+    python job_store.py as-of <base.db> <job_url> "2025-01-31 23:59:59"
+"""
+
+import hashlib
+import json
+import sqlite3
+import sys
+import zlib
+from contextlib import closing
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Champs extraits par les scrapers, dans l'ordre des colonnes de la table jobs
+CONTENT_FIELDS = [
+    'job_id', 'job_title', 'contract_type', 'publication_date', 'location',
+    'job_family', 'duration', 'management_position', 'status',
+    'education_level', 'experience_level', 'training_specialization',
+    'technical_skills', 'behavioral_skills', 'tools', 'languages',
+    'job_description', 'company_name', 'company_description', 'is_valid',
+]
+
+# Champs conservés dans l'historique (contenu + date de la version)
+VERSIONED_FIELDS = CONTENT_FIELDS + ['last_updated']
+
+JOBS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        job_url TEXT PRIMARY KEY,
+        job_id TEXT,
+        job_title TEXT,
+        contract_type TEXT,
+        publication_date TEXT,
+        location TEXT,
+        job_family TEXT,
+        duration TEXT,
+        management_position TEXT,
+        status TEXT DEFAULT 'Live',
+        education_level TEXT,
+        experience_level TEXT,
+        training_specialization TEXT,
+        technical_skills TEXT,
+        behavioral_skills TEXT,
+        tools TEXT,
+        languages TEXT,
+        job_description TEXT,
+        company_name TEXT,
+        company_description TEXT,
+        first_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        scrape_attempts INTEGER DEFAULT 0,
+        is_valid INTEGER DEFAULT 1,
+        content_hash TEXT,
+        last_seen TIMESTAMP
+    )
+"""
+
+# Colonnes ajoutées après coup aux bases existantes : (nom, type)
+TRACKING_COLUMNS = [
+    ('content_hash', 'TEXT'),
+    ('last_seen', 'TIMESTAMP'),
+]
+
+# Au-delà de cette taille (JSON encodé), le patch est stocké compressé (BLOB)
+COMPRESS_THRESHOLD = 256
+
+VERSIONS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS job_versions (
+        id INTEGER PRIMARY KEY,
+        job_url TEXT NOT NULL,
+        version INTEGER NOT NULL,
+        recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        changed_fields TEXT NOT NULL,
+        patch BLOB NOT NULL,
+        UNIQUE (job_url, version)
+    )
+"""
+
+# Résultats possibles de insert_or_update_job
+INSERTED = 'inserted'
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'
+
+
+def content_hash(values: Dict) -> str:
+    """Empreinte SHA-1 des champs extraits (valeurs telles qu'écrites en base)"""
+    payload = json.dumps([values.get(field) for field in CONTENT_FIELDS], ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _migrate_v1(conn: sqlite3.Connection):
+    """Table jobs, colonnes de suivi (bases créées avant leur introduction) et historique"""
+    conn.execute(JOBS_SCHEMA)
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+    for name, col_type in TRACKING_COLUMNS:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {col_type}")
+    conn.execute(VERSIONS_SCHEMA)
+
+
+def _migrate_v2(conn: sqlite3.Connection):
+    """Index des requêtes récurrentes (plans vérifiés par tests/test_query_plans.py)"""
+    # Offres Live valides (get_live_urls, rapprochement des URLs listées) et statistiques
+    # de fin de run : l'index couvre ces requêtes sans lire la table
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_valid ON jobs(status, is_valid, job_url)")
+    # Exports triés par récence (WHERE is_valid = 1 ORDER BY last_updated DESC) : index partiel
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_valid_last_updated ON jobs(last_updated) WHERE is_valid = 1")
+    # Remplacé par l'index partiel ci-dessus
+    conn.execute("DROP INDEX IF EXISTS idx_jobs_last_updated")
+
+
+def _migrate_v3(conn: sqlite3.Connection):
+    """Empreintes périmées : les expirations ne les effaçaient pas (statut changé hors UPSERT)"""
+    conn.execute("UPDATE jobs SET content_hash = NULL WHERE status IS NOT 'Live'")
+
+
+# Étapes de schéma, appliquées dans l'ordre selon PRAGMA user_version
+MIGRATIONS = [
+    (1, _migrate_v1),
+    (2, _migrate_v2),
+    (3, _migrate_v3),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def migrate_schema(conn: sqlite3.Connection) -> int:
+    """
+    Amène la base au dernier schéma (sans effet si elle est déjà à jour)
+
+    Returns:
+        Version du schéma après migration
+    """
+    current = conn.execute("PRAGMA user_version").fetchone()[0]
+    for version, step in MIGRATIONS:
+        if current < version:
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+            current = version
+    return current
+
+
+def migrate_sources(sources) -> None:
+    """
+    Met les bases des scrapers au dernier schéma (job de mise à jour uniquement :
+    les exports les ouvrent ensuite en lecture seule)
+
+    Args:
+        sources: Liste de (nom, chemin de la base), comme publish.SOURCES
+    """
+    for name, db_path in sources:
+        if not db_path.exists():
+            continue
+        with closing(sqlite3.connect(db_path)) as conn:
+            migrate_schema(conn)
+            conn.commit()
+
+
+# ============================================================================
+# REQUÊTES (constantes exécutées telles quelles ; plans vérifiés par tests/test_query_plans.py)
+# ============================================================================
+
+# JobDatabase des trois scrapers
+VALID_URLS_SQL = "SELECT job_url FROM jobs WHERE is_valid = 1"
+
+LIVE_URLS_SQL = "SELECT job_url FROM jobs WHERE status = 'Live' AND is_valid = 1"
+
+UPSERT_JOB_SQL = """
+    INSERT INTO jobs (
+        job_url, job_id, job_title, contract_type, publication_date,
+        location, job_family, duration, management_position, status,
+        education_level, experience_level, training_specialization,
+        technical_skills, behavioral_skills, tools, languages,
+        job_description, company_name, company_description,
+        scrape_attempts, is_valid, last_updated, content_hash, last_seen
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, ?, CURRENT_TIMESTAMP, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(job_url) DO UPDATE SET
+        job_id = excluded.job_id,
+        job_title = excluded.job_title,
+        contract_type = excluded.contract_type,
+        publication_date = excluded.publication_date,
+        location = excluded.location,
+        job_family = excluded.job_family,
+        duration = excluded.duration,
+        management_position = excluded.management_position,
+        status = excluded.status,
+        education_level = excluded.education_level,
+        experience_level = excluded.experience_level,
+        training_specialization = excluded.training_specialization,
+        technical_skills = excluded.technical_skills,
+        behavioral_skills = excluded.behavioral_skills,
+        tools = excluded.tools,
+        languages = excluded.languages,
+        job_description = excluded.job_description,
+        company_name = excluded.company_name,
+        company_description = excluded.company_description,
+        scrape_attempts = scrape_attempts + 1,
+        is_valid = excluded.is_valid,
+        last_updated = CURRENT_TIMESTAMP,
+        content_hash = excluded.content_hash,
+        last_seen = CURRENT_TIMESTAMP
+"""
+
+EXPORT_VALID_SQL = """
+    SELECT
+        job_id, job_title, contract_type, publication_date, location,
+        job_family, duration, management_position, status,
+        education_level, experience_level, training_specialization,
+        technical_skills, behavioral_skills, tools, languages,
+        job_description, company_name, company_description, job_url,
+        first_seen, last_updated
+    FROM jobs
+    WHERE is_valid = 1
+    ORDER BY last_updated DESC
+"""
+
+# Empreinte et historique
+READ_VERSIONED_SQL = f"SELECT {', '.join(VERSIONED_FIELDS)}, content_hash FROM jobs WHERE job_url = ?"
+
+TOUCH_SQL = "UPDATE jobs SET last_seen = CURRENT_TIMESTAMP WHERE job_url = ?"
+
+INSERT_VERSION_SQL = """
+    INSERT INTO job_versions (job_url, version, changed_fields, patch)
+    VALUES (?, (SELECT COALESCE(MAX(version), 0) + 1 FROM job_versions WHERE job_url = ?), ?, ?)
+"""
+
+# {where} : EXPIRE_URLS_WHERE ou RECONCILE_EXPIRE_WHERE
+RECORD_STATUS_CHANGE_SQL = """
+    INSERT INTO job_versions (job_url, version, changed_fields, patch)
+    SELECT job_url,
+           (SELECT COALESCE(MAX(v.version), 0) + 1 FROM job_versions v WHERE v.job_url = jobs.job_url),
+           'status',
+           json_object('status', status, 'last_updated', last_updated)
+    FROM jobs
+    WHERE {where}
+"""
+
+# Expiration hors UPSERT : l'empreinte est effacée (voir l'en-tête du module)
+EXPIRE_SQL = """
+    UPDATE jobs
+    SET status = 'Expired', last_updated = CURRENT_TIMESTAMP, content_hash = NULL
+    WHERE {where}
+"""
+
+EXPIRE_URLS_WHERE = "status != 'Expired' AND job_url IN (SELECT job_url FROM temp.expired_urls)"
+
+RECONCILE_EXPIRE_WHERE = ("status = 'Live' AND is_valid = 1 "
+                          "AND job_url NOT IN (SELECT job_url FROM temp.current_urls)")
+
+# URLs listées sans offre Live correspondante (anti-jointure sur la table temporaire)
+NEW_URLS_SQL = """
+    SELECT current_urls.job_url FROM temp.current_urls
+    WHERE NOT EXISTS (
+        SELECT 1 FROM jobs j
+        WHERE j.job_url = current_urls.job_url AND j.status = 'Live' AND j.is_valid = 1
+    )
+"""
+
+# {table} : current_urls ou expired_urls
+LOAD_TEMP_URLS_SQL = "INSERT OR IGNORE INTO temp.{table} (job_url) VALUES (?)"
+
+HISTORY_SQL = """
+    SELECT version, recorded_at, changed_fields, patch
+    FROM job_versions WHERE job_url = ? ORDER BY version
+"""
+
+AS_OF_ROW_SQL = f"SELECT job_url, first_seen, {', '.join(VERSIONED_FIELDS)} FROM jobs WHERE job_url = ?"
+
+AS_OF_PATCHES_SQL = """
+    SELECT patch FROM job_versions
+    WHERE job_url = ? AND recorded_at > ?
+    ORDER BY version DESC
+"""
+
+COUNT_BY_STATUS_SQL = "SELECT status, is_valid, COUNT(*) FROM jobs GROUP BY status, is_valid"
+
+
+def _read_versioned(conn: sqlite3.Connection, job_url: str) -> Optional[Dict]:
+    row = conn.execute(READ_VERSIONED_SQL, (job_url,)).fetchone()
+    if row is None:
+        return None
+    return dict(zip(VERSIONED_FIELDS + ['content_hash'], row))
+
+
+def touch_if_unchanged(conn: sqlite3.Connection, job_url: str, new_hash: str):
+    """
+    Met à jour last_seen si l'offre existe avec la même empreinte
+
+    Returns:
+        (unchanged, previous) : unchanged=True si aucune réécriture n'est nécessaire,
+        previous = valeurs actuelles de l'offre (None si elle n'existe pas)
+    """
+    previous = _read_versioned(conn, job_url)
+    if previous is None:
+        return False, None
+    if previous['content_hash'] != new_hash:
+        return False, previous
+    conn.execute(TOUCH_SQL, (job_url,))
+    return True, previous
+
+
+def encode_patch(patch: Dict):
+    """JSON compact, compressé (bytes → BLOB) s'il est volumineux, sinon texte"""
+    payload = json.dumps(patch, ensure_ascii=False, separators=(',', ':'))
+    if len(payload) > COMPRESS_THRESHOLD:
+        return zlib.compress(payload.encode('utf-8'), 9)
+    return payload
+
+
+def decode_patch(data) -> Dict:
+    if isinstance(data, bytes):
+        data = zlib.decompress(data).decode('utf-8')
+    return json.loads(data)
+
+
+def record_version(conn: sqlite3.Connection, job_url: str, previous: Optional[Dict]) -> bool:
+    """
+    Enregistre le patch inverse d'une offre qui vient d'être réécrite
+
+    Args:
+        previous: Valeurs avant écriture (retournées par touch_if_unchanged)
+
+    Returns:
+        True si une version a été ajoutée (au moins un champ a changé)
+    """
+    if previous is None:
+        return False
+    current = _read_versioned(conn, job_url)
+    changed = [f for f in CONTENT_FIELDS if previous.get(f) != current.get(f)]
+    if not changed:
+        return False
+    patch = {f: previous.get(f) for f in changed + ['last_updated']}
+    conn.execute(INSERT_VERSION_SQL, (job_url, job_url, ','.join(changed), encode_patch(patch)))
+    return True
+
+
+def record_status_change(conn: sqlite3.Connection, where_sql: str, params=()):
+    """
+    Historise en une requête le statut des offres sur le point d'être modifiées
+
+    Args:
+        where_sql: Condition SQL sur la table jobs sélectionnant les offres modifiées
+    """
+    conn.execute(RECORD_STATUS_CHANGE_SQL.format(where=where_sql), params)
+
+
+def load_temp_urls(conn: sqlite3.Connection, urls: Iterable[str], table: str = "current_urls"):
+    """Charge un ensemble d'URLs dans une table temporaire (executemany, pas de limite de variables)"""
+    conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS {table} (job_url TEXT PRIMARY KEY)")
+    conn.execute(f"DELETE FROM temp.{table}")
+    conn.executemany(LOAD_TEMP_URLS_SQL.format(table=table), ((url,) for url in urls))
+
+
+def expire_urls(conn: sqlite3.Connection, urls: Iterable[str]) -> int:
+    """Marque comme expirées les offres dont l'URL est donnée (via table temporaire)"""
+    load_temp_urls(conn, urls, "expired_urls")
+    record_status_change(conn, EXPIRE_URLS_WHERE)
+    return conn.execute(EXPIRE_SQL.format(where=EXPIRE_URLS_WHERE)).rowcount
+
+
+def reconcile_urls(conn: sqlite3.Connection, current_urls: Iterable[str]) -> Tuple[Set[str], int]:
+    """
+    Rapproche les URLs actuellement listées sur le site avec la base, en une transaction
+
+    - Les offres Live absentes de la liste passent en Expired (UPDATE ... NOT IN (SELECT ...))
+    - Les URLs listées sans offre Live correspondante sont retournées (anti-jointure)
+
+    Returns:
+        (nouvelles URLs à scraper, nombre d'offres expirées)
+    """
+    with conn:
+        load_temp_urls(conn, current_urls)
+        record_status_change(conn, RECONCILE_EXPIRE_WHERE)
+        expired = conn.execute(EXPIRE_SQL.format(where=RECONCILE_EXPIRE_WHERE)).rowcount
+        new_urls = {row[0] for row in conn.execute(NEW_URLS_SQL)}
+    return new_urls, expired
+
+
+def get_job_history(conn: sqlite3.Connection, job_url: str) -> List[Dict]:
+    """Versions enregistrées d'une offre (de la plus ancienne à la plus récente)"""
+    cursor = conn.execute(HISTORY_SQL, (job_url,))
+    return [
+        {'version': v, 'recorded_at': at, 'changed_fields': fields.split(','), 'previous': decode_patch(patch)}
+        for v, at, fields, patch in cursor
+    ]
+
+
+def get_job_as_of(conn: sqlite3.Connection, job_url: str, as_of: str) -> Optional[Dict]:
+    """
+    Reconstruit une offre telle qu'elle était à une date donnée
+
+    Args:
+        as_of: Date au format des TIMESTAMP SQLite (UTC), ex: "2025-01-31 23:59:59"
+
+    Returns:
+        Dict des champs de l'offre, ou None si elle n'existait pas encore
+    """
+    row = conn.execute(AS_OF_ROW_SQL, (job_url,)).fetchone()
+    if row is None:
+        return None
+    job = dict(zip(['job_url', 'first_seen'] + VERSIONED_FIELDS, row))
+    if job['first_seen'] and job['first_seen'] > as_of:
+        return None
+
+    for (patch,) in conn.execute(AS_OF_PATCHES_SQL, (job_url, as_of)):
+        job.update(decode_patch(patch))
+    return job
+
+
+def count_by_status(conn: sqlite3.Connection) -> Tuple[int, int, int, int]:
+    """
+    Statistiques de fin de run, calculées sur l'index couvrant (status, is_valid)
+
+    Returns:
+        (total, live, expired, invalid)
+    """
+    total = live = expired = invalid = 0
+    for status, is_valid, count in conn.execute(COUNT_BY_STATUS_SQL):
+        total += count
+        if status == 'Live':
+            live += count
+        elif status == 'Expired':
+            expired += count
+        if is_valid == 0:
+            invalid += count
+    return total, live, expired, invalid
+
+
+def format_write_stats(stats: Dict) -> str:
+    """Résumé des écritures d'un run : nouvelles / modifiées / inchangées"""
+    return (f"Nouvelles: {stats.get(INSERTED, 0)} | Modifiées: {stats.get(UPDATED, 0)} | "
+            f"Inchangées: {stats.get(UNCHANGED, 0)}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 4 or sys.argv[1] not in ('history', 'as-of'):
+        print(__doc__)
+        sys.exit(1)
+
+    with sqlite3.connect(sys.argv[2]) as conn:
+        if sys.argv[1] == 'history':
+            for entry in get_job_history(conn, sys.argv[3]):
+                print(f"v{entry['version']} ({entry['recorded_at']}) : {', '.join(entry['changed_fields'])}")
+        else:
+            if len(sys.argv) < 5:
+                print(__doc__)
+                sys.exit(1)
+            job = get_job_as_of(conn, sys.argv[3], sys.argv[4])
+            print(json.dumps(job, ensure_ascii=False, indent=2) if job else "❌ Offre inexistante à cette date")
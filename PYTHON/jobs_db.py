@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Base fusionnée jobs.db avec recherche plein texte (SQLite FTS5)
+- JobsDbBuilder : écrit jobs.db offre par offre ; alimenté à chaque mise à jour
+  par publish.py (JobsDbSink), avec les offres déjà normalisées des autres formats
+- build_jobs_db() : construit jobs.db seule (même flux de publication)
+- JobSearch : API de requête en lecture seule (recherche classée, filtres, pagination par curseur)
+
+Usage:
+    python jobs_db.py build
+    python jobs_db.py search "analyste crédit" --status Live --contract_type CDI
+"""
+
+import base64
+import json
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from publish import JOB_COLUMNS, SOURCES
+
+# Configuration des chemins
+PYTHON_DIR = Path(__file__).parent
+JOBS_DB = PYTHON_DIR / "jobs.db"
+
+# Colonnes filtrables (index (colonne, last_updated, id) : filtre + tri keyset sans tri temporaire)
+FILTER_COLUMNS = ('status', 'company_name', 'contract_type', 'location')
+
+# Poids bm25 des colonnes FTS : titre > compétences > description
+BM25_WEIGHTS = (10.0, 1.0, 4.0)
+
+SCHEMA = """
+    CREATE TABLE jobs (
+        id INTEGER PRIMARY KEY,
+        source TEXT NOT NULL,
+        job_url TEXT NOT NULL UNIQUE,
+        job_id TEXT,
+        job_title TEXT,
+        contract_type TEXT,
+        publication_date TEXT,
+        location TEXT,
+        job_family TEXT,
+        duration TEXT,
+        management_position TEXT,
+        status TEXT,
+        education_level TEXT,
+        experience_level TEXT,
+        training_specialization TEXT,
+        technical_skills TEXT,
+        behavioral_skills TEXT,
+        tools TEXT,
+        languages TEXT,
+        job_description TEXT,
+        company_name TEXT,
+        company_description TEXT,
+        first_seen TIMESTAMP,
+        last_updated TIMESTAMP NOT NULL
+    );
+    CREATE INDEX idx_jobs_status ON jobs(status, last_updated, id);
+    CREATE INDEX idx_jobs_company_name ON jobs(company_name, last_updated, id);
+    CREATE INDEX idx_jobs_contract_type ON jobs(contract_type, last_updated, id);
+    CREATE INDEX idx_jobs_location ON jobs(location, last_updated, id);
+    CREATE INDEX idx_jobs_last_updated ON jobs(last_updated, id);
+    CREATE VIRTUAL TABLE jobs_fts USING fts5(
+        job_title, job_description, skills,
+        content='',
+        tokenize='unicode61 remove_diacritics 2'
+    );
+"""
+
+
+INSERT_JOB_SQL = f"""
+    INSERT OR IGNORE INTO jobs (source, {', '.join(JOB_COLUMNS)})
+    VALUES ({', '.join('?' * (len(JOB_COLUMNS) + 1))})
+"""
+
+FILL_FTS_SQL = """
+    INSERT INTO jobs_fts (rowid, job_title, job_description, skills)
+    SELECT id, job_title, job_description,
+           COALESCE(technical_skills, '') || ' ' || COALESCE(behavioral_skills, '') || ' ' || COALESCE(tools, '')
+    FROM jobs
+"""
+
+
+class JobsDbBuilder:
+    """Construit jobs.db offre par offre (écrite dans un fichier temporaire puis renommée)"""
+
+    def __init__(self, output_path: Path = JOBS_DB):
+        self.output_path = Path(output_path)
+        self.tmp_path = self.output_path.with_suffix('.db.tmp')
+        if self.tmp_path.exists():
+            self.tmp_path.unlink()
+        self.conn = sqlite3.connect(self.tmp_path)
+        self.conn.executescript(SCHEMA)
+
+    def add(self, source: str, job: Dict):
+        """Ajoute une offre ; INSERT OR IGNORE : une URL présente dans deux sources n'est gardée qu'une fois"""
+        values = {c: job.get(c) for c in JOB_COLUMNS}
+        # last_updated jamais NULL : le curseur (last_updated, id) < (?, ?) écarterait ces offres
+        values['last_updated'] = values['last_updated'] or values['first_seen'] or ''
+        self.conn.execute(INSERT_JOB_SQL, [source, *values.values()])
+
+    def finish(self) -> int:
+        """Index plein texte, statistiques du planificateur, puis remplacement de jobs.db"""
+        try:
+            self.conn.execute(FILL_FTS_SQL)
+            self.conn.execute("INSERT INTO jobs_fts (jobs_fts) VALUES ('optimize')")
+            self.conn.commit()
+            self.conn.execute("ANALYZE")
+            total = self.conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+        finally:
+            self.conn.close()
+        self.tmp_path.replace(self.output_path)
+        return total
+
+
+def build_jobs_db(output_path: Path = JOBS_DB, sources=SOURCES) -> int:
+    """
+    Construit jobs.db seule, depuis le flux normalisé de publish.py
+
+    Returns:
+        Nombre d'offres dans la base
+    """
+    from publish import JobsDbSink, publish
+
+    sink = JobsDbSink(output_path)
+    publish([sink], sources)
+    return sink.total
+
+
+def to_fts_query(text: str) -> Optional[str]:
+    """Transforme une saisie libre en requête FTS5 sûre (ET entre les mots, préfixe sur le dernier)"""
+    tokens = [t for t in re.split(r'\W+', text or '') if t]
+    if not tokens:
+        return None
+    quoted = [f'"{t}"' for t in tokens]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def _encode_cursor(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+
+def _decode_cursor(cursor: str):
+    return json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+
+
+class JobSearch:
+    """API de recherche en lecture seule sur jobs.db"""
+
+    def __init__(self, db_path: Path = JOBS_DB):
+        self.db_path = Path(db_path)
+        self.conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+
+    def close(self):
+        self.conn.close()
+
+    def search(self, query: str = None, filters: Dict[str, str] = None,
+               limit: int = 20, cursor: str = None, fields: List[str] = None) -> Dict:
+        """
+        Recherche les offres
+
+        Args:
+            query: Texte libre (recherche FTS classée par bm25). Sans texte : tri par last_updated
+            filters: Filtres d'égalité sur FILTER_COLUMNS (ex: {'status': 'Live'})
+            limit: Taille de page
+            cursor: Curseur renvoyé par la page précédente (pagination keyset)
+            fields: Colonnes à retourner (par défaut toutes sauf les descriptions)
+
+        Returns:
+            Dict avec 'results' (liste de dicts) et 'next_cursor' (None en fin de liste)
+        """
+        fields = fields or [c for c in JOB_COLUMNS if c not in ('job_description', 'company_description')]
+        sql, params = search_sql(query, filters, limit, cursor, fields)
+
+        rows = self.conn.execute(sql, params).fetchall()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        results = [{k: row[k] for k in fields} for row in rows]
+        next_cursor = _encode_cursor([rows[-1]['_key'], rows[-1]['_id']]) if has_more else None
+        return {'results': results, 'next_cursor': next_cursor}
+
+
+def search_sql(query: Optional[str], filters: Optional[Dict[str, str]], limit: int,
+               cursor: Optional[str], fields: List[str]) -> Tuple[str, list]:
+    """Requête (et paramètres) d'une page de JobSearch.search, limit + 1 lignes pour détecter la suite"""
+    filters = filters or {}
+    unknown = set(filters) - set(FILTER_COLUMNS)
+    if unknown:
+        raise ValueError(f"Filtres non supportés: {', '.join(sorted(unknown))}")
+
+    unknown = set(fields) - set(JOB_COLUMNS)
+    if unknown:
+        raise ValueError(f"Colonnes inconnues: {', '.join(sorted(unknown))}")
+    select = ', '.join(f"j.{c}" for c in fields)
+
+    where = [f"j.{column} = ?" for column in filters]
+    params = list(filters.values())
+    fts_query = to_fts_query(query)
+
+    if fts_query:
+        # Classement bm25 (plus petit = plus pertinent), départage par id
+        sql = f"""
+            SELECT {select}, j.id AS _id, bm25(jobs_fts, {', '.join(map(str, BM25_WEIGHTS))}) AS _key
+            FROM jobs_fts JOIN jobs j ON j.id = jobs_fts.rowid
+            WHERE jobs_fts MATCH ?{''.join(' AND ' + w for w in where)}
+        """
+        params.insert(0, fts_query)
+        order, comparison = "_key, _id", "(_key, _id) > (?, ?)"
+    else:
+        sql = f"""
+            SELECT {select}, j.id AS _id, j.last_updated AS _key
+            FROM jobs j
+            {'WHERE ' + ' AND '.join(where) if where else ''}
+        """
+        order, comparison = "_key DESC, _id DESC", "(_key, _id) < (?, ?)"
+
+    sql = f"SELECT * FROM ({sql})"
+    if cursor:
+        sql += f" WHERE {comparison}"
+        params.extend(_decode_cursor(cursor))
+    sql += f" ORDER BY {order} LIMIT ?"
+    params.append(limit + 1)
+    return sql, params
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ('build', 'search'):
+        print("Usage: python jobs_db.py build")
+        print("       python jobs_db.py search \"<texte>\" [--status Live] [--company_name ...] [--limit 20]")
+        sys.exit(1)
+
+    if sys.argv[1] == 'build':
+        print(f"🔄 Construction de {JOBS_DB.name}...")
+        start = time.time()
+        total = build_jobs_db()
+        print(f"✅ {total} offres indexées en {time.time() - start:.2f}s dans {JOBS_DB}")
+        return
+
+    args = sys.argv[2:]
+    query = args.pop(0) if args and not args[0].startswith('--') else None
+    options = dict(zip(args[::2], args[1::2]))
+    limit = int(options.pop('--limit', 20))
+    filters = {k.lstrip('-'): v for k, v in options.items()}
+
+    search = JobSearch()
+    page = search.search(query, filters=filters, limit=limit)
+    for job in page['results']:
+        print(f"- [{job['company_name']}] {job['job_title']} ({job['location']}) {job['job_url']}")
+    if page['next_cursor']:
+        print(f"\nPage suivante : cursor={page['next_cursor']}")
+    search.close()
+
+
+if __name__ == "__main__":
+    main()
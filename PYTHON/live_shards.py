@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Découpage des offres Live en artefacts statiques paginés pour GitHub Pages
+- manifest.json : petit index chargé en premier par le site
+- list-NNN-<hash>.json : shards de liste triés par last_updated (sans descriptions)
+- detail/<offer_id>.json : fiche complète d'une offre, chargée à la demande
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+# Nombre d'offres par shard de liste
+SHARD_SIZE = 500
+
+# Champs volumineux exclus des shards de liste (présents uniquement dans les fiches détail)
+DETAIL_ONLY_FIELDS = ('job_description', 'company_description')
+
+MANIFEST_NAME = "manifest.json"
+DETAIL_DIR_NAME = "detail"
+
+
+def offer_id(job: Dict) -> str:
+    """Identifiant stable d'une offre, dérivé de son URL"""
+    return hashlib.sha1((job.get('job_url') or '').encode('utf-8')).hexdigest()[:16]
+
+
+def _dumps(data) -> bytes:
+    """Sérialisation JSON compacte et déterministe"""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _write_if_changed(path: Path, payload: bytes) -> bool:
+    """Écrit le fichier seulement si son contenu change (évite le bruit dans git)"""
+    if path.exists() and path.read_bytes() == payload:
+        return False
+    path.write_bytes(payload)
+    return True
+
+
+def write_live_shards(live_jobs: List[Dict], out_dir: Path, shard_size: int = SHARD_SIZE) -> Dict:
+    """
+    Écrit le manifest, les shards de liste et les fiches détail des offres Live
+
+    Args:
+        live_jobs: Offres Live (triées ou non, le tri par last_updated est refait ici)
+        out_dir: Dossier de sortie (ex: HTML/live)
+        shard_size: Nombre d'offres par shard de liste
+
+    Returns:
+        Le manifest écrit (dict)
+    """
+    out_dir = Path(out_dir)
+    detail_dir = out_dir / DETAIL_DIR_NAME
+    detail_dir.mkdir(parents=True, exist_ok=True)
+
+    jobs = sorted(live_jobs, key=lambda x: x.get('last_updated', '') or '', reverse=True)
+
+    # 1. Fiches détail (une par offre, réécrites seulement si modifiées)
+    detail_files = set()
+    details_written = 0
+    list_entries = []
+    for job in jobs:
+        oid = offer_id(job)
+        detail_files.add(f"{oid}.json")
+        if _write_if_changed(detail_dir / f"{oid}.json", _dumps(job)):
+            details_written += 1
+
+        entry = {k: v for k, v in job.items() if k not in DETAIL_ONLY_FIELDS}
+        entry['offer_id'] = oid
+        list_entries.append(entry)
+
+    # 2. Shards de liste, nommés par le hash de leur contenu (cache immuable côté navigateur)
+    shards = []
+    for index, start in enumerate(range(0, len(list_entries), shard_size)):
+        chunk = list_entries[start:start + shard_size]
+        payload = _dumps(chunk)
+        digest = hashlib.sha256(payload).hexdigest()[:12]
+        filename = f"list-{index:03d}-{digest}.json"
+        _write_if_changed(out_dir / filename, payload)
+        shards.append({
+            'file': filename,
+            'count': len(chunk),
+            'bytes': len(payload),
+            'newest': chunk[0].get('last_updated'),
+            'oldest': chunk[-1].get('last_updated'),
+        })
+
+    # 3. Nettoyage des anciens shards et des fiches d'offres qui ne sont plus Live
+    current_shards = {s['file'] for s in shards}
+    for old in out_dir.glob("list-*.json"):
+        if old.name not in current_shards:
+            old.unlink()
+    removed_details = 0
+    for old in detail_dir.glob("*.json"):
+        if old.name not in detail_files:
+            old.unlink()
+            removed_details += 1
+
+    manifest = {
+        'version': 1,
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'total': len(list_entries),
+        'shard_size': shard_size,
+        'sort': 'last_updated desc',
+        'omitted_fields': list(DETAIL_ONLY_FIELDS),
+        'detail_path': f"{DETAIL_DIR_NAME}/{{offer_id}}.json",
+        'shards': shards,
+    }
+    (out_dir / MANIFEST_NAME).write_text(
+        json.dumps(manifest, ensure_ascii=False, indent=2), encoding='utf-8'
+    )
+
+    print(f"✅ Artefacts paginés : {len(shards)} shards de {shard_size} offres max dans {out_dir}")
+    print(f"   - {details_written} fiches détail écrites, {removed_details} supprimées")
+    if shards:
+        print(f"   - Premier shard : {shards[0]['bytes'] / 1024:.1f} Ko")
+
+    return manifest
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Serveur SMTP local minimal, en remplacement du vrai serveur pour les essais
+de la boîte d'envoi (email_outbox.py) : accepte toute authentification,
+garde les messages reçus en mémoire et peut simuler des pannes.
+
+- fail_first : nombre de messages refusés en 451 (erreur temporaire → nouvelle tentative)
+- reject_domain : destinataires de ce domaine refusés en 550 (erreur définitive → failed)
+
+Usage:
+    python local_smtp_server.py [port]
+    # puis : SMTP_SERVER=localhost SMTP_PORT=<port> SMTP_STARTTLS=0 \\
+    #        SMTP_USER=test SMTP_PASSWORD=test python auth_server.py
+"""
+
+import socketserver
+import sys
+import threading
+from email import message_from_bytes
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server
+        server.sessions += 1
+        self.reply("220 localhost SMTP local")
+        sender, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command.split(' ', 1)[0].upper()
+            if verb == 'EHLO':
+                self.reply("250-localhost")
+                self.reply("250 AUTH PLAIN LOGIN")
+            elif verb == 'HELO':
+                self.reply("250 localhost")
+            elif verb == 'AUTH':
+                parts = command.split()
+                if len(parts) == 2 and parts[1].upper() == 'LOGIN':
+                    self.reply("334 VXNlcm5hbWU6")
+                    self.rfile.readline()
+                    self.reply("334 UGFzc3dvcmQ6")
+                    self.rfile.readline()
+                elif len(parts) == 2:
+                    self.reply("334 ")
+                    self.rfile.readline()
+                self.reply("235 Authentication successful")
+            elif verb == 'MAIL':
+                sender, recipients = command.split(':', 1)[1].strip(' <>'), []
+                self.reply("250 OK")
+            elif verb == 'RCPT':
+                recipient = command.split(':', 1)[1].strip(' <>')
+                if server.reject_domain and recipient.endswith('@' + server.reject_domain):
+                    self.reply("550 Mailbox unavailable")
+                else:
+                    recipients.append(recipient)
+                    self.reply("250 OK")
+            elif verb == 'DATA':
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while True:
+                    chunk = self.rfile.readline()
+                    if chunk in (b".\r\n", b".\n", b""):
+                        break
+                    data.append(chunk[1:] if chunk.startswith(b"..") else chunk)
+                with server.lock:
+                    if server.fail_first > 0:
+                        server.fail_first -= 1
+                        self.reply("451 Temporary failure")
+                        continue
+                    message = message_from_bytes(b"".join(data))
+                    server.messages.append((sender, recipients, message))
+                if server.verbose:
+                    print(f"📨 {', '.join(recipients)} : {message['Subject']}")
+                self.reply("250 OK queued")
+            elif verb == 'RSET':
+                sender, recipients = None, []
+                self.reply("250 OK")
+            elif verb == 'NOOP':
+                self.reply("250 OK")
+            elif verb == 'QUIT':
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class LocalSMTPServer(socketserver.ThreadingTCPServer):
+    """Serveur SMTP de test ; port 0 = port libre choisi par le système"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port: int = 0, fail_first: int = 0, reject_domain: str = '', verbose: bool = False):
+        super().__init__(('127.0.0.1', port), _SMTPHandler)
+        self.messages = []
+        self.sessions = 0
+        self.fail_first = fail_first
+        self.reject_domain = reject_domain
+        self.verbose = verbose
+        self.lock = threading.Lock()
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 1025
+    server = LocalSMTPServer(port, verbose=True)
+    print(f"📧 Serveur SMTP local sur 127.0.0.1:{server.port} (Ctrl+C pour arrêter)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n✅ {len(server.messages)} messages reçus en {server.sessions} sessions")
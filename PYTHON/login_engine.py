@@ -0,0 +1,715 @@
+#!/usr/bin/env python3
+"""
+Moteur unique de validation d'identifiants (tests de connexion bancaire)
+Remplace les trois implémentations (Selenium de test_bank_connection.py,
+Selenium d'aws-backend, Playwright sync de taleos-backend) : un correctif de
+performance ou de sélecteur s'applique partout.
+
+- Piloté par BANK_CONFIGS : URL de connexion, sélecteurs, indicateurs d'erreur
+- Playwright async sur une boucle asyncio dédiée (thread « login-engine ») :
+  appelable depuis Flask/threads (validate_sync) comme depuis FastAPI (submit)
+- Pool de contextes : POOL_SIZE contextes (page ouverte, interception en place)
+  préparés d'avance ; chaque test prend un contexte neuf, fermé après usage et
+  remplacé en arrière-plan (aucun cookie ni stockage partagé entre deux tests)
+- Attentes sur sélecteurs et sur le verdict (wait_for_function), sans time.sleep
+- Requêtes inutiles au formulaire bloquées : images, polices, médias
+  (LOGIN_BLOCK_RESOURCES) et domaines d'analytics / publicité (LOGIN_BLOCKED_DOMAINS) ;
+  LOGIN_BLOCKING=0 charge la page complète
+- Navigateur relancé s'il est déconnecté, après BROWSER_MAX_USES contextes ou si sa
+  mémoire (processus Chromium, lue dans /proc) dépasse BROWSER_MAX_RSS_MB
+- Durée de chaque étape dans details['phases'] (phase_timer)
+
+Module partagé comme validation_jobs.py (copié dans l'image Docker de
+taleos-backend, importé depuis PYTHON/ sinon).
+
+Usage:
+    python login_engine.py <bank_id> <email> <password>
+    # benchmark avec / sans blocage : benchmark_login_engine.py
+"""
+
+import asyncio
+import glob
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+from urllib.parse import urlsplit
+
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
+
+from phase_timer import PhaseTimer
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = int(os.environ.get('LOGIN_POOL_SIZE', '2'))
+MAX_USES = int(os.environ.get('BROWSER_MAX_USES', '50'))   # contextes par navigateur
+MAX_RSS_MB = int(os.environ.get('BROWSER_MAX_RSS_MB', '600'))   # mémoire résidente d'un navigateur
+ACQUIRE_TIMEOUT = 30      # secondes d'attente d'un contexte libre
+PAGE_TIMEOUT = 15         # chargement de la page et des champs du formulaire
+VERDICT_TIMEOUT = 10      # attente du résultat après soumission
+
+
+def _env_list(name: str, default: Iterable[str]) -> tuple:
+    value = os.environ.get(name)
+    if value is None:
+        return tuple(default)
+    return tuple(item.strip().lower() for item in value.split(',') if item.strip())
+
+
+BLOCKING = os.environ.get('LOGIN_BLOCKING', '1') != '0'
+# Types Playwright (request.resource_type) inutiles au formulaire de connexion
+BLOCK_RESOURCES = _env_list('LOGIN_BLOCK_RESOURCES', ('image', 'font', 'media'))
+# Mesure d'audience, publicité, replay de session : domaine et sous-domaines
+BLOCKED_DOMAINS = _env_list('LOGIN_BLOCKED_DOMAINS', (
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'googlesyndication.com',
+    'googleadservices.com',
+    'facebook.net',
+    'facebook.com',
+    'hotjar.com',
+    'hotjar.io',
+    'contentsquare.net',
+    'clarity.ms',
+    'bat.bing.com',
+    'ads.linkedin.com',
+    'snap.licdn.com',
+    'analytics.tiktok.com',
+    'static.ads-twitter.com',
+    'criteo.com',
+    'criteo.net',
+    'adnxs.com',
+    'youtube.com',
+    'ytimg.com',
+    'vimeo.com',
+    'xiti.com',
+    'atinternet-solutions.com',
+    'matomo.cloud',
+))
+
+LAUNCH_ARGS = [
+    '--disable-dev-shm-usage',   # /dev/shm de 64 Mo dans les conteneurs
+    '--disable-gpu',
+    '--no-first-run',
+    '--disable-blink-features=AutomationControlled',
+]
+CONTEXT_OPTIONS = {
+    'viewport': {'width': 1280, 'height': 800},
+    'user_agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'locale': 'fr-FR',
+}
+
+# Configuration des banques (sélecteurs CSS)
+BANK_CONFIGS = {
+    'credit_agricole': {
+        'name': 'Crédit Agricole',
+        'base_url': 'https://groupecreditagricole.jobs',
+        'login_url': 'https://groupecreditagricole.jobs/fr/connexion/',
+        'email_selector': '#form-login-email',
+        'password_selector': '#form-login-password',
+        'submit_selector': '#form-login-submit',
+        'cookie_selector': 'button.rgpd-btn-refuse',
+        'success_selector': '#form-apply-firstname',  # Formulaire de candidature après connexion
+        'error_selector': '.error, .alert, .warning, [role="alert"], .popin, .modal, [class*="error"], [class*="alert"]',
+        'login_url_markers': ['connexion', 'login'],
+        'error_indicators': [
+            'email ou mot de passe incorrect',
+            'identifiant ou mot de passe incorrect',
+            'renseigner un adresse e-mail au format attendu',
+            'format attendu',
+            'tentatives',
+            'vous reste',
+            'mot de passe incorrect',
+            'erreur',
+            'incorrect',
+            'invalid',
+            'échec',
+            'connexion impossible',
+            'compte invalide'
+        ]
+    },
+    'societe_generale': {
+        'name': 'Société Générale',
+        'implemented': False,
+        'base_url': 'https://careers.societegenerale.com',
+        'login_url': 'https://careers.societegenerale.com/login',
+        'email_selector': 'input[type="email"], input[name*="email"], input[id*="email"], input[name*="username"]',
+        'password_selector': 'input[type="password"], input[name*="password"], input[id*="password"]',
+        'submit_selector': 'button[type="submit"], input[type="submit"]',
+        'login_url_markers': ['login'],
+        'error_indicators': ['erreur', 'incorrect', 'invalid', 'failed', 'error']
+    },
+    'deloitte': {
+        'name': 'Deloitte',
+        'implemented': False,
+        'base_url': 'https://jobs2.deloitte.com',
+        'login_url': 'https://jobs2.deloitte.com/login',
+        'email_selector': 'input[type="email"], input[name*="email"], input[id*="email"], input[name*="username"]',
+        'password_selector': 'input[type="password"], input[name*="password"], input[id*="password"]',
+        'submit_selector': 'button[type="submit"], input[type="submit"]',
+        'login_url_markers': ['login'],
+        'error_indicators': ['erreur', 'incorrect', 'invalid', 'failed', 'error', 'authentication failed']
+    }
+}
+
+# Évalué dans la page jusqu'à un verdict : formulaire de candidature, message
+# d'erreur visible, ou page de connexion quittée sans champs de connexion
+VERDICT_JS = """
+(cfg) => {
+    const visible = (el) => !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+    if (cfg.successSelector) {
+        const form = document.querySelector(cfg.successSelector);
+        if (form && visible(form)) return {verdict: 'success', reason: 'application_form_detected'};
+    }
+    for (const el of document.querySelectorAll(cfg.errorSelector)) {
+        if (!visible(el)) continue;
+        const text = (el.innerText || '').toLowerCase().trim();
+        if (text.length < 5) continue;
+        for (const indicator of cfg.indicators) {
+            if (text.includes(indicator)) return {verdict: 'failure', reason: 'error_message', error_found: indicator};
+        }
+    }
+    const url = location.href.toLowerCase();
+    const onLogin = cfg.markers.some((marker) => url.includes(marker));
+    const fieldsPresent = document.querySelector(cfg.emailSelector) || document.querySelector(cfg.passwordSelector);
+    if (location.href !== cfg.urlBefore && !onLogin && !fieldsPresent) {
+        return {verdict: 'success', reason: 'left_login_page'};
+    }
+    return null;
+}
+"""
+
+
+def resolve_chromium_path() -> Optional[str]:
+    """
+    Chemin de l'exécutable Chromium : CHROMIUM_PATH, sinon le build Playwright le plus
+    récent trouvé dans les caches connus ; None = emplacement par défaut de Playwright
+    """
+    explicit = os.environ.get('CHROMIUM_PATH')
+    if explicit and Path(explicit).exists():
+        return explicit
+
+    roots = [
+        os.environ.get('PLAYWRIGHT_BROWSERS_PATH'),
+        '/opt/render/.cache/ms-playwright',
+        str(Path.home() / '.cache' / 'ms-playwright'),
+    ]
+    for root in filter(None, roots):
+        candidates = sorted(glob.glob(os.path.join(root, 'chromium-*', 'chrome-linux', 'chrome')))
+        if candidates:
+            return candidates[-1]
+    return None
+
+
+CHROMIUM_PATH = resolve_chromium_path()
+
+
+def _child_pids(pid: int) -> Set[int]:
+    """Processus enfants directs (Linux, /proc) ; vide ailleurs"""
+    children = set()
+    for stat in glob.glob('/proc/[0-9]*/stat'):
+        try:
+            with open(stat) as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+            if int(fields[1]) == pid:
+                children.add(int(stat.split('/')[2]))
+        except (OSError, IndexError, ValueError):
+            continue
+    return children
+
+
+def _tree_rss_mb(pid: int) -> float:
+    """Mémoire résidente cumulée d'un processus et de ses descendants"""
+    total_pages = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f'/proc/{current}/statm') as f:
+                total_pages += int(f.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        pending.extend(_child_pids(current))
+    return total_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+
+def is_implemented(bank_id: str) -> bool:
+    config = BANK_CONFIGS.get(bank_id)
+    return config is not None and config.get('implemented', True)
+
+
+def is_blocked_domain(host: str, domains: Iterable[str]) -> bool:
+    host = host.lower()
+    return any(host == domain or host.endswith('.' + domain) for domain in domains)
+
+
+class _Slot:
+    """Contexte prêt à l'emploi : page ouverte, interception installée"""
+
+    def __init__(self, browser, context, page=None):
+        self.browser = browser
+        self.context = context
+        self.page = page
+        # Trafic du test (measure_transfer) : requêtes abouties, octets reçus, requêtes bloquées
+        self.requests = 0
+        self.bytes = 0
+        self.blocked = 0
+        self.pending = []
+
+
+class LoginEngine:
+    """Navigateur partagé, pool de contextes et déroulé générique d'une connexion"""
+
+    def __init__(self, pool_size: int = POOL_SIZE, blocking: bool = BLOCKING,
+                 block_resources: Iterable[str] = BLOCK_RESOURCES,
+                 blocked_domains: Iterable[str] = BLOCKED_DOMAINS,
+                 measure_transfer: bool = False, headless: bool = True):
+        self.pool_size = pool_size
+        self.block_resources = frozenset(block_resources) if blocking else frozenset()
+        self.blocked_domains = tuple(blocked_domains) if blocking else ()
+        # Octets reçus par test dans details['transfer'] (un appel request.sizes() par requête)
+        self.measure_transfer = measure_transfer
+        self.headless = headless
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._start_lock = threading.Lock()
+        # État ci-dessous : uniquement manipulé depuis la boucle du moteur
+        self._playwright = None
+        self._browser = None
+        self._browser_uses = 0
+        # Pilote Playwright et processus Chromium courant (repérés dans /proc, None ailleurs)
+        self._driver_pid: Optional[int] = None
+        self._browser_pid: Optional[int] = None
+        self._open: Dict[object, int] = {}     # navigateur -> contextes ouverts
+        self._retired: Set[object] = set()     # navigateurs à fermer une fois vides
+        self._idle: Optional[asyncio.Queue] = None
+        self._launch_lock: Optional[asyncio.Lock] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._in_use = 0
+        self._pending = 0
+        self.launches = 0
+        self.contexts = 0
+        self.validations = 0
+        self.blocked_requests = 0
+        self.blocked_domains_hits = 0
+
+    # --- Boucle dédiée -------------------------------------------------------
+
+    def start(self, timeout: float = 120):
+        """Démarre la boucle du moteur et prépare les contextes (idempotent)"""
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='login-engine', daemon=True).start()
+            asyncio.run_coroutine_threadsafe(self._init_state(), loop).result(timeout)
+            self._loop = loop
+        try:
+            asyncio.run_coroutine_threadsafe(self._fill_pool(), loop).result(timeout)
+            logger.info(f"🚀 Moteur de connexion prêt ({self.pool_size} contextes, Chromium: {CHROMIUM_PATH or 'défaut'})")
+        except Exception as e:
+            logger.error(f"❌ Préchauffage du moteur de connexion impossible: {e}")
+
+    async def _init_state(self):
+        self._idle = asyncio.Queue()
+        self._launch_lock = asyncio.Lock()
+
+    def submit(self, bank_id: str, email: str, password: str, timeout: int = 30,
+               start: bool = True) -> Future:
+        """
+        Lance un test sur la boucle du moteur ; Future concurrente (asyncio.wrap_future côté async)
+        start=False : pas de démarrage (bloquant) ici, RuntimeError si le moteur n'est pas lancé
+        """
+        if start:
+            self.start()
+        loop = self._loop
+        if loop is None:
+            raise RuntimeError("Moteur de connexion non démarré")
+        return asyncio.run_coroutine_threadsafe(self.validate(bank_id, email, password, timeout), loop)
+
+    def validate_sync(self, bank_id: str, email: str, password: str, timeout: int = 30) -> Dict:
+        """Version bloquante (Flask, pool de validation_jobs, Cloud Function)"""
+        try:
+            future = self.submit(bank_id, email, password, timeout)
+        except Exception as e:
+            return {'success': False, 'message': f'Erreur technique: {e}', 'details': {'error': str(e)}}
+        try:
+            return future.result(ACQUIRE_TIMEOUT + timeout + VERDICT_TIMEOUT)
+        except FutureTimeout:
+            future.cancel()
+            return {
+                'success': False,
+                'message': 'Timeout: La page a pris trop de temps à répondre',
+                'details': {'reason': 'engine_timeout'}
+            }
+
+    def close(self, timeout: float = 30):
+        if self._loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout)
+        except Exception as e:
+            logger.warning(f"⚠️ Arrêt du moteur de connexion: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+
+    # --- Navigateur et contextes ---------------------------------------------
+
+    async def _launch_browser(self):
+        if self._playwright is None:
+            # Le pilote est un processus enfant ; chaque navigateur en descend
+            before = _child_pids(os.getpid())
+            self._playwright = await async_playwright().start()
+            new_children = _child_pids(os.getpid()) - before
+            self._driver_pid = min(new_children) if new_children else None
+        before = _child_pids(self._driver_pid) if self._driver_pid else set()
+        try:
+            try:
+                browser = await self._playwright.chromium.launch(
+                    headless=self.headless, executable_path=CHROMIUM_PATH, args=LAUNCH_ARGS
+                )
+            except Exception as e:
+                if CHROMIUM_PATH is None:
+                    raise
+                logger.warning(f"⚠️ Impossible de lancer Chromium depuis {CHROMIUM_PATH}: {e}")
+                browser = await self._playwright.chromium.launch(headless=self.headless, args=LAUNCH_ARGS)
+        except Exception as e:
+            raise Exception(f"Chromium non disponible. Erreur: {e}. Vérifiez que 'playwright install chromium' a été exécuté.")
+        new_children = _child_pids(self._driver_pid) - before if self._driver_pid else set()
+        self._browser = browser
+        self._browser_pid = min(new_children) if new_children else None
+        self._browser_uses = 0
+        self._open[browser] = 0
+        self.launches += 1
+        logger.info("🚀 Navigateur du moteur de connexion démarré")
+
+    async def _browser_for_new_context(self):
+        async with self._launch_lock:
+            old = self._browser
+            reason = None
+            if old is None:
+                reason = 'démarrage'
+            elif not old.is_connected():
+                reason = 'déconnecté'
+            elif self._browser_uses >= MAX_USES:
+                reason = f'{self._browser_uses} contextes'
+            else:
+                # Lecture de /proc hors de la boucle
+                memory = await asyncio.get_running_loop().run_in_executor(None, self.browser_memory_mb)
+                if memory > MAX_RSS_MB:
+                    reason = f'{memory:.0f} Mo'
+            if reason:
+                if old is not None:
+                    logger.info(f"♻️ Recyclage du navigateur ({reason})")
+                await self._launch_browser()
+                if old is not None:
+                    self._retired.add(old)
+                    await self._close_if_unused(old)
+            self._browser_uses += 1
+            return self._browser
+
+    def browser_memory_mb(self) -> float:
+        """Mémoire résidente du navigateur courant et de ses processus (0 hors Linux)"""
+        return _tree_rss_mb(self._browser_pid) if self._browser_pid else 0.0
+
+    async def _close_if_unused(self, browser):
+        if browser in self._retired and self._open.get(browser, 0) == 0:
+            self._retired.discard(browser)
+            self._open.pop(browser, None)
+            try:
+                await browser.close()
+            except Exception as e:
+                logger.warning(f"⚠️ Fermeture du navigateur: {e}")
+
+    def _should_block(self, request) -> bool:
+        if request.resource_type in self.block_resources:
+            return True
+        if self.blocked_domains and is_blocked_domain(urlsplit(request.url).hostname or '', self.blocked_domains):
+            self.blocked_domains_hits += 1
+            return True
+        return False
+
+    async def _route(self, route, slot: _Slot):
+        if self._should_block(route.request):
+            self.blocked_requests += 1
+            slot.blocked += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def _on_request_finished(self, request, slot: _Slot):
+        slot.requests += 1
+        slot.pending.append(asyncio.ensure_future(request.sizes()))
+
+    async def _transfer(self, slot: _Slot) -> Dict:
+        for sizes in await asyncio.gather(*slot.pending, return_exceptions=True):
+            if isinstance(sizes, dict):
+                slot.bytes += sizes.get('responseBodySize', 0) + sizes.get('responseHeadersSize', 0)
+        slot.pending.clear()
+        return {'requests': slot.requests, 'bytes': slot.bytes, 'blocked': slot.blocked}
+
+    async def _create_slot(self) -> _Slot:
+        browser = await self._browser_for_new_context()
+        context = await browser.new_context(**CONTEXT_OPTIONS)
+        self._open[browser] = self._open.get(browser, 0) + 1
+        slot = _Slot(browser, context)
+        try:
+            if self.block_resources or self.blocked_domains:
+                await context.route('**/*', lambda route: self._route(route, slot))
+            if self.measure_transfer:
+                context.on('requestfinished', lambda request: self._on_request_finished(request, slot))
+            slot.page = await context.new_page()
+            slot.page.set_default_timeout(PAGE_TIMEOUT * 1000)
+        except Exception:
+            await self._discard(slot)
+            raise
+        self.contexts += 1
+        return slot
+
+    async def _discard(self, slot: _Slot):
+        try:
+            await slot.context.close()
+        except Exception as e:
+            logger.warning(f"⚠️ Fermeture du contexte: {e}")
+        self._open[slot.browser] = self._open.get(slot.browser, 1) - 1
+        await self._close_if_unused(slot.browser)
+
+    def _spawn(self, coro):
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _replenish(self):
+        self._pending += 1
+        try:
+            self._idle.put_nowait(await self._create_slot())
+        except Exception as e:
+            logger.error(f"❌ Préparation d'un contexte impossible: {e}")
+        finally:
+            self._pending -= 1
+
+    async def _fill_pool(self):
+        missing = self.pool_size - self._idle.qsize() - self._in_use - self._pending
+        await asyncio.gather(*(self._replenish() for _ in range(max(missing, 0))))
+        if self._idle.empty() and self._in_use == 0:
+            raise Exception("aucun contexte n'a pu être préparé")
+
+    async def _acquire(self) -> _Slot:
+        if self._idle.empty() and self._in_use + self._pending < self.pool_size:
+            # Remplacement perdu (échec de lancement...) : création directe, erreur remontée
+            self._in_use += 1
+            try:
+                return await self._create_slot()
+            except Exception:
+                self._in_use -= 1
+                raise
+        slot = await asyncio.wait_for(self._idle.get(), ACQUIRE_TIMEOUT)
+        self._in_use += 1
+        if not slot.browser.is_connected():
+            await self._discard(slot)
+            try:
+                slot = await self._create_slot()
+            except Exception:
+                self._in_use -= 1
+                raise
+        return slot
+
+    async def _release(self, slot: _Slot):
+        """Contexte fermé après chaque test (isolation) ; un neuf le remplace en arrière-plan"""
+        self._in_use -= 1
+        await self._discard(slot)
+        self._spawn(self._replenish())
+
+    async def _shutdown(self):
+        while not self._idle.empty():
+            await self._discard(self._idle.get_nowait())
+        browsers = set(self._open) | self._retired
+        if self._browser is not None:
+            browsers.add(self._browser)
+        for browser in browsers:
+            try:
+                await browser.close()
+            except Exception:
+                pass
+        self._browser = None
+        self._browser_pid = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+            self._driver_pid = None
+
+    # --- Déroulé d'un test ---------------------------------------------------
+
+    async def validate(self, bank_id: str, email: str, password: str, timeout: int = 30) -> Dict:
+        """Teste les identifiants ; à exécuter sur la boucle du moteur (voir submit)"""
+        config = BANK_CONFIGS.get(bank_id)
+        if config is None:
+            return {'success': False, 'message': f'Banque inconnue: {bank_id}', 'details': {}}
+        if not is_implemented(bank_id):
+            return {
+                'success': False,
+                'message': f'Test de connexion pour {config["name"]} non encore implémenté',
+                'details': {}
+            }
+
+        timer = PhaseTimer()
+        timer.start('browser_start')
+        try:
+            slot = await self._acquire()
+        except asyncio.TimeoutError:
+            return timer.attach({
+                'success': False,
+                'message': 'Trop de tests en cours, réessayez dans quelques instants.',
+                'details': {'reason': 'pool_exhausted'}
+            })
+        except Exception as e:
+            logger.error(f"❌ Erreur critique: {e}")
+            return timer.attach({'success': False, 'message': f'Erreur technique: {e}', 'details': {'error': str(e)}})
+
+        try:
+            try:
+                result = await self._login(slot.page, config, email, password, timeout, timer)
+            except PlaywrightTimeout as e:
+                logger.error(f"❌ Timeout: {e}")
+                result = {
+                    'success': False,
+                    'message': 'Timeout: La page a pris trop de temps à répondre',
+                    'details': {'url': slot.page.url, 'error': str(e)}
+                }
+            except Exception as e:
+                logger.error(f"❌ Erreur lors du test de connexion: {e}")
+                result = {'success': False, 'message': f'Erreur technique: {e}', 'details': {'error': str(e)}}
+            if self.measure_transfer:
+                result.setdefault('details', {})['transfer'] = await self._transfer(slot)
+        finally:
+            timer.stop()
+            await self._release(slot)
+        self.validations += 1
+        return timer.attach(result)
+
+    async def _login(self, page, config: Dict, email: str, password: str, timeout: int, timer: PhaseTimer) -> Dict:
+        timer.start('page_load')
+        await page.goto(config['login_url'], wait_until='domcontentloaded', timeout=timeout * 1000)
+        await page.wait_for_selector(config['email_selector'], state='visible')
+
+        # Bannière cookies : refusée si déjà affichée, sans l'attendre (les clics passent par JS)
+        timer.start('cookie_banner')
+        if config.get('cookie_selector'):
+            cookie_button = await page.query_selector(config['cookie_selector'])
+            if cookie_button is not None:
+                await cookie_button.evaluate('el => el.click()')
+
+        timer.start('form_fill')
+        await page.fill(config['email_selector'], email)
+        await page.fill(config['password_selector'], password)
+
+        timer.start('submit')
+        url_before = page.url
+        await page.eval_on_selector(config['submit_selector'], 'el => el.click()')
+
+        timer.start('verdict')
+        args = {
+            'urlBefore': url_before,
+            'emailSelector': config['email_selector'],
+            'passwordSelector': config['password_selector'],
+            'successSelector': config.get('success_selector'),
+            'errorSelector': config.get('error_selector', '[role="alert"]'),
+            'markers': config.get('login_url_markers', []),
+            # Messages complets d'abord, puis mots-clés courts
+            'indicators': sorted((i.lower() for i in config['error_indicators']), key=len, reverse=True),
+        }
+        try:
+            handle = await page.wait_for_function(VERDICT_JS, arg=args, polling=100, timeout=VERDICT_TIMEOUT * 1000)
+            verdict = await handle.json_value()
+        except PlaywrightTimeout:
+            verdict = None
+
+        current_url = page.url
+        if verdict and verdict['verdict'] == 'success':
+            return {
+                'success': True,
+                'message': f'Connexion réussie ! Votre compte {config["name"]} est maintenant lié.',
+                'details': {'url': current_url, 'url_before': url_before, 'reason': verdict['reason']}
+            }
+        if verdict:
+            error_found = verdict['error_found']
+            if 'email ou mot de passe incorrect' in error_found:
+                message = 'Connexion échouée: email ou mot de passe incorrect'
+            else:
+                message = 'Connexion échouée: identifiants incorrects'
+            return {
+                'success': False,
+                'message': message,
+                'details': {'url': current_url, 'reason': verdict['reason'], 'error_found': error_found}
+            }
+
+        # Pas de verdict dans le délai : toujours sur la page de connexion → échec
+        fields_present = await page.query_selector(config['email_selector']) is not None
+        if fields_present or any(m in current_url.lower() for m in config.get('login_url_markers', [])):
+            return {
+                'success': False,
+                'message': 'Connexion échouée: identifiants incorrects',
+                'details': {'url': current_url, 'reason': 'still_on_login_page'}
+            }
+        return {
+            'success': False,
+            'message': 'Connexion échouée: impossible de déterminer le statut',
+            'details': {'url': current_url, 'reason': 'no_verdict'}
+        }
+
+    def stats(self) -> Dict:
+        return {
+            'pool_size': self.pool_size,
+            'idle': self._idle.qsize() if self._idle is not None else 0,
+            'in_use': self._in_use,
+            'launches': self.launches,
+            'contexts': self.contexts,
+            'validations': self.validations,
+            'blocking': {
+                'resource_types': sorted(self.block_resources),
+                'domains': len(self.blocked_domains),
+            },
+            'blocked_requests': self.blocked_requests,
+            'blocked_by_domain': self.blocked_domains_hits,
+            'browser_connected': bool(self._browser is not None and self._browser.is_connected()),
+            'chromium_path': CHROMIUM_PATH,
+            'max_uses': MAX_USES,
+            'browser_rss_mb': round(self.browser_memory_mb(), 1),
+            'max_rss_mb': MAX_RSS_MB,
+        }
+
+
+_engine: Optional[LoginEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine(**options) -> LoginEngine:
+    """Moteur partagé du processus (options prises en compte à la première création)"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = LoginEngine(**options)
+        return _engine
+
+
+def validate_credentials(bank_id: str, email: str, password: str, timeout: int = 30) -> Dict:
+    """Raccourci bloquant sur le moteur partagé"""
+    return get_engine().validate_sync(bank_id, email, password, timeout)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 4:
+        print(__doc__)
+        sys.exit(1)
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    started = time.perf_counter()
+    result = validate_credentials(sys.argv[1], sys.argv[2], sys.argv[3])
+    print(f"{'✅ SUCCÈS' if result['success'] else '❌ ÉCHEC'} - {result['message']}")
+    print(f"Détails: {result['details']}")
+    print(f"⏱️  {time.perf_counter() - started:.2f}s")
+    get_engine().close()
+    sys.exit(0 if result['success'] else 1)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Chronométrage par étape des tests de connexion bancaire
+- PhaseTimer : enregistreur léger, une instance par test ; start('page_load')
+  clôt l'étape en cours et ouvre la suivante, les durées d'une même étape
+  s'additionnent (rechargement de page, nouvelle tentative...)
+- PhaseStats : agrégat thread-safe des derniers tests, percentiles par étape
+
+Étapes communes aux trois validateurs (Selenium aws-backend, Selenium PYTHON/,
+Playwright taleos-backend) : voir PHASES. Le détail est renvoyé dans
+result['details']['phases'] (secondes) et agrégé par l'API pour /metrics.
+
+Module partagé comme validation_jobs.py (copié dans l'image Docker de
+taleos-backend, importé depuis PYTHON/ sinon).
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+PHASES = (
+    'browser_start',   # navigateur / session prêts
+    'page_load',       # page de connexion chargée (champs présents)
+    'cookie_banner',   # bannière RGPD refusée ou absente
+    'form_fill',       # email et mot de passe saisis
+    'submit',          # clic sur le bouton de connexion
+    'verdict',         # attente et analyse du résultat
+)
+STATS_WINDOW = 500    # tests récents gardés pour les percentiles
+
+
+class PhaseTimer:
+    """Horodatage des étapes d'un test"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.durations: Dict[str, float] = {}
+        self._current: Optional[str] = None
+        self._current_start = 0.0
+
+    def start(self, phase: str):
+        """Clôt l'étape en cours et démarre `phase`"""
+        now = time.perf_counter()
+        self._close(now)
+        self._current = phase
+        self._current_start = now
+
+    def stop(self):
+        self._close(time.perf_counter())
+
+    def _close(self, now: float):
+        if self._current is not None:
+            self.durations[self._current] = self.durations.get(self._current, 0.0) + now - self._current_start
+            self._current = None
+
+    def breakdown(self) -> Dict[str, float]:
+        """Durées par étape (secondes, ordre de PHASES) et total"""
+        self.stop()
+        ordered = {phase: self.durations[phase] for phase in PHASES if phase in self.durations}
+        ordered.update({phase: d for phase, d in self.durations.items() if phase not in ordered})
+        result = {phase: round(d, 3) for phase, d in ordered.items()}
+        result['total'] = round(time.perf_counter() - self.started_at, 3)
+        return result
+
+    def attach(self, result: Dict, stats: Optional['PhaseStats'] = None) -> Dict:
+        """Ajoute le détail à result['details']['phases'] (et à l'agrégat si fourni)"""
+        phases = self.breakdown()
+        details = result.get('details')
+        if not isinstance(details, dict):
+            details = result['details'] = {}
+        details['phases'] = phases
+        if stats is not None:
+            stats.record(phases)
+        return result
+
+
+def percentiles(values) -> Dict[str, float]:
+    """Nombre, moyenne, p50/p95/p99 et max d'une série de durées (partagé avec validation_jobs)"""
+    if not values:
+        return {'count': 0}
+    ordered = sorted(values)
+
+    def pick(q):
+        return round(ordered[min(int(len(ordered) * q), len(ordered) - 1)], 3)
+
+    return {
+        'count': len(ordered),
+        'avg': round(sum(ordered) / len(ordered), 3),
+        'p50': pick(0.50),
+        'p95': pick(0.95),
+        'p99': pick(0.99),
+        'max': round(ordered[-1], 3),
+    }
+
+
+class PhaseStats:
+    """Durées récentes par étape, pour les percentiles de /metrics"""
+
+    def __init__(self, window: int = STATS_WINDOW):
+        self.window = window
+        self._samples: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, phases: Dict[str, float]):
+        with self._lock:
+            for phase, seconds in phases.items():
+                self._samples.setdefault(phase, deque(maxlen=self.window)).append(seconds)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            samples = {phase: list(values) for phase, values in self._samples.items()}
+        order = list(PHASES) + ['total']
+        return {
+            phase: percentiles(samples[phase])
+            for phase in sorted(samples, key=lambda p: order.index(p) if p in order else len(order))
+        }
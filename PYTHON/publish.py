@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+Étape de publication unique
+- Lit chaque base source une seule fois, fusion ordonnée faite par SQLite (ATTACH + UNION ALL)
+- Applique une seule passe de normalisation (compétences, descriptions, niveaux d'études)
+- Diffuse le même flux d'offres vers toutes les destinations configurées
+  (CSV, JSON complet, JSON Live, Parquet, artefacts du site statique,
+  base de recherche jobs.db, base lecture seule jobs_live.sqlite3...)
+
+Remplace merge_from_databases() + export_sqlite_to_json.py, puis build_jobs_db()
+et export_range_db(), qui relisaient les trois bases chacun de leur côté avec
+des nettoyages différents.
+"""
+
+import ast
+import csv
+import json
+import os
+import re
+import sqlite3
+import textwrap
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+# Configuration des chemins
+PYTHON_DIR = Path(__file__).parent
+HTML_DIR = PYTHON_DIR.parent / "HTML"
+OUTPUT_CSV = HTML_DIR / "scraped_jobs.csv"
+OUTPUT_PARQUET = HTML_DIR / "scraped_jobs.parquet"
+OUTPUT_JSON = HTML_DIR / "scraped_jobs.json"
+OUTPUT_JSON_LIVE = HTML_DIR / "scraped_jobs_live.json"
+LIVE_SHARDS_DIR = HTML_DIR / "live"
+OUTPUT_FACETS = HTML_DIR / "scraped_jobs_live_facets.json"
+SEARCH_INDEX_DIR = HTML_DIR / "search"
+FEED_DIR = HTML_DIR / "feed"
+
+# Chemins des bases de données SQLite
+CA_DB = PYTHON_DIR / "credit_agricole_jobs.db"
+SG_DB = PYTHON_DIR / "societe_generale_jobs.db"
+DELOITTE_DB = PYTHON_DIR / "deloitte_jobs.db"
+
+SOURCES = [
+    ("Crédit Agricole", CA_DB),
+    ("Société Générale", SG_DB),
+    ("Deloitte", DELOITTE_DB),
+]
+
+JOB_COLUMNS = [
+    'job_id', 'job_title', 'contract_type', 'publication_date', 'location',
+    'job_family', 'duration', 'management_position', 'status',
+    'education_level', 'experience_level', 'training_specialization',
+    'technical_skills', 'behavioral_skills', 'tools', 'languages',
+    'job_description', 'company_name', 'company_description', 'job_url',
+    'first_seen', 'last_updated',
+]
+
+# ============================================================================
+# NORMALISATION
+# ============================================================================
+
+def clean_description(desc):
+    """Nettoie les descriptions en remplaçant les retours à la ligne par des espaces"""
+    if not desc:
+        return desc
+    # Remplacer tous les types de retours à la ligne par des espaces
+    cleaned = desc.replace('\r\n', ' ').replace('\n', ' ').replace('\r', ' ')
+    # Remplacer les espaces multiples par un seul espace
+    cleaned = re.sub(r'\s+', ' ', cleaned)
+    return cleaned.strip()
+
+
+def normalize_education_level(edu):
+    """Normalise les niveaux d'étude selon les règles :
+    - Bac+3 et Bachelor → même niveau
+    - Certificat Fédéral de Capacité et Bac → fusionner
+    - Inférieur à Bac et Bac → fusionner
+    - Master et Bac+5 → fusionner
+    """
+    if not edu:
+        return edu
+
+    edu_lower = edu.lower().strip()
+
+    # Mapping de normalisation
+    education_mapping = {
+        # Bachelor → Bac + 3 / L3
+        'bachelor': 'Bac + 3 / L3',
+        'bac + 3': 'Bac + 3 / L3',
+        'bac+3': 'Bac + 3 / L3',
+        'licence': 'Bac + 3 / L3',
+        'l3': 'Bac + 3 / L3',
+
+        # Master → Bac + 5 / M2 et plus
+        'master': 'Bac + 5 / M2 et plus',
+        'm2': 'Bac + 5 / M2 et plus',
+        'mba': 'Bac + 5 / M2 et plus',
+        'bac + 5': 'Bac + 5 / M2 et plus',
+        'bac+5': 'Bac + 5 / M2 et plus',
+        'grande école': 'Bac + 5 / M2 et plus',
+        'école d\'ingénieur': 'Bac + 5 / M2 et plus',
+        'école de commerce': 'Bac + 5 / M2 et plus',
+
+        # Certificat Fédéral de Capacité → Bac
+        'certificat fédéral de capacité': 'Bac',
+        'cfc': 'Bac',
+        'certificat  fédéral de capacité': 'Bac',
+
+        # Inférieur à Bac → Bac
+        'inférieur à bac': 'Bac',
+        'inférieur au bac': 'Bac',
+        'sans bac': 'Bac',
+
+        # Bac → Bac
+        'bac': 'Bac',
+        'baccalauréat': 'Bac',
+    }
+
+    # Vérifier les correspondances exactes d'abord
+    for key, value in education_mapping.items():
+        if key in edu_lower:
+            return value
+
+    # Si déjà dans un format standard, le garder
+    standard_levels = [
+        'Bac', 'Bac + 2 / L2', 'Bac + 3 / L3', 'Bac + 4 / M1',
+        'Bac + 5 / M2 et plus'
+    ]
+    if edu in standard_levels:
+        return edu
+
+    # Sinon retourner tel quel
+    return edu
+
+
+def normalize_job(job: Dict) -> Dict:
+    """Passe de normalisation unique appliquée à toutes les destinations"""
+    # Convertir les listes JSON (ou repr Python) en texte lisible pour les compétences
+    for col in ['technical_skills', 'behavioral_skills']:
+        value = job.get(col)
+        if value and isinstance(value, str) and value.startswith('['):
+            try:
+                parsed = json.loads(value)
+            except ValueError:
+                try:
+                    # Cas où c'est une string Python au lieu de JSON
+                    parsed = ast.literal_eval(value)
+                except (ValueError, SyntaxError):
+                    parsed = None
+            if isinstance(parsed, list):
+                job[col] = ', '.join(str(v) for v in parsed)
+
+    # Nettoyer la description
+    if job.get('job_description'):
+        job['job_description'] = clean_description(job['job_description'])
+
+    # Normaliser le niveau d'étude
+    if job.get('education_level'):
+        job['education_level'] = normalize_education_level(job['education_level'])
+
+    return job
+
+# ============================================================================
+# LECTURE DES SOURCES
+# ============================================================================
+
+def merged_query(aliases: List[str]) -> str:
+    """
+    UNION ALL des sources attachées, trié par last_updated décroissant
+    (un paramètre par source : son nom, renvoyé dans la colonne source)
+    """
+    selects = [
+        f"SELECT ? AS source, {', '.join(JOB_COLUMNS)} FROM {alias}.jobs WHERE is_valid = 1"
+        for alias in aliases
+    ]
+    return "\nUNION ALL\n".join(selects) + "\nORDER BY last_updated DESC"
+
+
+def iter_merged_jobs(sources=SOURCES) -> Iterator[Tuple[str, Dict]]:
+    """
+    Flux (source, offre) des offres valides de toutes les sources, déjà triées
+    par last_updated décroissant
+
+    Les bases sont attachées à une connexion unique ; grâce à l'index partiel
+    idx_jobs_valid_last_updated de chaque source, SQLite fusionne les trois parcours
+    ordonnés (MERGE UNION ALL) sans tri global : aucune liste intermédiaire n'est
+    construite en Python.
+    Les sources sont ouvertes en lecture seule : leur schéma est mis à jour par les
+    scrapers et par update_all_jobs.py (job_store.migrate_sources), jamais ici.
+    """
+    aliases = []
+    names = []
+    conn = sqlite3.connect("file::memory:", uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        for i, (name, db_path) in enumerate(sources):
+            if not db_path.exists():
+                print(f"⚠️ Base de données manquante : {db_path}")
+                continue
+            try:
+                conn.execute(f"ATTACH DATABASE ? AS src{i}", (f"file:{db_path}?mode=ro",))
+            except sqlite3.Error as e:
+                print(f"   ❌ Erreur lors de la lecture de {db_path}: {e}")
+                continue
+            aliases.append(f"src{i}")
+            names.append(name)
+            print(f"📁 {name} : {db_path.name} attachée")
+
+        if not aliases:
+            return
+
+        for row in conn.execute(merged_query(aliases), names):
+            job = dict(row)
+            source = job.pop('source')
+            yield source, normalize_job(job)
+    finally:
+        conn.close()
+
+def iter_source_jobs(sources=SOURCES) -> Iterator[Tuple[str, Dict]]:
+    """
+    Offres à publier, avec leur source : base unique multi-sources si elle existe
+    (synchronisée d'abord), sinon fusion ordonnée des bases des scrapers
+    """
+    from unified_store import UNIFIED_DB, import_sources, iter_jobs
+
+    if not UNIFIED_DB.exists():
+        yield from iter_merged_jobs(sources)
+        return
+
+    print(f"📁 Base unique {UNIFIED_DB.name} : synchronisation des sources...")
+    import_sources(UNIFIED_DB, sources)
+    for job in iter_jobs(UNIFIED_DB):
+        source = job.pop('source')
+        yield source, normalize_job(job)
+
+# ============================================================================
+# DESTINATIONS (SINKS)
+# ============================================================================
+
+def is_live(job: Dict) -> bool:
+    return job.get('status') == 'Live'
+
+
+class Sink:
+    """
+    Destination d'export : reçoit les offres une par une, dans l'ordre de publication
+    (last_updated décroissant), déjà normalisées ; source = nom de la base d'origine
+    """
+
+    def write(self, job: Dict, source: str = None):
+        raise NotImplementedError
+
+    def close(self) -> Optional[str]:
+        """Finalise la destination et retourne un message de résumé"""
+        return None
+
+
+class CsvSink(Sink):
+    """Fichier CSV (écriture en flux)"""
+
+    def __init__(self, path: Path, columns: List[str] = JOB_COLUMNS):
+        self.path = Path(path)
+        self.columns = columns
+        self.file = None
+        self.writer = None
+        self.count = 0
+
+    def write(self, job, source=None):
+        if self.file is None:
+            self.file = open(self.path, 'w', encoding='utf-8', newline='')
+            self.writer = csv.DictWriter(self.file, fieldnames=self.columns)
+            self.writer.writeheader()
+        self.writer.writerow(job)
+        self.count += 1
+
+    def close(self):
+        if self.file is None:
+            return None
+        self.file.close()
+        return f"✅ {self.count} jobs sauvegardés dans {self.path.name}"
+
+
+class JsonSink(Sink):
+    """
+    Tableau JSON (écriture en flux, même mise en forme que json.dump(indent=2))
+
+    Écrit dans un fichier temporaire remplacé à la fermeture : un export
+    interrompu ne laisse jamais de JSON tronqué, et `[]` est bien publié
+    quand aucune offre ne correspond (plus d'ancien fichier laissé en ligne).
+    """
+
+    def __init__(self, path: Path, predicate: Callable[[Dict], bool] = None):
+        self.path = Path(path)
+        self.tmp_path = self.path.with_name(self.path.name + '.tmp')
+        self.predicate = predicate
+        self.file = None
+        self.count = 0
+
+    def _open(self):
+        self.file = open(self.tmp_path, 'w', encoding='utf-8')
+        self.file.write('[')
+
+    def write(self, job, source=None):
+        if self.predicate and not self.predicate(job):
+            return
+        if self.file is None:
+            self._open()
+        self.file.write('\n' if self.count == 0 else ',\n')
+        self.file.write(textwrap.indent(json.dumps(job, ensure_ascii=False, indent=2), '  '))
+        self.count += 1
+
+    def close(self):
+        if self.file is None:
+            self._open()
+        self.file.write('\n]' if self.count else ']')
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+        return f"✅ {self.count} offres dans {self.path.name}"
+
+
+class ParquetSink(Sink):
+    """Export colonnaire pour l'analyse (regroupé par entreprise à la fermeture)"""
+
+    def __init__(self, path: Path, columns: List[str] = JOB_COLUMNS):
+        self.path = Path(path)
+        self.columns = columns
+        self.jobs = []
+
+    def write(self, job, source=None):
+        self.jobs.append(job)
+
+    def close(self):
+        if not self.jobs:
+            return None
+        from export_parquet import write_parquet
+        stats = write_parquet(self.jobs, self.columns, self.path)
+        if not stats:
+            return None
+        return (f"✅ Export Parquet : {stats['rows']} lignes, {stats['row_groups']} row groups "
+                f"({stats['bytes'] / 1024:.1f} Ko) dans {self.path.name}")
+
+
+class LiveArtifactsSink(Sink):
+    """
+    Artefacts du site statique construits sur les offres Live :
+    shards paginés, index de facettes, index de recherche et flux de deltas.
+    Tous partagent les mêmes ordinaux (position dans scraped_jobs_live.json).
+    """
+
+    def __init__(self):
+        self.live_jobs = []
+
+    def write(self, job, source=None):
+        if is_live(job):
+            self.live_jobs.append(job)
+
+    def close(self):
+        # Publié même sans offre Live : manifest vide, anciens shards et fiches supprimés
+        from live_shards import write_live_shards
+        from facet_index import write_facet_index
+        from search_index import write_search_index
+        from delta_feed import publish_delta
+
+        # Manifest + shards paginés + fiches détail pour un premier affichage rapide
+        write_live_shards(self.live_jobs, LIVE_SHARDS_DIR)
+
+        # Index de facettes (ordinaux = positions dans scraped_jobs_live.json)
+        write_facet_index(self.live_jobs, OUTPUT_FACETS)
+
+        # Index de recherche plein texte (mêmes ordinaux)
+        search_stats = write_search_index(self.live_jobs, SEARCH_INDEX_DIR)
+        print(f"🔎 Index de recherche : {search_stats['terms']} termes en {search_stats['blocks']} blocs, "
+              f"{search_stats['bytes'] / 1024:.1f} Ko (compressé), construit en {search_stats['build_time'] * 1000:.0f} ms")
+
+        # Flux de deltas pour les consommateurs incrémentaux
+        feed = publish_delta(self.live_jobs, FEED_DIR)
+        return (f"✅ Flux de deltas : version {feed['version']} "
+                f"(+{feed['added']} / ~{feed['updated']} / -{feed['expired']})"
+                f"{' — nouveau snapshot' if feed['snapshot'] else ''}")
+
+
+class JobsDbSink(Sink):
+    """Base de recherche jobs.db (FTS5, voir jobs_db.py) : toutes les offres valides"""
+
+    def __init__(self, path: Path = None):
+        self.path = path
+        self.builder = None
+        self.total = 0
+
+    def write(self, job, source=None):
+        if self.builder is None:
+            from jobs_db import JOBS_DB, JobsDbBuilder
+            self.builder = JobsDbBuilder(self.path or JOBS_DB)
+        self.builder.add(source, job)
+
+    def close(self):
+        if self.builder is None:
+            return None
+        self.total = self.builder.finish()
+        return f"✅ {self.builder.output_path.name} construite : {self.total} offres indexées"
+
+
+class RangeDbSink(Sink):
+    """
+    Base lecture seule des offres Live pour les requêtes HTTP Range (voir range_db.py)
+    Écrite même sans offre Live, pour ne pas laisser l'ancienne base en ligne.
+    """
+
+    def __init__(self, path: Path = None):
+        self.path = path
+        self.builder = None
+        self.stats = None
+
+    def write(self, job, source=None):
+        if self.builder is None:
+            from range_db import OUTPUT_RANGE_DB, RangeDbBuilder
+            self.builder = RangeDbBuilder(self.path or OUTPUT_RANGE_DB)
+        self.builder.add(job)
+
+    def close(self):
+        if self.builder is None:
+            return None
+        self.stats = self.builder.finish()
+        return (f"✅ {self.builder.output_path.name} exportée : {self.stats['offers']} offres Live, "
+                f"{self.stats['bytes'] / 1024:.1f} Ko")
+
+
+class StatsSink(Sink):
+    """Répartition par entreprise et par statut (résumé de fin d'export)"""
+
+    def __init__(self):
+        self.companies = {}
+        self.statuses = {}
+
+    def write(self, job, source=None):
+        company = job.get('company_name', 'Unknown')
+        self.companies[company] = self.companies.get(company, 0) + 1
+        status = job.get('status', 'Unknown')
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def close(self):
+        lines = ["\n📊 Répartition par entreprise:"]
+        for company, count in sorted(self.companies.items(), key=lambda x: x[1], reverse=True):
+            lines.append(f"   - {company}: {count} offres")
+        lines.append("\n📊 Répartition par statut:")
+        for status, count in sorted(self.statuses.items(), key=lambda x: x[1], reverse=True):
+            lines.append(f"   - {status}: {count} offres")
+        return '\n'.join(lines)
+
+
+def default_sinks() -> List[Sink]:
+    """Destinations publiées à chaque mise à jour (ajouter ici les futurs formats)"""
+    return [
+        CsvSink(OUTPUT_CSV),
+        ParquetSink(OUTPUT_PARQUET),
+        JsonSink(OUTPUT_JSON),
+        JsonSink(OUTPUT_JSON_LIVE, predicate=is_live),
+        LiveArtifactsSink(),
+        JobsDbSink(),
+        RangeDbSink(),
+        StatsSink(),
+    ]
+
+# ============================================================================
+# PUBLICATION
+# ============================================================================
+
+def publish(sinks: List[Sink] = None, sources=SOURCES) -> int:
+    """
+    Lit les sources, normalise et diffuse les offres vers toutes les destinations
+
+    Returns:
+        Nombre d'offres publiées
+    """
+    sinks = default_sinks() if sinks is None else sinks
+
+    count = 0
+    for source, job in iter_source_jobs(sources):
+        for sink in sinks:
+            sink.write(job, source)
+        count += 1
+
+    if not count:
+        print("❌ Aucun job à publier !")
+        return 0
+
+    print()
+    for sink in sinks:
+        message = sink.close()
+        if message:
+            print(message)
+
+    return count
+
+
+def main():
+    print("=" * 80)
+    print("🔄 PUBLICATION DES OFFRES (CSV, JSON, Parquet, artefacts du site, bases SQLite)")
+    print("=" * 80)
+    print(f"Date : {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print()
+
+    publish()
+
+    print()
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
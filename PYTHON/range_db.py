@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Export des offres Live en base SQLite lecture seule optimisée pour les requêtes HTTP Range
+Destinée à GitHub Pages + un client type sql.js-httpvfs : le navigateur ne télécharge
+que les pages touchées par une requête au lieu du JSON complet.
+
+Optimisations :
+- page_size de 1 Ko : une requête ne rapatrie que quelques petites pages
+- rowid attribué dans l'ordre du flux de publication (last_updated DESC) :
+  les offres récentes sont contiguës
+- descriptions dans une table séparée : la table de liste reste dense
+- index (facette, id) : filtrer, trier par récence et compter par valeur (COUNT couvert
+  par l'index) ; les pages de liste lisent ensuite les lignes par id, contiguës dans la table
+- VACUUM final : fichier compact, sans pages libres
+
+Alimentée à chaque mise à jour par publish.py (RangeDbSink), avec les offres déjà
+normalisées des autres formats ; export_range_db() la construit seule.
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict
+
+from publish import SOURCES
+
+# Configuration des chemins
+PYTHON_DIR = Path(__file__).parent
+HTML_DIR = PYTHON_DIR.parent / "HTML"
+OUTPUT_RANGE_DB = HTML_DIR / "jobs_live.sqlite3"
+
+PAGE_SIZE = 1024
+
+LIST_COLUMNS = [
+    'job_url', 'job_id', 'job_title', 'contract_type', 'publication_date', 'location',
+    'job_family', 'experience_level', 'education_level', 'company_name', 'status',
+    'first_seen', 'last_updated',
+]
+
+DETAIL_COLUMNS = [
+    'duration', 'management_position', 'training_specialization', 'technical_skills',
+    'behavioral_skills', 'tools', 'languages', 'job_description', 'company_description',
+]
+
+FACET_COLUMNS = [
+    'contract_type', 'company_name', 'location', 'job_family', 'experience_level', 'education_level',
+]
+
+
+INSERT_LIST_SQL = f"INSERT INTO jobs (id, {', '.join(LIST_COLUMNS)}) VALUES ({', '.join('?' * (len(LIST_COLUMNS) + 1))})"
+
+INSERT_DETAIL_SQL = f"INSERT INTO job_details (id, {', '.join(DETAIL_COLUMNS)}) VALUES ({', '.join('?' * (len(DETAIL_COLUMNS) + 1))})"
+
+FTS_SCHEMA = """
+    CREATE VIRTUAL TABLE jobs_fts USING fts5(
+        job_title, skills, content='', tokenize='unicode61 remove_diacritics 2'
+    )
+"""
+
+FILL_FTS_SQL = """
+    INSERT INTO jobs_fts (rowid, job_title, skills)
+    SELECT j.id, j.job_title,
+           COALESCE(d.technical_skills, '') || ' ' || COALESCE(d.behavioral_skills, '') || ' ' || COALESCE(d.tools, '')
+    FROM jobs j JOIN job_details d ON d.id = j.id
+"""
+
+
+class RangeDbBuilder:
+    """Construit la base lecture seule offre par offre (fichier temporaire renommé à la fin)"""
+
+    def __init__(self, output_path: Path = OUTPUT_RANGE_DB):
+        self.output_path = Path(output_path)
+        self.tmp_path = self.output_path.with_suffix('.tmp')
+        if self.tmp_path.exists():
+            self.tmp_path.unlink()
+        self.urls = set()
+
+        self.conn = sqlite3.connect(self.tmp_path)
+        # page_size doit être fixé avant la création de la première table
+        self.conn.execute(f"PRAGMA page_size = {PAGE_SIZE}")
+        self.conn.execute("PRAGMA journal_mode = DELETE")
+        self.conn.execute(f"""
+            CREATE TABLE jobs (
+                id INTEGER PRIMARY KEY,
+                {', '.join(f'{c} TEXT' for c in LIST_COLUMNS)}
+            )
+        """)
+        self.conn.execute(f"""
+            CREATE TABLE job_details (
+                id INTEGER PRIMARY KEY,
+                {', '.join(f'{c} TEXT' for c in DETAIL_COLUMNS)}
+            )
+        """)
+
+    def add(self, job: Dict):
+        """Ajoute une offre Live (une URL n'est gardée qu'une fois, comme dans jobs.db)"""
+        if job.get('status') != 'Live' or job.get('job_url') in self.urls:
+            return
+        self.urls.add(job.get('job_url'))
+        # id = rang par récence : le flux arrive trié, l'ordre physique suit l'ordre d'affichage
+        new_id = len(self.urls)
+        self.conn.execute(INSERT_LIST_SQL, [new_id, *(job.get(c) for c in LIST_COLUMNS)])
+        self.conn.execute(INSERT_DETAIL_SQL, [new_id, *(job.get(c) for c in DETAIL_COLUMNS)])
+
+    def finish(self) -> dict:
+        """
+        Index plein texte et de facettes, VACUUM, puis remplacement du fichier publié
+
+        Returns:
+            Statistiques : nombre d'offres, taille du fichier, nombre de pages
+        """
+        conn = self.conn
+        try:
+            conn.execute(FTS_SCHEMA)
+            conn.execute(FILL_FTS_SQL)
+            conn.execute("INSERT INTO jobs_fts (jobs_fts) VALUES ('optimize')")
+            conn.commit()
+
+            # (facette, id) : filtre et tri par récence dans l'index, comptages sans lire la table ;
+            # les colonnes affichées restent lues dans jobs (rowid = rang, donc pages contiguës)
+            for column in FACET_COLUMNS:
+                conn.execute(f"CREATE INDEX idx_jobs_{column} ON jobs({column}, id)")
+            conn.execute("ANALYZE")
+            conn.commit()
+            conn.execute("VACUUM")
+
+            total = conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+            page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        finally:
+            conn.close()
+
+        self.tmp_path.replace(self.output_path)
+        return {
+            'offers': total,
+            'pages': page_count,
+            'bytes': self.output_path.stat().st_size,
+        }
+
+
+def export_range_db(output_path: Path = OUTPUT_RANGE_DB, sources=SOURCES) -> dict:
+    """
+    Construit uniquement la base lecture seule, depuis le flux normalisé de publish.py
+
+    Returns:
+        Statistiques : nombre d'offres, taille du fichier, nombre de pages (None sans offre)
+    """
+    from publish import RangeDbSink, publish
+
+    sink = RangeDbSink(output_path)
+    publish([sink], sources)
+    return sink.stats
+
+
+if __name__ == "__main__":
+    output = Path(sys.argv[1]) if len(sys.argv) > 1 else OUTPUT_RANGE_DB
+    stats = export_range_db(output)
+    if not stats:
+        sys.exit(1)
+    print(f"✅ {stats['offers']} offres Live exportées dans {output}")
+    print(f"   - {stats['pages']} pages de {PAGE_SIZE} octets ({stats['bytes'] / 1024:.1f} Ko)")
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Index de recherche plein texte compact pour le site statique
+- Tokenisation avec suppression des accents (« Crédit » et « credit » donnent le même terme)
+- Index inversé terme → liste d'ordinaux d'offres, encodée en deltas + varint
+- Découpage en blocs par préfixe de 2 lettres, compressés en gzip :
+  une recherche ne télécharge que index.json et le(s) bloc(s) de ses termes
+  (index.json associe chaque préfixe à son fichier, nommé avec le préfixe en hexadécimal)
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+import re
+import time
+import unicodedata
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+# Champs indexés (les descriptions restent hors de l'index pour garder les blocs légers)
+INDEXED_FIELDS = (
+    'job_title', 'job_family', 'location',
+    'technical_skills', 'behavioral_skills', 'tools', 'languages',
+)
+
+# Longueur du préfixe qui détermine le bloc d'un terme
+PREFIX_LENGTH = 2
+
+MIN_TOKEN_LENGTH = 2
+
+STOPWORDS = {
+    'de', 'des', 'du', 'la', 'le', 'les', 'et', 'en', 'un', 'une', 'au', 'aux',
+    'pour', 'par', 'sur', 'dans', 'avec', 'the', 'and', 'of', 'for', 'to', 'in',
+    'hf', 'fh',
+}
+
+INDEX_NAME = "index.json"
+
+
+def fold(text: str) -> str:
+    """Minuscules sans accents"""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> List[str]:
+    """Découpe un texte en termes normalisés (même fonction à reproduire côté client)"""
+    if not text:
+        return []
+    return [
+        token for token in re.split(r'[^a-z0-9+#]+', fold(text))
+        if len(token) >= MIN_TOKEN_LENGTH and token not in STOPWORDS
+    ]
+
+
+def encode_postings(ordinals: Iterable[int]) -> bytes:
+    """Encode une liste triée d'ordinaux en deltas successifs, chaque delta en varint (LEB128)"""
+    out = bytearray()
+    previous = 0
+    for ordinal in ordinals:
+        delta = ordinal - previous
+        previous = ordinal
+        while delta >= 0x80:
+            out.append((delta & 0x7F) | 0x80)
+            delta >>= 7
+        out.append(delta)
+    return bytes(out)
+
+
+def decode_postings(data: bytes) -> List[int]:
+    """Opération inverse de encode_postings"""
+    ordinals = []
+    current = 0
+    value = 0
+    shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        current += value
+        ordinals.append(current)
+        value = 0
+        shift = 0
+    return ordinals
+
+
+def _job_text(job: Dict, field: str) -> str:
+    value = job.get(field)
+    if isinstance(value, list):
+        return ' '.join(str(v) for v in value)
+    return value or ''
+
+
+def build_postings(jobs: List[Dict]) -> Dict[str, List[int]]:
+    """Construit l'index inversé terme → ordinaux triés (ordinal = position dans jobs)"""
+    postings: Dict[str, List[int]] = {}
+    for ordinal, job in enumerate(jobs):
+        terms = set()
+        for field in INDEXED_FIELDS:
+            terms.update(tokenize(_job_text(job, field)))
+        for term in terms:
+            postings.setdefault(term, []).append(ordinal)
+    return postings
+
+
+def write_search_index(jobs: List[Dict], out_dir: Path) -> Dict:
+    """
+    Construit et écrit l'index de recherche découpé en blocs de préfixe
+
+    Args:
+        jobs: Offres dans l'ordre publié (ordinal = position dans scraped_jobs_live.json)
+        out_dir: Dossier de sortie (ex: HTML/search)
+
+    Returns:
+        Statistiques : nombre de termes, blocs, taille compressée et temps de construction
+    """
+    start = time.time()
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    postings = build_postings(jobs)
+
+    blocks: Dict[str, Dict[str, str]] = {}
+    for term in sorted(postings):
+        prefix = term[:PREFIX_LENGTH]
+        blocks.setdefault(prefix, {})[term] = base64.b64encode(
+            encode_postings(postings[term])
+        ).decode('ascii')
+
+    block_table = {}
+    total_bytes = 0
+    for prefix, terms in blocks.items():
+        raw = json.dumps(terms, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        # mtime=0 : sortie déterministe, donc même hash si le contenu ne change pas
+        payload = gzip.compress(raw, compresslevel=9, mtime=0)
+        digest = hashlib.sha256(payload).hexdigest()[:10]
+        # Préfixe en hexadécimal dans le nom : « c# » ou « c+ » ne sont pas sûrs dans une URL
+        filename = f"block-{prefix.encode('utf-8').hex()}-{digest}.json.gz"
+        path = out_dir / filename
+        if not path.exists():
+            path.write_bytes(payload)
+        block_table[prefix] = {'file': filename, 'terms': len(terms), 'bytes': len(payload)}
+        total_bytes += len(payload)
+
+    # Suppression des blocs obsolètes
+    current_files = {b['file'] for b in block_table.values()}
+    for old in out_dir.glob("block-*.json.gz"):
+        if old.name not in current_files:
+            old.unlink()
+
+    index = {
+        'version': 1,
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'total': len(jobs),
+        'fields': list(INDEXED_FIELDS),
+        'prefix_length': PREFIX_LENGTH,
+        'postings_encoding': 'base64-delta-varint',
+        'blocks': block_table,
+    }
+    index_payload = json.dumps(index, ensure_ascii=False, separators=(',', ':'))
+    (out_dir / INDEX_NAME).write_text(index_payload, encoding='utf-8')
+    total_bytes += len(index_payload.encode('utf-8'))
+
+    return {
+        'terms': len(postings),
+        'blocks': len(block_table),
+        'bytes': total_bytes,
+        'build_time': time.time() - start,
+    }
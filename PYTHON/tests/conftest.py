@@ -0,0 +1,6 @@
+"""Les modules de PYTHON/ s'importent à plat (import job_store) : même chemin que les scripts"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,134 @@
+"""
+Archivage (archive_expired.py) : offre archivée, republiée puis de nouveau expirée ;
+base unique, copies archivées et historique des versions
+"""
+
+import sqlite3
+
+import pytest
+
+import job_store
+import unified_store
+from archive_expired import ARCHIVED_COLUMNS, archive_expired, init_archive
+
+OLD = '2020-01-01 00:00:00'
+
+
+@pytest.fixture
+def paths(tmp_path):
+    source = tmp_path / 'ca.db'
+    conn = sqlite3.connect(source)
+    job_store.migrate_schema(conn)
+    conn.commit()
+    conn.close()
+    return {
+        'sources': [('ca', source)],
+        'source': source,
+        'archive': tmp_path / 'jobs_archive.db',
+        'unified': tmp_path / 'jobs_all_sources.db',
+    }
+
+
+def put_job(paths, url, status, last_updated=None, title='Analyste'):
+    """Offre écrite dans la base du scraper (last_updated par défaut : maintenant)"""
+    conn = sqlite3.connect(paths['source'])
+    try:
+        with conn:
+            conn.execute("""
+                INSERT INTO jobs (job_url, job_title, status, is_valid, last_updated)
+                VALUES (?, ?, ?, 1, COALESCE(?, datetime('now')))
+                ON CONFLICT (job_url) DO UPDATE SET
+                    job_title = excluded.job_title, status = excluded.status,
+                    last_updated = excluded.last_updated
+            """, (url, title, status, last_updated))
+    finally:
+        conn.close()
+
+
+def expire(paths, url):
+    """Expiration par le scraper (version de statut enregistrée), datée d'avant la rétention"""
+    conn = sqlite3.connect(paths['source'])
+    try:
+        with conn:
+            job_store.expire_urls(conn, [url])
+            conn.execute("UPDATE jobs SET last_updated = ? WHERE job_url = ?", (OLD, url))
+    finally:
+        conn.close()
+
+
+def run_update(paths):
+    """Import vers la base unique puis archivage, comme update_all_jobs.py"""
+    unified_store.import_sources(paths['unified'], paths['sources'], verbose=False)
+    return archive_expired(90, paths['sources'], paths['archive'], paths['unified'])
+
+
+def unified_urls(paths):
+    conn = sqlite3.connect(paths['unified'])
+    try:
+        return {row[0] for row in conn.execute("SELECT job_url FROM jobs")}
+    finally:
+        conn.close()
+
+
+def test_relisted_offer_stays_in_unified_db(paths):
+    put_job(paths, 'a', 'Expired', OLD)
+    put_job(paths, 'b', 'Live')
+    assert run_update(paths) == 1
+    assert unified_urls(paths) == {'b'}
+
+    # L'offre revient, puis une autre offre est archivée : a reste publiée
+    put_job(paths, 'a', 'Live')
+    put_job(paths, 'c', 'Expired', OLD)
+    assert run_update(paths) == 1
+    assert unified_urls(paths) == {'a', 'b'}
+
+
+def test_rearchived_offer_keeps_its_first_archive(paths):
+    put_job(paths, 'a', 'Live', title='Analyste')
+    expire(paths, 'a')
+    assert run_update(paths) == 1
+
+    # Republiée sous un autre intitulé, puis de nouveau expirée et archivée
+    put_job(paths, 'a', 'Live', title='Analyste senior')
+    expire(paths, 'a')
+    assert run_update(paths) == 1
+
+    conn = sqlite3.connect(':memory:')
+    conn.execute("ATTACH DATABASE ? AS archive", (str(paths['archive']),))
+    try:
+        copies = conn.execute("""
+            SELECT generation, job_title FROM archive.archived_jobs
+            WHERE source = 'ca' AND job_url = 'a' ORDER BY generation
+        """).fetchall()
+        versions = [row[0] for row in conn.execute("""
+            SELECT version FROM archive.archived_versions
+            WHERE source = 'ca' AND job_url = 'a' ORDER BY version
+        """)]
+    finally:
+        conn.close()
+
+    assert copies == [(1, 'Analyste'), (2, 'Analyste senior')]
+    # Deux expirations, une version de statut chacune : la seconde ne remplace pas la première
+    assert versions == [1, 2]
+
+
+def test_archive_without_generation_is_migrated(tmp_path):
+    conn = sqlite3.connect(':memory:')
+    conn.execute("ATTACH DATABASE ? AS archive", (str(tmp_path / 'old_archive.db'),))
+    # Schéma d'avant la colonne generation : une copie par (source, job_url)
+    conn.execute(f"""
+        CREATE TABLE archive.archived_jobs (
+            source TEXT NOT NULL, {', '.join(ARCHIVED_COLUMNS)},
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (source, job_url)
+        )
+    """)
+    conn.execute("INSERT INTO archive.archived_jobs (source, job_url, job_title) VALUES ('ca', 'a', 'Analyste')")
+    conn.commit()
+    try:
+        init_archive(conn)
+        assert conn.execute(
+            "SELECT source, job_url, generation, job_title FROM archive.archived_jobs"
+        ).fetchall() == [('ca', 'a', 1, 'Analyste')]
+    finally:
+        conn.close()
@@ -0,0 +1,67 @@
+"""
+Tokens de auth_server.py : le token de session n'est lu que dans l'en-tête
+Authorization ; le flux SSE n'accepte que son token court, émis pour ce test.
+"""
+
+import pytest
+
+auth_server = pytest.importorskip('auth_server')
+
+from validation_jobs import ValidationJobQueue  # noqa: E402
+
+USER_ID, EMAIL = 7, 'user@example.org'
+
+
+@pytest.fixture
+def client(monkeypatch):
+    queue = ValidationJobQueue(lambda **params: {'success': True}, max_workers=1)
+    monkeypatch.setattr(auth_server, 'validation_queue', queue)
+    auth_server.app.config['TESTING'] = True
+    with auth_server.app.test_client() as client:
+        yield client
+
+
+@pytest.fixture
+def job_id():
+    job_id = auth_server.validation_queue.submit(owner=USER_ID, bank_id='credit_agricole')
+    auth_server.validation_queue.wait_result(job_id, timeout=5)
+    return job_id
+
+
+def bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def status_url(job_id):
+    return f'/api/test-bank-connection/{job_id}'
+
+
+def test_status_requires_authorization_header(client, job_id):
+    session = auth_server.generate_jwt_token(USER_ID, EMAIL)
+    assert client.get(status_url(job_id), headers=bearer(session)).status_code == 200
+    assert client.get(f'{status_url(job_id)}?access_token={session}').status_code == 401
+
+
+def test_sse_token_is_refused_outside_the_stream(client, job_id):
+    sse = auth_server.generate_sse_token(USER_ID, EMAIL, job_id)
+    assert client.get(status_url(job_id), headers=bearer(sse)).status_code == 401
+
+
+def test_events_accepts_only_the_sse_token_of_the_job(client, job_id):
+    session = auth_server.generate_jwt_token(USER_ID, EMAIL)
+    events_url = client.get(status_url(job_id), headers=bearer(session)).get_json()['events_url']
+
+    response = client.get(events_url)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    assert b'event: done' in response.get_data()
+
+    assert client.get(f'{status_url(job_id)}/events?access_token={session}').status_code == 401
+    assert client.get(f'{status_url(job_id)}/events', headers=bearer(session)).status_code == 401
+    other = auth_server.generate_sse_token(USER_ID, EMAIL, 'autre-test')
+    assert client.get(f'{status_url(job_id)}/events?access_token={other}').status_code == 401
+
+
+def test_events_of_another_account_are_hidden(client, job_id):
+    sse = auth_server.generate_sse_token(USER_ID + 1, 'other@example.org', job_id)
+    assert client.get(f'{status_url(job_id)}/events?access_token={sse}').status_code == 404
@@ -0,0 +1,182 @@
+"""
+Boîte d'envoi (email_outbox.py) contre le serveur SMTP local (local_smtp_server.py) :
+livraison, bail des messages en cours d'envoi, backoff des échecs temporaires,
+abandon des échecs définitifs, et inscription sans SMTP configuré.
+"""
+
+import time
+
+import pytest
+
+import email_outbox
+from auth_db import open_connection
+from email_outbox import (OutboxWorker, SmtpSession, claim_batch, count_by_status, enqueue_email,
+                          init_outbox)
+from local_smtp_server import LocalSMTPServer
+
+SENDER = 'taleos@example.com'
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / 'users.db'
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = open_connection(db_path)
+    init_outbox(conn)
+    yield conn
+    conn.close()
+
+
+def make_server(**options):
+    return LocalSMTPServer(**options).start()
+
+
+def make_worker(db_path, server, **options):
+    session = SmtpSession('127.0.0.1', server.port, 'test', 'test', starttls=False, timeout=5)
+    return OutboxWorker(db_path, session, SENDER, **options)
+
+
+def enqueue(conn, count, domain='example.org'):
+    with conn:
+        return [enqueue_email(conn, f'user{i}@{domain}', f'Sujet {i}', 'texte', '<p>html</p>')
+                for i in range(count)]
+
+
+def row(conn, message_id):
+    return conn.execute("""
+        SELECT status, attempts, last_error,
+               CAST(strftime('%s', next_attempt_at) - strftime('%s', 'now') AS INTEGER)
+        FROM email_outbox WHERE id = ?
+    """, (message_id,)).fetchone()
+
+
+def make_due(conn):
+    with conn:
+        conn.execute("UPDATE email_outbox SET next_attempt_at = datetime('now', '-1 seconds')")
+
+
+def test_delivery_reuses_one_smtp_session(conn, db_path):
+    server = make_server()
+    try:
+        enqueue(conn, 3)
+        worker = make_worker(db_path, server)
+        assert worker.drain(conn) == 3
+        worker.session.close()
+    finally:
+        server.stop()
+
+    assert count_by_status(conn) == {'sent': 3}
+    assert sorted(recipients[0] for _, recipients, _ in server.messages) == [
+        'user0@example.org', 'user1@example.org', 'user2@example.org']
+    assert server.messages[0][2]['Subject'] == 'Sujet 0'
+    assert server.sessions == 1
+
+
+def test_worker_thread_sends_on_notify(conn, db_path):
+    server = make_server()
+    worker = make_worker(db_path, server, poll_interval=60)
+    worker.start()
+    try:
+        enqueue(conn, 1)
+        worker.notify()
+        deadline = time.monotonic() + 5
+        while not server.messages and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        worker.stop()
+        server.stop()
+
+    assert len(server.messages) == 1
+    assert count_by_status(conn) == {'sent': 1}
+
+
+def test_claimed_message_is_leased(conn):
+    [message_id] = enqueue(conn, 1)
+    assert [r[0] for r in claim_batch(conn)] == [message_id]
+    status, attempts, _, delay = row(conn, message_id)
+    assert status == 'sending' and attempts == 0
+    assert email_outbox.LEASE_SECONDS - 5 <= delay <= email_outbox.LEASE_SECONDS
+
+    # Bail en cours : le message n'est pas repris par un autre worker
+    assert claim_batch(conn) == []
+
+    # Processus arrêté pendant l'envoi : le message redevient éligible à l'expiration du bail
+    make_due(conn)
+    assert [r[0] for r in claim_batch(conn)] == [message_id]
+
+
+def test_temporary_failure_backs_off_then_delivers(conn, db_path):
+    server = make_server(fail_first=2)
+    try:
+        [message_id] = enqueue(conn, 1)
+        worker = make_worker(db_path, server)
+
+        for attempt in (1, 2):
+            assert worker.drain(conn) == 1
+            status, attempts, last_error, delay = row(conn, message_id)
+            assert (status, attempts) == ('pending', attempt)
+            assert '451' in last_error
+            expected = email_outbox.retry_delay(attempt)
+            assert expected - 5 <= delay <= expected
+            # Pas encore à échéance : rien n'est renvoyé
+            assert worker.drain(conn) == 0
+            make_due(conn)
+
+        assert worker.drain(conn) == 1
+        worker.session.close()
+    finally:
+        server.stop()
+
+    assert row(conn, message_id)[:3] == ('sent', 3, None)
+    assert len(server.messages) == 1
+
+
+def test_retry_delay_is_exponential_and_capped():
+    delays = [email_outbox.retry_delay(n) for n in range(1, 5)]
+    assert delays == [email_outbox.RETRY_BASE_SECONDS * 2 ** i for i in range(4)]
+    assert email_outbox.retry_delay(50) == email_outbox.RETRY_MAX_SECONDS
+
+
+def test_permanent_failure_is_not_retried(conn, db_path):
+    server = make_server(reject_domain='refused.example')
+    try:
+        [message_id] = enqueue(conn, 1, domain='refused.example')
+        worker = make_worker(db_path, server)
+        assert worker.drain(conn) == 1
+        worker.session.close()
+    finally:
+        server.stop()
+
+    status, attempts, last_error, _ = row(conn, message_id)
+    assert (status, attempts) == ('failed', 1)
+    assert '550' in last_error
+    assert server.messages == []
+
+
+def test_too_many_attempts_fail(conn, db_path, monkeypatch):
+    monkeypatch.setattr(email_outbox, 'MAX_ATTEMPTS', 2)
+    server = make_server(fail_first=5)
+    try:
+        [message_id] = enqueue(conn, 1)
+        worker = make_worker(db_path, server)
+        worker.drain(conn)
+        make_due(conn)
+        worker.drain(conn)
+        worker.session.close()
+    finally:
+        server.stop()
+
+    assert row(conn, message_id)[:2] == ('failed', 2)
+
+
+@pytest.mark.parametrize('configured, expected', [(False, {}), (True, {'pending': 1})])
+def test_signup_enqueues_only_with_smtp(conn, monkeypatch, configured, expected):
+    auth_server = pytest.importorskip('auth_server')
+    monkeypatch.setattr(auth_server, 'SMTP_USER', 'test' if configured else '')
+    monkeypatch.setattr(auth_server, 'SMTP_PASSWORD', 'test' if configured else '')
+    auth_server._create_schema(conn)
+    auth_server.create_user(conn, 'new@example.org', 'hash', 'token', '2030-01-01')
+    assert count_by_status(conn) == expected
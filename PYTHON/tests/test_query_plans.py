@@ -0,0 +1,220 @@
+"""
+Plans d'exécution des requêtes réellement émises (constantes SQL des modules)
+
+Chaque requête passe par EXPLAIN QUERY PLAN sur une base au dernier schéma :
+- aucun SCAN, sauf ceux déclarés pour la requête (ligne de plan exacte : un parcours
+  complet n'est accepté que là où le résultat est toute la table), le parcours des
+  ensembles d'entrée temporaires et la recherche MATCH d'une table FTS5 ;
+- aucun TEMP B-TREE, sauf tri d'un résultat agrégé ou classé par bm25 (sort_ok).
+
+Hors périmètre : DDL, migrations et PRAGMA.
+
+Usage:
+    python -m pytest PYTHON/tests
+"""
+
+import re
+import sqlite3
+
+import pytest
+
+import archive_expired
+import job_store
+import jobs_db
+import publish
+import unified_store
+from benchmark_range_db import TYPICAL_QUERIES
+from range_db import FTS_SCHEMA, INSERT_DETAIL_SQL, INSERT_LIST_SQL, RangeDbBuilder
+from range_db import FILL_FTS_SQL as RANGE_FILL_FTS_SQL
+
+# Ensembles d'entrée chargés par l'appelant : leur parcours complet est le travail demandé
+INPUT_TABLES = {'current_urls', 'expired_urls', 'to_archive'}
+
+SCAN = re.compile(r'^SCAN (?:\w+\.)?(\w+)(?: (.*))?$')
+
+
+def nulls(sql: str) -> tuple:
+    return (None,) * sql.count('?')
+
+
+@pytest.fixture(scope='module')
+def scraper_db(tmp_path_factory):
+    """Base de scraper au dernier schéma, archive et base unique attachées, tables d'entrée créées"""
+    unified_path = tmp_path_factory.mktemp('unified') / 'jobs_all_sources.db'
+    unified_store.connect(unified_path).close()
+    conn = sqlite3.connect(':memory:')
+    job_store.migrate_schema(conn)
+    job_store.load_temp_urls(conn, [])
+    job_store.load_temp_urls(conn, [], 'expired_urls')
+    conn.create_function('zcompress', 1, archive_expired.zcompress)
+    conn.execute("ATTACH DATABASE ':memory:' AS archive")
+    archive_expired.init_archive(conn)
+    conn.execute("ATTACH DATABASE ? AS unified", (str(unified_path),))
+    conn.execute("CREATE TEMP TABLE to_archive (job_url TEXT PRIMARY KEY)")
+    yield conn
+    conn.close()
+
+
+@pytest.fixture(scope='module')
+def unified_db(scraper_db):
+    """Base unique, avec une base de scraper attachée comme src"""
+    conn = sqlite3.connect(':memory:')
+    conn.executescript(unified_store.UNIFIED_SCHEMA)
+    conn.execute("ATTACH DATABASE ':memory:' AS src")
+    columns = ', '.join(f'{row[1]} {row[2]}' for row in scraper_db.execute("PRAGMA table_info(jobs)"))
+    conn.execute(f"CREATE TABLE src.jobs ({columns})")
+    yield conn
+    conn.close()
+
+
+@pytest.fixture(scope='module')
+def search_db():
+    conn = sqlite3.connect(':memory:')
+    conn.executescript(jobs_db.SCHEMA)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture(scope='module')
+def range_db(tmp_path_factory):
+    """Base lecture seule, index de facettes et FTS compris (comme publiée)"""
+    path = tmp_path_factory.mktemp('range') / 'jobs_live.sqlite3'
+    RangeDbBuilder(path).finish()
+    conn = sqlite3.connect(path)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture(scope='module')
+def range_build_db(tmp_path_factory):
+    """Base lecture seule en cours de construction (avant finish)"""
+    builder = RangeDbBuilder(tmp_path_factory.mktemp('range_build') / 'jobs_live.sqlite3')
+    builder.conn.execute(FTS_SCHEMA)
+    yield builder.conn
+    builder.conn.close()
+
+
+SEARCH_FIELDS = [c for c in jobs_db.JOB_COLUMNS if c not in ('job_description', 'company_description')]
+CURSOR = jobs_db._encode_cursor(['2025-01-01', 1])
+RANGE_QUERIES = {label: (sql, params) for label, sql, params in TYPICAL_QUERIES}
+
+
+def search(query=None, filters=None, cursor=None):
+    return jobs_db.search_sql(query, filters, 20, cursor, SEARCH_FIELDS)
+
+
+# (libellé, base, requête, paramètres, SCAN autorisés, tri temporaire autorisé)
+QUERIES = [
+    # job_store / JobDatabase des scrapers
+    ('valid_urls', 'scraper_db', job_store.VALID_URLS_SQL, (),
+     {'SCAN jobs USING COVERING INDEX idx_jobs_status_valid'}, False),
+    ('live_urls', 'scraper_db', job_store.LIVE_URLS_SQL, (), set(), False),
+    ('upsert_job', 'scraper_db', job_store.UPSERT_JOB_SQL, nulls(job_store.UPSERT_JOB_SQL), set(), False),
+    ('export_valid', 'scraper_db', job_store.EXPORT_VALID_SQL, (),
+     {'SCAN jobs USING INDEX idx_jobs_valid_last_updated'}, False),
+    ('read_versioned', 'scraper_db', job_store.READ_VERSIONED_SQL, ('u',), set(), False),
+    ('touch', 'scraper_db', job_store.TOUCH_SQL, ('u',), set(), False),
+    ('insert_version', 'scraper_db', job_store.INSERT_VERSION_SQL,
+     nulls(job_store.INSERT_VERSION_SQL), set(), False),
+    ('record_status_change expire', 'scraper_db',
+     job_store.RECORD_STATUS_CHANGE_SQL.format(where=job_store.EXPIRE_URLS_WHERE), (), set(), False),
+    ('record_status_change reconcile', 'scraper_db',
+     job_store.RECORD_STATUS_CHANGE_SQL.format(where=job_store.RECONCILE_EXPIRE_WHERE), (), set(), False),
+    ('expire urls', 'scraper_db', job_store.EXPIRE_SQL.format(where=job_store.EXPIRE_URLS_WHERE), (), set(), False),
+    ('expire reconcile', 'scraper_db',
+     job_store.EXPIRE_SQL.format(where=job_store.RECONCILE_EXPIRE_WHERE), (), set(), False),
+    ('new_urls', 'scraper_db', job_store.NEW_URLS_SQL, (), set(), False),
+    ('load_temp_urls', 'scraper_db', job_store.LOAD_TEMP_URLS_SQL.format(table='current_urls'), ('u',), set(), False),
+    ('history', 'scraper_db', job_store.HISTORY_SQL, ('u',), set(), False),
+    ('as_of row', 'scraper_db', job_store.AS_OF_ROW_SQL, ('u',), set(), False),
+    ('as_of patches', 'scraper_db', job_store.AS_OF_PATCHES_SQL, ('u', '2025-01-01'), set(), False),
+    ('count_by_status', 'scraper_db', job_store.COUNT_BY_STATUS_SQL, (),
+     {'SCAN jobs USING COVERING INDEX idx_jobs_status_valid'}, False),
+    ('publish merged', 'scraper_db', publish.merged_query(['main']), ('src',),
+     {'SCAN main.jobs USING INDEX idx_jobs_valid_last_updated'}, False),
+
+    # archive_expired
+    ('archive select', 'scraper_db', archive_expired.SELECT_TO_ARCHIVE_SQL, ('-90 days',), set(), False),
+    ('archive copy jobs', 'scraper_db', archive_expired.COPY_JOBS_SQL, ('s',), set(), False),
+    ('archive copy versions', 'scraper_db', archive_expired.COPY_VERSIONS_SQL, ('s',), set(), False),
+    ('archive delete versions', 'scraper_db', archive_expired.DELETE_VERSIONS_SQL, (), set(), False),
+    ('archive delete jobs', 'scraper_db', archive_expired.DELETE_JOBS_SQL, (), set(), False),
+    ('archive delete unified', 'scraper_db', archive_expired.DELETE_UNIFIED_SQL, ('s',), set(), False),
+
+    # unified_store
+    ('unified sync', 'unified_db', unified_store.SYNC_SOURCE_SQL, ('s',), {'SCAN src.jobs'}, False),
+    ('unified iter', 'unified_db', unified_store.ITER_JOBS_SQL, (),
+     {'SCAN jobs USING INDEX idx_jobs_valid_last_updated'}, False),
+    ('unified stats', 'unified_db', unified_store.STATS_BY_SOURCE_SQL, (),
+     {'SCAN jobs USING COVERING INDEX idx_jobs_source_status'}, False),
+    ('unified duplicates', 'unified_db', unified_store.DUPLICATES_SQL, (),
+     {'SCAN jobs USING INDEX idx_jobs_dedup'}, True),
+
+    # jobs.db : construction et JobSearch
+    ('jobs_db insert', 'search_db', jobs_db.INSERT_JOB_SQL, nulls(jobs_db.INSERT_JOB_SQL), set(), False),
+    ('jobs_db fill fts', 'search_db', jobs_db.FILL_FTS_SQL, (), {'SCAN jobs'}, False),
+    ('search all', 'search_db', *search(), {'SCAN j USING INDEX idx_jobs_last_updated'}, False),
+    ('search all cursor', 'search_db', *search(cursor=CURSOR), set(), False),
+    ('search status', 'search_db', *search(filters={'status': 'Live'}), set(), False),
+    ('search status cursor', 'search_db', *search(filters={'status': 'Live'}, cursor=CURSOR), set(), False),
+    ('search company+contract cursor', 'search_db',
+     *search(filters={'company_name': 'Deloitte', 'contract_type': 'CDI'}, cursor=CURSOR), set(), False),
+    ('search location', 'search_db', *search(filters={'location': 'Paris'}), set(), False),
+    ('search text', 'search_db', *search('analyste crédit'), set(), True),
+    ('search text status cursor', 'search_db',
+     *search('analyste', {'status': 'Live'}, jobs_db._encode_cursor([-1.5, 3])), set(), True),
+
+    # base lecture seule : construction et requêtes du site
+    ('range insert list', 'range_build_db', INSERT_LIST_SQL, nulls(INSERT_LIST_SQL), set(), False),
+    ('range insert detail', 'range_build_db', INSERT_DETAIL_SQL, nulls(INSERT_DETAIL_SQL), set(), False),
+    ('range fill fts', 'range_build_db', RANGE_FILL_FTS_SQL, (), {'SCAN j'}, False),
+    *[(f'range {label}', 'range_db', sql, params, allowed, sort_ok)
+      for label, (sql, params), allowed, sort_ok in [
+          ("Première page (50 offres récentes)", RANGE_QUERIES["Première page (50 offres récentes)"],
+           {'SCAN jobs'}, False),
+          ("Filtre contrat = CDI", RANGE_QUERIES["Filtre contrat = CDI"], set(), False),
+          ("Filtre entreprise + contrat", RANGE_QUERIES["Filtre entreprise + contrat"], set(), False),
+          ("Comptage facette contrat", RANGE_QUERIES["Comptage facette contrat"],
+           {'SCAN jobs USING COVERING INDEX idx_jobs_contract_type'}, False),
+          ("Comptage facette localisation", RANGE_QUERIES["Comptage facette localisation"],
+           {'SCAN jobs USING COVERING INDEX idx_jobs_location'}, False),
+          ("Recherche plein texte 'analyste'", RANGE_QUERIES["Recherche plein texte 'analyste'"], set(), True),
+          ("Fiche détail d'une offre", RANGE_QUERIES["Fiche détail d'une offre"], set(), False),
+      ]],
+]
+
+
+def plan_problems(details, allowed_scans, sort_ok):
+    problems = []
+    for detail in details:
+        match = SCAN.match(detail)
+        if match and detail not in allowed_scans:
+            table, rest = match.group(1), match.group(2) or ''
+            is_input = table in INPUT_TABLES and not rest
+            is_fts_match = rest.startswith('VIRTUAL TABLE INDEX') and ':M' in rest
+            if not (is_input or is_fts_match):
+                problems.append(f"parcours non déclaré : {detail}")
+        if 'TEMP B-TREE' in detail and not sort_ok:
+            problems.append(f"tri temporaire : {detail}")
+    return problems
+
+
+@pytest.mark.parametrize('label, db, sql, params, allowed_scans, sort_ok', QUERIES,
+                         ids=[q[0] for q in QUERIES])
+def test_query_plan(request, label, db, sql, params, allowed_scans, sort_ok):
+    conn = request.getfixturevalue(db)
+    details = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+    assert not plan_problems(details, allowed_scans, sort_ok), '\n'.join(details)
+    # Les parcours déclarés doivent rester réels : sinon la déclaration est périmée
+    assert allowed_scans <= set(details), '\n'.join(details)
+
+
+@pytest.mark.parametrize('detail', [
+    'SCAN jobs',
+    'SCAN c',
+    'SCAN jobs USING COVERING INDEX idx_jobs_status_valid',
+    'SCAN jobs USING INDEX idx_jobs_valid_last_updated',
+    'USE TEMP B-TREE FOR ORDER BY',
+])
+def test_undeclared_scans_are_reported(detail):
+    assert plan_problems([detail], set(), False)
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Base unique multi-sources (optionnelle) : jobs_all_sources.db
+- Même schéma que les bases des scrapers, plus une colonne source
+- Clé composite (source, job_url)
+- Miroir en lecture : seul import y écrit (synchronisation à sens unique), les lignes
+  n'en sortent que par archive_expired.py ; mode WAL pour que les lecteurs ne soient
+  pas bloqués pendant la synchronisation
+
+Les trois bases par scraper restent la source de vérité ; elles sont synchronisées
+ici par un upsert SQL incrémental (seules les lignes modifiées sont réécrites).
+Dès que ce fichier existe, publish.py et fix_data_issues.py l'utilisent : fusion,
+export, doublons et statistiques deviennent des requêtes uniques et indexées.
+
+Usage:
+    python unified_store.py import    # crée / met à jour la base depuis les trois fichiers
+    python unified_store.py stats     # répartition par source et statut
+    python unified_store.py dedup     # offres publiées sous plusieurs URLs
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+from job_store import migrate_sources
+from publish import JOB_COLUMNS, SOURCES
+
+PYTHON_DIR = Path(__file__).parent
+UNIFIED_DB = PYTHON_DIR / "jobs_all_sources.db"
+
+# Colonnes copiées depuis les bases des scrapers (hors job_url, partie de la clé)
+SYNC_COLUMNS = [
+    'job_id', 'job_title', 'contract_type', 'publication_date', 'location',
+    'job_family', 'duration', 'management_position', 'status',
+    'education_level', 'experience_level', 'training_specialization',
+    'technical_skills', 'behavioral_skills', 'tools', 'languages',
+    'job_description', 'company_name', 'company_description',
+    'first_seen', 'last_updated', 'scrape_attempts', 'is_valid', 'content_hash', 'last_seen',
+]
+
+# Une ligne n'est réécrite que si l'une de ces colonnes a changé dans la source
+CHANGE_COLUMNS = ['content_hash', 'last_updated', 'last_seen', 'location', 'education_level']
+
+UNIFIED_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        source TEXT NOT NULL,
+        job_url TEXT NOT NULL,
+        job_id TEXT,
+        job_title TEXT,
+        contract_type TEXT,
+        publication_date TEXT,
+        location TEXT,
+        job_family TEXT,
+        duration TEXT,
+        management_position TEXT,
+        status TEXT DEFAULT 'Live',
+        education_level TEXT,
+        experience_level TEXT,
+        training_specialization TEXT,
+        technical_skills TEXT,
+        behavioral_skills TEXT,
+        tools TEXT,
+        languages TEXT,
+        job_description TEXT,
+        company_name TEXT,
+        company_description TEXT,
+        first_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        scrape_attempts INTEGER DEFAULT 0,
+        is_valid INTEGER DEFAULT 1,
+        content_hash TEXT,
+        last_seen TIMESTAMP,
+        PRIMARY KEY (source, job_url)
+    );
+    -- Fusion / export triés par récence
+    CREATE INDEX IF NOT EXISTS idx_jobs_valid_last_updated ON jobs(last_updated) WHERE is_valid = 1;
+    -- Statistiques par source et statut (index couvrant)
+    CREATE INDEX IF NOT EXISTS idx_jobs_source_status ON jobs(source, status, is_valid);
+    -- Doublons inter-sources (même intitulé, entreprise et lieu)
+    CREATE INDEX IF NOT EXISTS idx_jobs_dedup ON jobs(company_name, job_title, location) WHERE is_valid = 1;
+"""
+
+
+# Requêtes exécutées telles quelles (plans vérifiés par tests/test_query_plans.py)
+SYNC_SOURCE_SQL = f"""
+    INSERT INTO jobs (source, job_url, {', '.join(SYNC_COLUMNS)})
+    SELECT ?, job_url, {', '.join(SYNC_COLUMNS)} FROM src.jobs WHERE true
+    ON CONFLICT (source, job_url) DO UPDATE SET
+        {', '.join(f'{c} = excluded.{c}' for c in SYNC_COLUMNS)}
+    WHERE {' OR '.join(f'jobs.{c} IS NOT excluded.{c}' for c in CHANGE_COLUMNS)}
+"""
+
+ITER_JOBS_SQL = f"""
+    SELECT source, {', '.join(JOB_COLUMNS)} FROM jobs
+    WHERE is_valid = 1
+    ORDER BY last_updated DESC
+"""
+
+STATS_BY_SOURCE_SQL = """
+    SELECT source, status, COUNT(*) FROM jobs
+    WHERE is_valid = 1
+    GROUP BY source, status
+    ORDER BY source, status
+"""
+
+DUPLICATES_SQL = """
+    SELECT company_name, job_title, location, COUNT(*) AS n
+    FROM jobs
+    WHERE is_valid = 1
+    GROUP BY company_name, job_title, location
+    HAVING n > 1
+    ORDER BY n DESC
+"""
+
+
+def connect(db_path: Path = UNIFIED_DB) -> sqlite3.Connection:
+    """Ouvre la base unique en mode WAL (créée si absente)"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.executescript(UNIFIED_SCHEMA)
+    return conn
+
+
+def sync_source(conn: sqlite3.Connection, source: str, db_path: Path) -> int:
+    """
+    Copie les offres nouvelles ou modifiées d'une base de scraper
+    (lue sans la modifier : elle doit être au dernier schéma, voir migrate_sources)
+
+    Returns:
+        Nombre de lignes insérées ou mises à jour
+    """
+    conn.execute("ATTACH DATABASE ? AS src", (str(db_path),))
+    try:
+        with conn:
+            before = conn.total_changes
+            conn.execute(SYNC_SOURCE_SQL, (source,))
+            changed = conn.total_changes - before
+    finally:
+        conn.execute("DETACH DATABASE src")
+    return changed
+
+
+def import_sources(db_path: Path = UNIFIED_DB, sources=SOURCES, verbose: bool = True) -> Dict[str, int]:
+    """Crée ou met à jour la base unique à partir des bases des scrapers"""
+    conn = connect(db_path)
+    result = {}
+    try:
+        for name, source_path in sources:
+            if not source_path.exists():
+                if verbose:
+                    print(f"⚠️ Base de données manquante : {source_path}")
+                continue
+            result[name] = sync_source(conn, name, source_path)
+            if verbose:
+                print(f"   ✅ {name} : {result[name]} offres nouvelles ou modifiées")
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    return result
+
+
+def iter_jobs(db_path: Path = UNIFIED_DB) -> Iterator[Dict]:
+    """Offres valides de toutes les sources (avec leur source), triées par last_updated décroissant (index partiel)"""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        for row in conn.execute(ITER_JOBS_SQL):
+            yield dict(row)
+    finally:
+        conn.close()
+
+
+def stats_by_source(conn: sqlite3.Connection) -> List[tuple]:
+    """(source, statut, nombre) en une requête sur l'index couvrant"""
+    return conn.execute(STATS_BY_SOURCE_SQL).fetchall()
+
+
+def find_duplicates(conn: sqlite3.Connection) -> List[tuple]:
+    """Offres valides partageant entreprise, intitulé et lieu sous plusieurs URLs"""
+    return conn.execute(DUPLICATES_SQL).fetchall()
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command == 'import':
+        print(f"🔄 Synchronisation des bases des scrapers vers {UNIFIED_DB.name}...")
+        migrate_sources(SOURCES)
+        import_sources()
+    elif command in ('stats', 'dedup') and UNIFIED_DB.exists():
+        conn = connect()
+        if command == 'stats':
+            print("📊 Répartition par source et statut:")
+            for source, status, count in stats_by_source(conn):
+                print(f"   - {source} / {status}: {count} offres")
+        else:
+            duplicates = find_duplicates(conn)
+            print(f"🔁 {len(duplicates)} offres publiées sous plusieurs URLs")
+            for company, title, location, count in duplicates[:20]:
+                print(f"   - {company} | {title} | {location} : {count} URLs")
+        conn.close()
+    else:
+        print(__doc__)
+        sys.exit(1)
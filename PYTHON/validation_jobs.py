@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+File de travaux pour les tests de connexion bancaire (validation d'identifiants)
+- submit() enregistre le test et rend immédiatement un job_id : le worker HTTP
+  n'est plus occupé pendant les 30 s de session navigateur
+- Les tests tournent sur un pool borné de threads (max_workers) ; au-delà de
+  max_queue tests en attente, submit() lève QueueFull (réponse 503 côté API)
+- Résultat par interrogation (get) ou flux Server-Sent Events (sse_events)
+- metrics() : profondeur de file, tests en cours, temps d'attente et d'exécution
+
+Module partagé par auth_server.py et taleos-backend/app.py (copié dans l'image
+Docker avec phase_timer.py, dont il reprend percentiles(), importé depuis PYTHON/
+sinon). Les identifiants ne sont pas conservés dans le job : seul le résultat
+l'est, pendant result_ttl secondes.
+"""
+
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, Optional
+
+from phase_timer import percentiles
+
+MAX_WORKERS = 2
+MAX_QUEUE = 20
+RESULT_TTL = 600          # secondes de conservation d'un résultat
+SSE_HEARTBEAT = 15        # commentaire SSE périodique (proxies, timeouts)
+TIMINGS_WINDOW = 500      # durées récentes gardées pour les percentiles
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+ERROR = 'error'
+
+
+class QueueFull(Exception):
+    """Trop de tests en attente"""
+
+
+class ValidationJobQueue:
+    """Pool borné exécutant runner(**params) pour chaque test soumis"""
+
+    def __init__(self, runner: Callable[..., Dict], max_workers: int = MAX_WORKERS,
+                 max_queue: int = MAX_QUEUE, result_ttl: int = RESULT_TTL):
+        self.runner = runner
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="validation")
+        self._jobs: Dict[str, Dict] = {}
+        self._changed = threading.Condition()
+        self._wait_times = deque(maxlen=TIMINGS_WINDOW)
+        self._run_times = deque(maxlen=TIMINGS_WINDOW)
+        self._counters = {'submitted': 0, 'completed': 0, 'failed': 0, 'rejected': 0}
+
+    def _depth(self) -> int:
+        return sum(1 for job in self._jobs.values() if job['status'] == QUEUED)
+
+    def _purge(self, now: float):
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job['finished_at'] and now - job['finished_at'] > self.result_ttl]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def submit(self, owner=None, **params) -> str:
+        """Ajoute un test à la file ; retourne son identifiant (owner : utilisateur autorisé à le suivre)"""
+        now = time.time()
+        with self._changed:
+            self._purge(now)
+            if self._depth() >= self.max_queue:
+                self._counters['rejected'] += 1
+                raise QueueFull(f"{self.max_queue} tests déjà en attente")
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                'job_id': job_id,
+                'status': QUEUED,
+                'bank_id': params.get('bank_id'),
+                'owner': owner,
+                'queued_at': now,
+                'started_at': None,
+                'finished_at': None,
+                'result': None,
+            }
+            self._counters['submitted'] += 1
+        self._executor.submit(self._run, job_id, params)
+        return job_id
+
+    def _update(self, job_id: str, **fields):
+        with self._changed:
+            self._jobs[job_id].update(fields)
+            self._changed.notify_all()
+
+    def _run(self, job_id: str, params: Dict):
+        started = time.time()
+        self._update(job_id, status=RUNNING, started_at=started)
+        self._wait_times.append(started - self._jobs[job_id]['queued_at'])
+        try:
+            result = self.runner(**params)
+            status = DONE
+        except Exception as e:
+            result = {'success': False, 'message': f'Erreur lors du test de connexion: {e}', 'error': str(e)}
+            status = ERROR
+        finished = time.time()
+        self._run_times.append(finished - started)
+        with self._changed:
+            self._counters['completed' if status == DONE else 'failed'] += 1
+        self._update(job_id, status=status, finished_at=finished, result=result)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """État courant d'un test (None si inconnu ou expiré)"""
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = dict(job)
+            if job['status'] == QUEUED:
+                snapshot['position'] = sum(
+                    1 for other in self._jobs.values()
+                    if other['status'] == QUEUED and other['queued_at'] <= job['queued_at']
+                )
+            return snapshot
+
+    def wait(self, job_id: str, timeout: float, seen_status: Optional[str] = None) -> Optional[Dict]:
+        """Attend un changement de statut (ou la fin du test) pendant au plus timeout secondes"""
+        deadline = time.time() + timeout
+        with self._changed:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None or job['status'] in (DONE, ERROR) or job['status'] != seen_status:
+                    break
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+        return self.get(job_id)
+
+    def wait_result(self, job_id: str, timeout: float) -> Optional[Dict]:
+        """Attend la fin du test (compatibilité avec les clients synchrones)"""
+        deadline = time.time() + timeout
+        job = self.get(job_id)
+        while job and job['status'] not in (DONE, ERROR) and time.time() < deadline:
+            job = self.wait(job_id, deadline - time.time(), job['status'])
+        return job
+
+    def sse_events(self, job_id: str, heartbeat: float = SSE_HEARTBEAT) -> Iterator[str]:
+        """Flux Server-Sent Events : un événement par changement de statut, jusqu'au résultat"""
+        job = self.get(job_id)
+        status = None
+        while job is not None:
+            if job['status'] != status:
+                status = job['status']
+                yield f"event: {status}\ndata: {json.dumps(public_view(job), ensure_ascii=False)}\n\n"
+                if status in (DONE, ERROR):
+                    return
+            else:
+                yield ": keep-alive\n\n"
+            job = self.wait(job_id, heartbeat, status)
+
+    def metrics(self) -> Dict:
+        with self._changed:
+            running = sum(1 for job in self._jobs.values() if job['status'] == RUNNING)
+            depth = self._depth()
+            counters = dict(self._counters)
+        return {
+            'queue_depth': depth,
+            'running': running,
+            'max_workers': self.max_workers,
+            'max_queue': self.max_queue,
+            **counters,
+            'wait_time_seconds': percentiles(list(self._wait_times)),
+            'run_time_seconds': percentiles(list(self._run_times)),
+        }
+
+
+def public_view(job: Dict) -> Dict:
+    """Représentation JSON d'un test pour les endpoints de suivi"""
+    view = {
+        'job_id': job['job_id'],
+        'status': job['status'],
+        'bank_id': job['bank_id'],
+        'queued_at': job['queued_at'],
+        'started_at': job['started_at'],
+        'finished_at': job['finished_at'],
+    }
+    if 'position' in job:
+        view['position'] = job['position']
+    if job['started_at']:
+        view['wait_seconds'] = round(job['started_at'] - job['queued_at'], 3)
+    if job['finished_at']:
+        view['run_seconds'] = round(job['finished_at'] - job['started_at'], 3)
+        view['result'] = job['result']
+    return view
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Métriques en mémoire de l'API de validation, exposées au format texte Prometheus
+- Histogramme de latence par endpoint (buckets fixes) et p50/p95/p99 estimés
+- Répartition des résultats de validation (success, failure, error, timeout, rejected)
+- Histogramme par étape de validation (details.phases : browser_start, page_load...)
+- Jauges : requêtes HTTP en cours, validations en cours, contextes du moteur de connexion
+- Fenêtre glissante en minutes (anneau de taille fixe) à la place du compteur
+  par heure, qui grossissait pendant toute la vie du processus
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Secondes ; les validations prennent 5 à 30 s, /health quelques ms
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 15, 20, 30, 45, 60)
+QUANTILES = (0.5, 0.95, 0.99)
+OUTCOMES = ('success', 'failure', 'error', 'timeout', 'rejected')
+WINDOW_BUCKET_SECONDS = 60
+WINDOW_BUCKETS = 60       # dernière heure, minute par minute
+
+PREFIX = 'validator'
+
+
+class Histogram:
+    """Histogramme cumulatif à buckets fixes (même sémantique que Prometheus)"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)   # non cumulés ; +Inf = count - sum(counts)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((f"{bound:g}", total))
+        result.append(('+Inf', self.count))
+        return result
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimation par interpolation linéaire dans le bucket (comme histogram_quantile)"""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets, self.counts):
+            if count and seen + count >= rank:
+                return lower + (bound - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+        # Au-delà du dernier bucket : on ne sait pas mieux que la borne
+        return self.buckets[-1]
+
+
+class TimeWindow:
+    """Compteurs par tranche de WINDOW_BUCKET_SECONDS, WINDOW_BUCKETS tranches au plus"""
+
+    def __init__(self, bucket_seconds: int = WINDOW_BUCKET_SECONDS, size: int = WINDOW_BUCKETS):
+        self.bucket_seconds = bucket_seconds
+        self.slots = deque(maxlen=size)   # [début de tranche, requêtes, {résultat: n}]
+
+    def _slot(self, now: float) -> list:
+        start = int(now // self.bucket_seconds) * self.bucket_seconds
+        if not self.slots or self.slots[-1][0] != start:
+            self.slots.append([start, 0, {}])
+        return self.slots[-1]
+
+    def add_request(self, now: float):
+        self._slot(now)[1] += 1
+
+    def add_outcome(self, outcome: str, now: float):
+        outcomes = self._slot(now)[2]
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    def totals(self, now: float, seconds: int) -> Tuple[int, Dict[str, int]]:
+        """Requêtes et résultats des `seconds` dernières secondes"""
+        requests, outcomes = 0, {}
+        for start, count, slot_outcomes in self.slots:
+            if start > now - seconds:
+                requests += count
+                for outcome, n in slot_outcomes.items():
+                    outcomes[outcome] = outcomes.get(outcome, 0) + n
+        return requests, outcomes
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + '}'
+
+
+class Metrics:
+    """Métriques de l'API ; enregistrement depuis la boucle asyncio ou les threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.latency: Dict[str, Histogram] = {}
+        self.responses: Dict[Tuple[str, int], int] = {}
+        self.outcomes = dict.fromkeys(OUTCOMES, 0)
+        self.validation_seconds = Histogram()
+        self.phases: Dict[str, Histogram] = {}
+        self.in_flight = 0
+        self.window = TimeWindow()
+
+    def request_started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def request_finished(self, endpoint: str, status_code: int, duration: float):
+        now = time.time()
+        with self._lock:
+            self.in_flight -= 1
+            self.latency.setdefault(endpoint, Histogram()).observe(duration)
+            key = (endpoint, status_code)
+            self.responses[key] = self.responses.get(key, 0) + 1
+            self.window.add_request(now)
+
+    def record_outcome(self, outcome: str, execution_time: Optional[float] = None):
+        """Résultat d'une validation ; execution_time absent pour les refus immédiats"""
+        now = time.time()
+        with self._lock:
+            self.outcomes[outcome] += 1
+            if execution_time is not None:
+                self.validation_seconds.observe(execution_time)
+            self.window.add_outcome(outcome, now)
+
+    def record_phases(self, phases: Dict[str, float]):
+        """Durées par étape d'une validation (details.phases, voir phase_timer)"""
+        with self._lock:
+            for phase, seconds in phases.items():
+                if phase != 'total':
+                    self.phases.setdefault(phase, Histogram()).observe(seconds)
+
+    def get_stats(self) -> Dict:
+        """Vue JSON (lecture humaine / tableau de bord)"""
+        now = time.time()
+        with self._lock:
+            completed = sum(self.outcomes[o] for o in ('success', 'failure', 'error', 'timeout'))
+            last_5m, outcomes_5m = self.window.totals(now, 300)
+            last_hour, outcomes_hour = self.window.totals(now, 3600)
+            return {
+                'uptime_seconds': round(now - self.started_at, 1),
+                'in_flight': self.in_flight,
+                'outcomes': dict(self.outcomes),
+                'success_rate': round(self.outcomes['success'] / completed * 100, 2) if completed else 0,
+                'validation_seconds': self._summary(self.validation_seconds),
+                'endpoints': {endpoint: self._summary(h) for endpoint, h in sorted(self.latency.items())},
+                'phases': {phase: self._summary(h) for phase, h in self.phases.items()},
+                'last_5_minutes': {'requests': last_5m, 'outcomes': outcomes_5m},
+                'last_hour': {'requests': last_hour, 'outcomes': outcomes_hour},
+            }
+
+    @staticmethod
+    def _summary(histogram: Histogram) -> Dict:
+        summary = {
+            'count': histogram.count,
+            'avg': round(histogram.sum / histogram.count, 3) if histogram.count else 0,
+        }
+        for q in QUANTILES:
+            value = histogram.quantile(q)
+            summary[f'p{int(q * 100)}'] = round(value, 3) if value is not None else None
+        return summary
+
+    def render_prometheus(self, gauges: Iterable[Tuple[str, str, Dict, float]] = ()) -> str:
+        """
+        Format texte Prometheus 0.0.4
+        gauges : jauges supplémentaires (nom, aide, labels, valeur), ex. moteur de connexion
+        """
+        now = time.time()
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+
+        def histogram(name, h, **labels):
+            for bound, count in h.cumulative():
+                lines.append(f"{PREFIX}_{name}_bucket{_labels(**labels, le=bound)} {count}")
+            lines.append(f"{PREFIX}_{name}_sum{_labels(**labels)} {h.sum:.6f}")
+            lines.append(f"{PREFIX}_{name}_count{_labels(**labels)} {h.count}")
+
+        with self._lock:
+            family('http_request_duration_seconds', 'histogram', 'Durée des requêtes HTTP par endpoint')
+            for endpoint, h in sorted(self.latency.items()):
+                histogram('http_request_duration_seconds', h, endpoint=endpoint)
+
+            family('http_request_duration_quantile_seconds', 'gauge',
+                   'p50/p95/p99 estimés depuis l\'histogramme, depuis le démarrage')
+            for endpoint, h in sorted(self.latency.items()):
+                for q in QUANTILES:
+                    value = h.quantile(q)
+                    if value is not None:
+                        lines.append(f"{PREFIX}_http_request_duration_quantile_seconds"
+                                     f"{_labels(endpoint=endpoint, quantile=q)} {value:.6f}")
+
+            family('http_responses_total', 'counter', 'Réponses HTTP par endpoint et code')
+            for (endpoint, code), count in sorted(self.responses.items()):
+                lines.append(f"{PREFIX}_http_responses_total{_labels(endpoint=endpoint, code=code)} {count}")
+
+            family('http_requests_in_flight', 'gauge', 'Requêtes HTTP en cours')
+            lines.append(f"{PREFIX}_http_requests_in_flight {self.in_flight}")
+
+            family('validations_total', 'counter', 'Validations par résultat')
+            for outcome, count in self.outcomes.items():
+                lines.append(f"{PREFIX}_validations_total{_labels(outcome=outcome)} {count}")
+
+            family('validation_duration_seconds', 'histogram', 'Durée des validations abouties ou expirées')
+            histogram('validation_duration_seconds', self.validation_seconds)
+
+            family('validation_phase_duration_seconds', 'histogram', 'Durée de chaque étape de validation')
+            for phase, h in self.phases.items():
+                histogram('validation_phase_duration_seconds', h, phase=phase)
+
+            family('validation_phase_quantile_seconds', 'gauge', 'p50/p95/p99 estimés par étape de validation')
+            for phase, h in self.phases.items():
+                for q in QUANTILES:
+                    value = h.quantile(q)
+                    if value is not None:
+                        lines.append(f"{PREFIX}_validation_phase_quantile_seconds"
+                                     f"{_labels(phase=phase, quantile=q)} {value:.6f}")
+
+            windows = [(window, *self.window.totals(now, seconds)) for window, seconds in (('5m', 300), ('1h', 3600))]
+            family('window_requests', 'gauge', 'Requêtes HTTP sur la fenêtre glissante')
+            for window, requests, _ in windows:
+                lines.append(f"{PREFIX}_window_requests{_labels(window=window)} {requests}")
+            family('window_validations', 'gauge', 'Validations par résultat sur la fenêtre glissante')
+            for window, _, outcomes in windows:
+                for outcome in OUTCOMES:
+                    lines.append(f"{PREFIX}_window_validations"
+                                 f"{_labels(window=window, outcome=outcome)} {outcomes.get(outcome, 0)}")
+
+        declared = set()
+        for name, help_text, labels, value in gauges:
+            if name not in declared:
+                family(name, 'gauge', help_text)
+                declared.add(name)
+            lines.append(f"{PREFIX}_{name}{_labels(**labels)} {value}")
+
+        family('uptime_seconds', 'gauge', 'Secondes depuis le démarrage')
+        lines.append(f"{PREFIX}_uptime_seconds {now - self.started_at:.1f}")
+        return '\n'.join(lines) + '\n'
@@ -5,27 +5,40 @@ Avec sécurité (API Key), rate limiting, CORS, monitoring
 """
 
 import os
+import sys
+import asyncio
 import logging
 import time
 from datetime import datetime
 from typing import Optional
-from collections import defaultdict
 
 from fastapi import FastAPI, HTTPException, Depends, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel, EmailStr, Field
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
-from selenium_validator import CreditAgricoleValidator
+from api_metrics import Metrics
+
+try:
+    from login_engine import POOL_SIZE, get_engine, is_implemented
+except ImportError:
+    # Moteur de connexion partagé dans PYTHON/
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'PYTHON'))
+    from login_engine import POOL_SIZE, get_engine, is_implemented
 
 # Configuration
 API_KEY = os.getenv('API_KEY', 'votre-cle-api-securisee-changez-moi')  # À configurer dans .env
 ALLOWED_ORIGINS = os.getenv('ALLOWED_ORIGINS', '*').split(',')  # Frontend URLs
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 
+# Validations simultanées (au-delà : 503 immédiat) et durée maximale d'une requête
+MAX_CONCURRENT_VALIDATIONS = int(os.getenv('MAX_CONCURRENT_VALIDATIONS', str(POOL_SIZE)))
+VALIDATION_TIMEOUT = float(os.getenv('VALIDATION_TIMEOUT', '45'))
+RETRY_AFTER_SECONDS = int(os.getenv('RETRY_AFTER_SECONDS', '15'))
+
 # Logging structuré
 logging.basicConfig(
     level=getattr(logging, LOG_LEVEL),
@@ -62,42 +75,37 @@ app.add_middleware(
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
-# Metrics simples en mémoire (pour monitoring)
-class Metrics:
-    def __init__(self):
-        self.total_requests = 0
-        self.successful_validations = 0
-        self.failed_validations = 0
-        self.errors = 0
-        self.total_execution_time = 0.0
-        self.requests_by_hour = defaultdict(int)
+# Métriques en mémoire (histogrammes, résultats, jauges) exposées sur /metrics
+metrics = Metrics()
+
+# Moteur partagé (PYTHON/login_engine.py) : Chromium et contextes préparés d'avance,
+# sur sa propre boucle asyncio ; la boucle de l'API reste libre pour /health
+login_engine = get_engine(pool_size=MAX_CONCURRENT_VALIDATIONS)
+running_validations = 0  # modifié uniquement depuis la boucle asyncio
+
+
+async def run_validation(bank_id: str, email: str, password: str) -> dict:
+    """
+    Soumet le test au moteur de connexion et attend son résultat
+    Raises:
+        OverflowError: toutes les places sont occupées
+        asyncio.TimeoutError: pas de résultat en VALIDATION_TIMEOUT secondes
+    """
+    global running_validations
+    if running_validations >= MAX_CONCURRENT_VALIDATIONS:
+        raise OverflowError("Toutes les validations sont occupées")
     
-    def record_request(self, success: bool, execution_time: float, error: bool = False):
-        self.total_requests += 1
-        hour = datetime.now().strftime('%Y-%m-%d %H:00')
-        self.requests_by_hour[hour] += 1
-        
-        if error:
-            self.errors += 1
-        elif success:
-            self.successful_validations += 1
-        else:
-            self.failed_validations += 1
-        
-        self.total_execution_time += execution_time
+    # Moteur démarré par start_login_engine : submit ne doit pas le lancer depuis la boucle
+    future = asyncio.wrap_future(login_engine.submit(bank_id, email, password, start=False))
+    running_validations += 1
     
-    def get_stats(self):
-        avg_time = self.total_execution_time / self.total_requests if self.total_requests > 0 else 0
-        return {
-            'total_requests': self.total_requests,
-            'successful_validations': self.successful_validations,
-            'failed_validations': self.failed_validations,
-            'errors': self.errors,
-            'average_execution_time': round(avg_time, 2),
-            'success_rate': round(self.successful_validations / self.total_requests * 100, 2) if self.total_requests > 0 else 0
-        }
-
-metrics = Metrics()
+    def release(_):
+        global running_validations
+        running_validations -= 1
+    
+    # La place est rendue quand le moteur a fini, même si la requête a expiré avant
+    future.add_done_callback(release)
+    return await asyncio.wait_for(asyncio.shield(future), timeout=VALIDATION_TIMEOUT)
 
 # Modèles Pydantic
 class BankConnectionRequest(BaseModel):
@@ -121,8 +129,11 @@ class BankConnectionResponse(BaseModel):
 
 # Dépendance pour vérifier l'API Key
 async def verify_api_key(request: Request):
-    """Vérifie que l'API Key est présente et valide"""
+    """Vérifie que l'API Key est présente et valide (X-API-Key, ou Authorization: Bearer pour Prometheus)"""
     api_key = request.headers.get('X-API-Key')
+    authorization = request.headers.get('Authorization', '')
+    if not api_key and authorization.startswith('Bearer '):
+        api_key = authorization[len('Bearer '):]
     
     if not api_key:
         logger.warning(f"Requête sans API Key depuis {request.client.host}")
@@ -140,6 +151,48 @@ async def verify_api_key(request: Request):
     
     return api_key
 
+@app.on_event("startup")
+async def start_login_engine():
+    """Lance Chromium et prépare les contextes avant les premières requêtes"""
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, login_engine.start)
+    logger.info(f"Moteur de connexion: {login_engine.stats()}")
+
+@app.on_event("shutdown")
+async def stop_login_engine():
+    await asyncio.get_running_loop().run_in_executor(None, login_engine.close)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Latence et code de réponse par endpoint (chemin de la route, pas l'URL brute)"""
+    start_time = time.perf_counter()
+    metrics.request_started()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        route = request.scope.get('route')
+        endpoint = getattr(route, 'path', None) or 'unmatched'
+        metrics.request_finished(endpoint, status_code, time.perf_counter() - start_time)
+
+def runtime_gauges():
+    """Jauges instantanées : validations en cours et moteur de connexion"""
+    engine = login_engine.stats()
+    return [
+        ('validations_running', 'Validations en cours', {}, running_validations),
+        ('validations_max', 'Validations simultanées autorisées', {}, MAX_CONCURRENT_VALIDATIONS),
+        ('engine_contexts', 'Contextes navigateur du moteur par état', {'state': 'idle'}, engine['idle']),
+        ('engine_contexts', 'Contextes navigateur du moteur par état', {'state': 'in_use'}, engine['in_use']),
+        ('engine_pool_size', 'Contextes préparés visés', {}, engine['pool_size']),
+        ('engine_browser_connected', 'Chromium lancé et connecté', {}, int(engine['browser_connected'])),
+        ('engine_events', 'Événements du moteur depuis le démarrage', {'event': 'launches'}, engine['launches']),
+        ('engine_events', 'Événements du moteur depuis le démarrage', {'event': 'contexts'}, engine['contexts']),
+        ('engine_events', 'Événements du moteur depuis le démarrage', {'event': 'blocked_requests'}, engine['blocked_requests']),
+        ('engine_events', 'Événements du moteur depuis le démarrage', {'event': 'blocked_by_domain'}, engine['blocked_by_domain']),
+    ]
+
 # Routes
 @app.get("/")
 async def root():
@@ -160,9 +213,22 @@ async def health_check():
     }
 
 @app.get("/metrics", dependencies=[Depends(verify_api_key)])
-async def get_metrics():
-    """Récupère les métriques de l'API (protégé par API Key)"""
-    return metrics.get_stats()
+async def get_metrics(format: str = 'prometheus'):
+    """
+    Métriques de l'API (protégé par API Key)
+    Format texte Prometheus par défaut ; ?format=json pour la vue JSON
+    """
+    if format == 'json':
+        return {
+            **metrics.get_stats(),
+            'validations_running': running_validations,
+            'max_concurrent_validations': MAX_CONCURRENT_VALIDATIONS,
+            'login_engine': login_engine.stats()
+        }
+    return PlainTextResponse(
+        metrics.render_prometheus(runtime_gauges()),
+        media_type='text/plain; version=0.0.4; charset=utf-8'
+    )
 
 @app.post("/test-bank-connection", response_model=BankConnectionResponse, dependencies=[Depends(verify_api_key)])
 @limiter.limit("10/minute")  # Max 10 requêtes par minute par IP
@@ -193,7 +259,7 @@ async def test_bank_connection(request: Request, data: BankConnectionRequest):
     logger.info(f"Test connexion demandé pour {data.bank_id} - {data.email} depuis {client_ip}")
     
     # Vérifier que la banque est supportée
-    if data.bank_id != 'credit_agricole':
+    if not is_implemented(data.bank_id):
         logger.warning(f"Banque non supportée: {data.bank_id}")
         return BankConnectionResponse(
             success=False,
@@ -202,19 +268,41 @@ async def test_bank_connection(request: Request, data: BankConnectionRequest):
         )
     
     try:
-        # Initialiser le validateur
-        validator = CreditAgricoleValidator(headless=True)
-        
-        # Valider les identifiants
-        result = validator.validate(data.email, data.password)
+        # Valider les identifiants (thread du pool, sans bloquer la boucle)
+        try:
+            result = await run_validation(data.bank_id, data.email, data.password)
+        except OverflowError:
+            metrics.record_outcome('rejected')
+            logger.warning(f"Validation refusée pour {data.email}: {MAX_CONCURRENT_VALIDATIONS} déjà en cours")
+            return JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': str(RETRY_AFTER_SECONDS)},
+                content={
+                    'success': False,
+                    'message': 'Trop de validations en cours, réessayez dans quelques instants.',
+                    'details': {'bank_id': data.bank_id, 'retry_after': RETRY_AFTER_SECONDS}
+                }
+            )
+        except asyncio.TimeoutError:
+            execution_time = time.time() - start_time
+            metrics.record_outcome('timeout', execution_time)
+            logger.error(f"Timeout de validation pour {data.email} ({data.bank_id}) après {execution_time:.2f}s")
+            return JSONResponse(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                content={
+                    'success': False,
+                    'message': 'Timeout: le site met trop de temps à répondre',
+                    'details': {'bank_id': data.bank_id, 'execution_time': round(execution_time, 2)}
+                }
+            )
         
         execution_time = time.time() - start_time
         
         # Enregistrer les métriques
-        metrics.record_request(
-            success=result.get('success', False),
-            execution_time=execution_time
-        )
+        metrics.record_outcome('success' if result.get('success', False) else 'failure', execution_time)
+        phases = (result.get('details') or {}).get('phases')
+        if phases:
+            metrics.record_phases(phases)
         
         # Logger le résultat
         status_log = "SUCCÈS" if result.get('success', False) else "ÉCHEC"
@@ -230,6 +318,9 @@ async def test_bank_connection(request: Request, data: BankConnectionRequest):
         if 'details' in result and isinstance(result['details'], dict):
             if 'url' in result['details']:
                 response_details['url'] = result['details']['url']
+            # Durée de chaque étape (browser_start, page_load, cookie_banner...)
+            if 'phases' in result['details']:
+                response_details['phases'] = result['details']['phases']
         
         # Retourner la réponse au format attendu par le frontend
         return BankConnectionResponse(
@@ -242,7 +333,7 @@ async def test_bank_connection(request: Request, data: BankConnectionRequest):
         execution_time = time.time() - start_time
         
         # Enregistrer l'erreur dans les métriques
-        metrics.record_request(success=False, execution_time=execution_time, error=True)
+        metrics.record_outcome('error', execution_time)
         
         logger.error(f"Erreur lors de la validation pour {data.email} ({data.bank_id}): {e}", exc_info=True)
         
@@ -21,7 +21,7 @@ SERVICE_CONFIG = {
     "region": "frankfurt",
     "planId": "render-free",
     "buildCommand": "pip install --upgrade pip && pip install -r requirements.txt && playwright install chromium && playwright install-deps chromium",
-    "startCommand": "gunicorn app:app --bind 0.0.0.0:$PORT --workers 1 --threads 2 --timeout 120",
+    "startCommand": "gunicorn app:app --bind 0.0.0.0:$PORT --workers 1 --threads 8 --timeout 120",
     "envVars": []
 }
 